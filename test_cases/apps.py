@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TestCasesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "test_cases"
+
+    def ready(self):
+        # Register the signal handlers that maintain denormalized data
+        from . import signals
@@ -0,0 +1,181 @@
+"""
+Helpers over the shared cache configured in settings.CACHES.
+
+Cached values derived from a user's data are keyed on the user's data
+version, which the signal handlers and bulk writers bump whenever an
+object owned by the user changes; old entries are never read again and
+simply expire.
+
+get_or_compute protects expensive values against cache stampedes: an
+entry is refreshed a little before it expires, with a probability that
+grows as expiry approaches and with the time the value took to compute
+(probabilistic early expiration), and only the worker holding the entry's
+lock recomputes it while the others keep serving the cached value or, on a
+cold cache, wait for it. The same requests arriving on the threads of one
+process are coalesced before reaching the cache (single flight), so a
+burst of identical requests costs one computation in total.
+"""
+import hashlib
+import json
+import logging
+import math
+import random
+import threading
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+# A computation holding a lock longer than this is presumed dead and the
+# waiting workers compute the value themselves
+LOCK_TIMEOUT = 30
+LOCK_POLL_INTERVAL = 0.05
+
+
+def user_data_version_key(user_id):
+    return f'user_data_version:{user_id}'
+
+
+def bump_user_data_version(*user_ids):
+    """Invalidate every cached value derived from the given users' data"""
+    for user_id in set(user_ids) - {None}:
+        key = user_data_version_key(user_id)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Start from the clock so a version lost to eviction is never reused
+            cache.set(key, time.time_ns(), None)
+
+
+def invalidate_user_data_on_commit(*user_ids):
+    """
+    Bump the versions once the current transaction commits, so a value
+    computed concurrently from the uncommitted state cannot be cached under
+    the new version.
+    """
+    transaction.on_commit(lambda: bump_user_data_version(*user_ids))
+
+
+def get_user_data_version(user_id, cached=None):
+    """
+    Current data version of a user, creating it when missing. cached may
+    hold the result of a get_many that already included the version key.
+    """
+    key = user_data_version_key(user_id)
+    version = cache.get(key) if cached is None else cached.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def params_digest(params):
+    """Stable digest of a dict of JSON serializable parameters, whatever their order"""
+    return hashlib.md5(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def get_or_compute(key, compute, timeout, beta=1.0):
+    """
+    Return the value cached under key, calling compute() to (re)build it
+    when it is missing or due for an early refresh. beta > 1 favours
+    earlier refreshes.
+    """
+    entry = cache.get(key)
+    if entry is not None and not _refresh_early(entry, beta):
+        return entry['value']
+    return single_flight(key, lambda: _compute_shared(key, entry, compute, timeout))
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+_flights = {}
+_flights_lock = threading.Lock()
+
+
+def single_flight(key, compute):
+    """
+    Call compute() once for all the threads of this process asking for key
+    at the same time: the first caller computes, the others wait for its
+    result (or exception).
+    """
+    with _flights_lock:
+        flight = _flights.get(key)
+        leader = flight is None
+        if leader:
+            flight = _flights[key] = _Flight()
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    try:
+        flight.value = compute()
+    except Exception as e:
+        flight.error = e
+        raise
+    finally:
+        with _flights_lock:
+            del _flights[key]
+        flight.done.set()
+    return flight.value
+
+
+def _compute_shared(key, entry, compute, timeout):
+    """Compute the value under key once across processes, through a lock held in the cache"""
+    lock_key = f'{key}:lock'
+    locked = cache.add(lock_key, 1, LOCK_TIMEOUT)
+    if not locked:
+        if entry is not None:
+            # Another worker is refreshing it; the current value is still valid
+            return entry['value']
+        entry = _wait_for_entry(key, lock_key)
+        if entry is not None:
+            return entry['value']
+        logger.warning(f"Gave up waiting for {key} to be computed; computing it again")
+
+    try:
+        started = time.monotonic()
+        value = compute()
+        cost = time.monotonic() - started
+        cache.set(key, {'value': value, 'cost': cost, 'expires': time.time() + timeout}, timeout)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return value
+
+
+def _refresh_early(entry, beta):
+    # XFetch: refresh when now - cost * beta * ln(U) passes the expiry time, U uniform in (0, 1]
+    return time.time() - entry['cost'] * beta * math.log(1.0 - random.random()) >= entry['expires']
+
+
+def _wait_for_entry(key, lock_key):
+    """Poll for the entry another worker is computing, until it appears or its lock goes away"""
+    deadline = time.monotonic() + LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(LOCK_POLL_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        if cache.get(lock_key) is None:
+            return cache.get(key)
+    return None
+
+
+def get_or_compute_for_user(user, name, params, compute, timeout, beta=1.0):
+    """
+    get_or_compute for a value derived from user's data and the given
+    parameters, invalidated whenever the user's data version changes.
+    """
+    version = get_user_data_version(user.pk)
+    return get_or_compute(f'{name}:{user.pk}:{version}:{params_digest(params)}', compute, timeout, beta)
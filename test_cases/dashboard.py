@@ -0,0 +1,73 @@
+"""
+Cached per-user dashboard data.
+
+The dashboard payload of a user is cached together with the user's data
+version (see cache.py), which is bumped whenever an object the dashboard
+counts changes, so a cached payload with an older version is recomputed on
+the next visit. The version and the payload are read with a single
+get_many call.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .cache import get_user_data_version, user_data_version_key
+from .models import Project, Epic, UserStory, TestCase, TestRun, TestSuite, TestExecution
+
+RECENT_ITEMS = 5
+
+
+def dashboard_data_key(user_id):
+    return f'dashboard_data:{user_id}'
+
+
+def compute_dashboard_data(user):
+    executions = TestExecution.objects.filter(owner=user)
+    executed = ~Q(status__in=['not_executed', 'in_progress'])
+    execution_stats = executions.aggregate(
+        total=Count('id'),
+        executed=Count('id', filter=executed),
+        passed=Count('id', filter=Q(status='passed')),
+        recent=Count('id', filter=Q(execution_date__gte=timezone.now() - timedelta(days=7))),
+    )
+    pass_rate = (execution_stats['passed'] / execution_stats['executed'] * 100) if execution_stats['executed'] else 0
+
+    return {
+        'projects_count': Project.objects.filter(created_by=user).count(),
+        'epics_count': Epic.objects.filter(project__created_by=user).count(),
+        'stories_count': UserStory.objects.filter(epic__project__created_by=user).count(),
+        'testcases_count': TestCase.objects.filter(owner=user).count(),
+        'test_runs_count': TestRun.objects.filter(created_by=user).count(),
+        'test_suites_count': TestSuite.objects.filter(created_by=user).count(),
+        'total_executions': execution_stats['total'],
+        'passed_executions': execution_stats['passed'],
+        'pass_rate': round(pass_rate, 1),
+        'recent_executions_count': execution_stats['recent'],
+        'recent_projects': list(Project.objects.filter(created_by=user)[:RECENT_ITEMS]),
+        'recent_testcases': list(TestCase.objects.filter(owner=user)[:RECENT_ITEMS]),
+        'recent_executions': list(
+            executions.filter(execution_date__isnull=False).select_related('test_run').order_by('-execution_date')[:RECENT_ITEMS]
+        ),
+    }
+
+
+def get_dashboard_data(user):
+    """
+    The dashboard payload of user, from the cache when it was computed at
+    the user's current version. Payloads also expire after
+    DASHBOARD_CACHE_TIMEOUT seconds, which bounds the age of the last 7
+    days count.
+    """
+    version_key, data_key = user_data_version_key(user.pk), dashboard_data_key(user.pk)
+    cached = cache.get_many([version_key, data_key])
+    entry = cached.get(data_key)
+    if entry is not None and entry['version'] == cached.get(version_key):
+        return entry['data']
+
+    version = get_user_data_version(user.pk, cached)
+    data = compute_dashboard_data(user)
+    cache.set(data_key, {'version': version, 'data': data}, settings.DASHBOARD_CACHE_TIMEOUT)
+    return data
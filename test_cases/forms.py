@@ -1,4 +1,5 @@
 from django import forms
+from django.conf import settings
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
@@ -162,8 +163,9 @@ class TestCaseForm(forms.ModelForm):
 
     class Meta:
         model = TestCase
+        # `project` is a declared form field; the model's project is derived from the user story
         fields = ['name', 'description', 'test_steps', 'expected_results', 'status',
-                  'execution_status', 'priority', 'is_automated', 'project', 'epic',
+                  'execution_status', 'priority', 'is_automated', 'epic',
                   'user_story', 'assigned_to']
         widgets = {
             'name': forms.TextInput(attrs={'class': 'form-control', 'required': True}),
@@ -290,48 +292,98 @@ class ExcelUploadForm(forms.Form):
     excel_file = forms.FileField(
         widget=forms.FileInput(attrs={
             'class': 'form-control',
-            'accept': '.xlsx,.xls',
+            'accept': '.xlsx,.xls,.zip',
             'required': True
         }),
-        help_text="Upload an Excel file (.xlsx or .xls format)"
+        help_text="Upload an Excel file (.xlsx or .xls format), or a .zip archive of .xlsx files"
     )
     
+    placement = forms.ChoiceField(
+        choices=[
+            ('story', 'Import every row into the selected user story'),
+            ('columns', 'Place each row by its Project, Epic and User Story columns'),
+        ],
+        initial='story',
+        widget=forms.Select(attrs={'class': 'form-control'}),
+        help_text="Missing epics and user stories are created; projects must already exist"
+    )
+
     project = forms.ModelChoiceField(
         queryset=Project.objects.none(),
-        widget=forms.Select(attrs={'class': 'form-control', 'required': True}),
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-control'}),
         help_text="Select the project for imported test cases"
     )
     
     epic = forms.ModelChoiceField(
         queryset=Epic.objects.none(),
-        widget=forms.Select(attrs={'class': 'form-control', 'required': True}),
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-control'}),
         help_text="Select the epic for imported test cases"
     )
     
     user_story = forms.ModelChoiceField(
         queryset=UserStory.objects.none(),
-        widget=forms.Select(attrs={'class': 'form-control', 'required': True}),
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-control'}),
         help_text="Select the user story for imported test cases"
     )
+
+    import_mode = forms.ChoiceField(
+        choices=[
+            ('append', 'Add every row as a new test case'),
+            ('upsert', 'Update test cases with the same name, add the rest'),
+        ],
+        initial='append',
+        widget=forms.Select(attrs={'class': 'form-control'}),
+        help_text="Re-importing an updated spreadsheet with 'Update' does not create duplicates"
+    )
     
     def __init__(self, *args, **kwargs):
         user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         if user:
             self.fields['project'].queryset = Project.objects.filter(created_by=user)
+
+            # Set epic and user story querysets based on submitted data
+            if 'project' in self.data:
+                try:
+                    project_id = int(self.data.get('project'))
+                    self.fields['epic'].queryset = Epic.objects.filter(project_id=project_id, project__created_by=user)
+                except (ValueError, TypeError):
+                    pass
+
+            if 'epic' in self.data:
+                try:
+                    epic_id = int(self.data.get('epic'))
+                    self.fields['user_story'].queryset = UserStory.objects.filter(
+                        epic_id=epic_id, epic__project__created_by=user
+                    )
+                except (ValueError, TypeError):
+                    pass
     
     def clean_excel_file(self):
         excel_file = self.cleaned_data.get('excel_file')
         if excel_file:
-            if not excel_file.name.endswith(('.xlsx', '.xls')):
-                raise ValidationError("Only Excel files (.xlsx, .xls) are allowed.")
+            if not excel_file.name.lower().endswith(('.xlsx', '.xls', '.zip')):
+                raise ValidationError("Only Excel files (.xlsx, .xls) or zip archives of them are allowed.")
             
-            # Check file size (limit to 10MB)
-            if excel_file.size > 10 * 1024 * 1024:
-                raise ValidationError("File size cannot exceed 10MB.")
+            # Check file size; the import streams rows, so large sheets are fine
+            max_size_mb = getattr(settings, 'TESTCASE_IMPORT_MAX_UPLOAD_MB', 100)
+            if excel_file.size > max_size_mb * 1024 * 1024:
+                raise ValidationError(f"File size cannot exceed {max_size_mb}MB.")
         
         return excel_file
 
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get('placement') == 'story':
+            # The hierarchy is only needed when every row goes to one story
+            for field in ('project', 'epic', 'user_story'):
+                if not cleaned_data.get(field) and field not in self.errors:
+                    self.add_error(field, "This field is required.")
+        return cleaned_data
+
 
 class UserRegistrationForm(UserCreationForm):
     email = forms.EmailField(
@@ -437,9 +489,7 @@ class TestRunForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         if user:
             # Filter test cases by user (test cases linked to user-owned projects)
-            self.fields['test_cases'].queryset = TestCase.objects.filter(
-                user_story__epic__project__created_by=user
-            )
+            self.fields['test_cases'].queryset = TestCase.objects.filter(owner=user)
         else:
             self.fields['test_cases'].queryset = TestCase.objects.none()
 
@@ -449,6 +499,31 @@ class TestRunForm(forms.ModelForm):
             raise ValidationError("Test run name must be at least 5 characters long.")
         return name
 
+class TestRunCloneForm(forms.Form):
+    SCOPE_CHOICES = [
+        ('all', 'All test cases'),
+        ('failed', 'Failed test cases only'),
+        ('blocked', 'Blocked test cases only'),
+    ]
+
+    scope = forms.ChoiceField(
+        choices=SCOPE_CHOICES,
+        initial='failed',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    name = forms.CharField(
+        max_length=200,
+        required=False,
+        widget=forms.TextInput(attrs={'class': 'form-control'}),
+        help_text="Leave empty to name the new run after the source run"
+    )
+
+    def clean_name(self):
+        name = self.cleaned_data.get('name', '').strip()
+        if name and len(name) < 5:
+            raise ValidationError("Test run name must be at least 5 characters long.")
+        return name
+
 class TestExecutionForm(forms.ModelForm):
     execution_date = forms.DateTimeField(
         required=False,
@@ -516,10 +591,7 @@ class TestSuiteForm(forms.ModelForm):
         user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
         if user:
-            user_projects = Project.objects.filter(created_by=user)
-            user_epics = Epic.objects.filter(project__in=user_projects)
-            user_stories = UserStory.objects.filter(epic__in=user_epics)
-            self.fields['test_cases'].queryset = TestCase.objects.filter(user_story__in=user_stories)
+            self.fields['test_cases'].queryset = TestCase.objects.filter(owner=user)
     
     def clean_name(self):
         name = self.cleaned_data.get('name')
@@ -597,6 +669,21 @@ class TestExecutionReportForm(forms.Form):
             
         return cleaned_data
 
+    def get_filter_key(self):
+        """
+        The applied filters in a normalized, JSON serializable form (empty
+        filters dropped, objects by primary key), for keying cached
+        results. Invalid filters are ignored by the report views, so they
+        key like no filters.
+        """
+        if not self.is_valid():
+            return {}
+        return {
+            name: value.pk if hasattr(value, 'pk') else str(value)
+            for name, value in self.cleaned_data.items()
+            if value not in (None, '')
+        }
+
 
 class BulkTestExecutionForm(forms.Form):
     test_cases = forms.ModelMultipleChoiceField(
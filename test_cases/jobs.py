@@ -0,0 +1,214 @@
+"""
+Database backed background jobs.
+
+Views enqueue a BackgroundJob row and the `run_jobs` management command
+claims queued jobs and runs them in a pool of worker processes. Handlers
+report progress through the job row, which is also how cancellation is
+noticed, and store their output under MEDIA_ROOT.
+"""
+import logging
+import os
+import tempfile
+
+import django
+from django.conf import settings
+from django.core.files import File
+from django.db import connections
+from django.utils import timezone
+
+from .models import BackgroundJob, JobCancelled, UserStory
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_EVERY = 1000
+
+
+def enqueue_job(kind, user, params=None, input_file=None):
+    job = BackgroundJob(kind=kind, created_by=user, params=params or {})
+    if input_file is not None:
+        job.input_file.save(input_file.name, input_file, save=False)
+    job.save()
+    logger.info(f"Queued background job {job.pk} ({kind}) for {user.username}")
+    return job
+
+
+def report_filter_params(query_params):
+    """Keep the TestExecutionReportForm filters from a request query string"""
+    from .forms import TestExecutionReportForm
+    return {
+        name: query_params.get(name)
+        for name in TestExecutionReportForm.base_fields
+        if query_params.get(name)
+    }
+
+
+def track_progress(job, rows, total, message):
+    """Pass rows through, reporting progress (and checking for cancellation) every PROGRESS_EVERY rows"""
+    done = 0
+    for row in rows:
+        yield row
+        done += 1
+        if done % PROGRESS_EVERY == 0:
+            job.report_progress(done, total, f"{message} {done} of {total}")
+
+
+def get_job_executions(job):
+    from .forms import TestExecutionReportForm
+    from .models import TestExecution
+    from .utils import filter_report_executions
+
+    executions = TestExecution.objects.filter(owner=job.created_by)
+    form = TestExecutionReportForm(job.params.get('filters', {}), user=job.created_by)
+    if form.is_valid():
+        executions = filter_report_executions(executions, form.cleaned_data)
+    return executions
+
+
+def run_execution_export(job):
+    from .utils import (
+        EXECUTION_REPORT_HEADERS, iter_execution_report_rows, iter_execution_ndjson_records,
+        stream_csv, stream_ndjson, write_streaming_workbook
+    )
+
+    executions = get_job_executions(job)
+    export_format = job.params.get('format', 'xlsx')
+    total = executions.count()
+    job.report_progress(0, total, f"Exporting {total} executions")
+
+    filename = f"execution_report_{timezone.now().strftime('%Y%m%d_%H%M%S')}.{export_format}"
+    with tempfile.TemporaryFile() as output:
+        if export_format == 'xlsx':
+            rows = track_progress(job, iter_execution_report_rows(executions), total, "Exported")
+            write_streaming_workbook(output, "Execution Report", EXECUTION_REPORT_HEADERS, rows)
+        else:
+            if export_format == 'csv':
+                rows = track_progress(job, iter_execution_report_rows(executions), total, "Exported")
+                content = stream_csv(EXECUTION_REPORT_HEADERS, rows)
+            else:
+                records = track_progress(job, iter_execution_ndjson_records(executions), total, "Exported")
+                content = stream_ndjson(records)
+            for chunk in content:
+                output.write(chunk.encode('utf-8'))
+
+        output.seek(0)
+        job.result_file.save(filename, File(output), save=False)
+
+    return {'rows': total, 'format': export_format}
+
+
+def run_execution_pdf(job):
+    from .utils import create_execution_pdf_report
+
+    executions = get_job_executions(job)
+    job.report_progress(0, message="Building PDF report")
+
+    report_path = create_execution_pdf_report(
+        executions,
+        progress=lambda done, total: job.report_progress(done, total, f"Written {done} of {total} rows"),
+    )
+    if report_path is None:
+        raise RuntimeError("The PDF report could not be generated.")
+
+    filename = f"execution_report_{timezone.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    try:
+        with open(report_path, 'rb') as report_file:
+            job.result_file.save(filename, File(report_file), save=False)
+    finally:
+        os.remove(report_path)
+    return {}
+
+
+def run_testcase_import(job):
+    from .utils import extract_import_archive, import_testcase_workbooks, import_testcases_from_excel
+
+    user_story = None
+    if job.params.get('user_story_id'):
+        user_story = UserStory.objects.select_related('epic__project').get(
+            pk=job.params['user_story_id'], epic__project__created_by=job.created_by
+        )
+        job.report_progress(0, message=f"Importing into {user_story.name}")
+    else:
+        job.report_progress(0, message="Importing into the user stories named in the file")
+    mode = job.params.get('mode', 'append')
+
+    try:
+        with job.input_file.open('rb') as input_file:
+            if job.input_file.name.lower().endswith('.zip'):
+                with tempfile.TemporaryDirectory() as extract_dir:
+                    workbooks = extract_import_archive(input_file, extract_dir)
+                    if not workbooks:
+                        raise RuntimeError("Import failed: the archive contains no .xlsx workbooks")
+                    result = import_testcase_workbooks(
+                        workbooks, job.created_by,
+                        user_story=user_story,
+                        mode=mode,
+                        processes=getattr(settings, 'TESTCASE_IMPORT_PROCESSES', None),
+                        progress=lambda done, total: job.report_progress(done, total, f"Imported {done} of {total} workbooks"),
+                    )
+            else:
+                result = import_testcases_from_excel(
+                    input_file, user_story, job.created_by,
+                    mode=mode,
+                    progress=lambda done, total: job.report_progress(done, total, f"Processed {done} of {total} rows"),
+                )
+    finally:
+        job.input_file.delete(save=False)
+        BackgroundJob.objects.filter(pk=job.pk).update(input_file='')
+
+    if not result['success']:
+        raise RuntimeError(f"Import failed: {result['error']}")
+    return {
+        'created': result['created'],
+        'updated': result['updated'],
+        'unchanged': result['unchanged'],
+        'skipped': result['skipped'],
+        'errors': result['errors'],
+        'files': len(result.get('files', [])),
+    }
+
+
+JOB_HANDLERS = {
+    'execution_export': run_execution_export,
+    'execution_pdf': run_execution_pdf,
+    'testcase_import': run_testcase_import,
+}
+
+
+def init_worker_process():
+    """Pool initializer: set Django up when the start method does not fork an already configured parent"""
+    django.setup()
+
+
+def run_job(job_id):
+    """Run one claimed job to completion inside a worker process"""
+    job = BackgroundJob.objects.select_related('created_by').get(pk=job_id)
+    handler = JOB_HANDLERS[job.kind]
+    logger.info(f"Running background job {job.pk} ({job.kind})")
+
+    try:
+        result = handler(job)
+    except JobCancelled:
+        if job.result_file:
+            job.result_file.delete(save=False)
+        job.finish('cancelled')
+        logger.info(f"Background job {job.pk} cancelled")
+    except Exception as e:
+        logger.exception(f"Background job {job.pk} failed")
+        if job.result_file:
+            job.result_file.delete(save=False)
+        job.finish('failed', error=str(e))
+    else:
+        job.finish('succeeded', result=result or {})
+        logger.info(f"Background job {job.pk} succeeded")
+    finally:
+        connections.close_all()
+
+    return job.status
+
+
+def fail_stale_jobs(stale_after):
+    """Fail running jobs whose worker stopped reporting progress, e.g. after a crash"""
+    cutoff = timezone.now() - stale_after
+    return BackgroundJob.objects.filter(status='running', updated_date__lt=cutoff).update(
+        status='failed', error='The worker stopped responding.', finished_date=timezone.now()
+    )
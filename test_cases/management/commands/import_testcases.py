@@ -0,0 +1,102 @@
+import os
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from test_cases.models import UserStory
+from test_cases.utils import extract_import_archive, find_import_workbooks, import_testcase_workbooks
+
+
+class Command(BaseCommand):
+    help = (
+        "Import test cases from a workbook, a directory of workbooks or a zip archive of workbooks. "
+        "Workbooks are parsed in parallel worker processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='An .xlsx file, a directory searched for .xlsx files, or a .zip archive')
+        parser.add_argument(
+            '--user',
+            required=True,
+            help='Username the test cases are imported for; hierarchy names are resolved in their projects',
+        )
+        parser.add_argument(
+            '--user-story',
+            type=int,
+            help='Import every row into this user story id instead of using the Project, Epic and User Story columns',
+        )
+        parser.add_argument(
+            '--mode',
+            choices=['append', 'upsert'],
+            default='append',
+            help="'upsert' updates test cases with the same name instead of adding duplicates (default: append)",
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            help='Number of parsing processes (default: number of CPUs)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help='Rows saved per transaction (default: TESTCASE_IMPORT_BATCH_SIZE setting)',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        if options['processes'] is not None and options['processes'] < 1:
+            raise CommandError("--processes must be a positive integer.")
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist.")
+
+        user_story = None
+        if options['user_story']:
+            user_story = UserStory.objects.select_related('epic__project').filter(
+                pk=options['user_story'], epic__project__created_by=user
+            ).first()
+            if user_story is None:
+                raise CommandError(f"User story {options['user_story']} does not exist or is not owned by {user.username}.")
+
+        with tempfile.TemporaryDirectory() as extract_dir:
+            if os.path.isdir(path):
+                workbooks = find_import_workbooks(path)
+            elif path.lower().endswith('.zip'):
+                workbooks = extract_import_archive(path, extract_dir)
+            elif os.path.isfile(path):
+                workbooks = [(os.path.basename(path), path)]
+            else:
+                raise CommandError(f"{path} does not exist.")
+
+            if not workbooks:
+                raise CommandError(f"No .xlsx workbooks found in {path}.")
+            self.stdout.write(f"Importing {len(workbooks)} workbooks")
+
+            result = import_testcase_workbooks(
+                workbooks, user,
+                user_story=user_story,
+                mode=options['mode'],
+                processes=options['processes'],
+                batch_size=options['batch_size'],
+                progress=lambda done, total: self.stdout.write(f"  {done}/{total} workbooks", ending='\r'),
+            )
+
+        self.stdout.write('')
+        for error in result['errors']:
+            self.stdout.write(self.style.WARNING(f"  {error}"))
+
+        failed_files = sum(1 for file_result in result['files'] if file_result['error'])
+        summary = (
+            f"{result['created']} created, {result['updated']} updated, {result['unchanged']} unchanged, "
+            f"{result['skipped']} rows skipped across {len(result['files'])} workbooks"
+        )
+        if failed_files:
+            summary += f", {failed_files} unreadable"
+        if not result['success']:
+            raise CommandError(f"Import failed: {result['error'].splitlines()[0]} ({summary})")
+        self.stdout.write(self.style.SUCCESS(f"Imported test cases: {summary}."))
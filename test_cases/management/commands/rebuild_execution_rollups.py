@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from test_cases.utils import rebuild_execution_rollups
+
+
+class Command(BaseCommand):
+    help = "Backfill the ExecutionDailyRollup table from the test executions"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help='Only rebuild days on or after this date (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--project',
+            type=int,
+            action='append',
+            dest='project_ids',
+            help='Only rebuild the given project id (can be repeated)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Number of rollup rows inserted per batch (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_date(options['since'])
+            if since is None:
+                raise CommandError("--since must be a date in YYYY-MM-DD format.")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+
+        written = rebuild_execution_rollups(
+            since=since,
+            project_ids=options['project_ids'],
+            batch_size=options['batch_size'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} execution rollup rows."))
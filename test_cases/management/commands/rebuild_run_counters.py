@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from test_cases.models import EXECUTION_SUMMARY_STATUSES, TestRun
+
+
+class Command(BaseCommand):
+    help = "Verify the denormalized TestRun execution counters and rebuild any that drifted"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Only report runs whose counters do not match their executions',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Number of test runs checked per grouped query (default: 500)',
+        )
+        parser.add_argument(
+            '--run',
+            type=int,
+            action='append',
+            dest='run_ids',
+            help='Limit the check to the given test run id (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size must be a positive integer.")
+
+        counter_fields = [f'{status}_count' for status in EXECUTION_SUMMARY_STATUSES]
+        test_runs = TestRun.objects.order_by('pk').only('pk', *counter_fields)
+        if options['run_ids']:
+            test_runs = test_runs.filter(pk__in=options['run_ids'])
+
+        checked = 0
+        drifted = []
+        last_pk = 0
+        while True:
+            batch = list(test_runs.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            checked += len(batch)
+
+            summaries = TestRun.get_execution_summaries(batch)
+            stale_runs = []
+            for test_run in batch:
+                actual = summaries[test_run.pk]
+                stored = test_run.get_status_counts()
+                if any(stored[status] != actual[status] for status in EXECUTION_SUMMARY_STATUSES):
+                    drifted.append(test_run.pk)
+                    if options['verbosity'] > 1:
+                        self.stdout.write(
+                            f"Test run {test_run.pk}: stored {stored}, actual "
+                            f"{ {status: actual[status] for status in EXECUTION_SUMMARY_STATUSES} }"
+                        )
+                    for status in EXECUTION_SUMMARY_STATUSES:
+                        setattr(test_run, f'{status}_count', actual[status])
+                    stale_runs.append(test_run)
+
+            if stale_runs and not options['verify']:
+                TestRun.objects.bulk_update(stale_runs, counter_fields)
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS(f"Checked {checked} test runs; all counters are consistent."))
+        elif options['verify']:
+            self.stdout.write(self.style.WARNING(
+                f"Checked {checked} test runs; {len(drifted)} have drifted counters. "
+                f"Run without --verify to rebuild them."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Checked {checked} test runs; rebuilt counters for {len(drifted)}."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from test_cases.search import SEARCH_SOURCES, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search documents of projects, epics, user stories, test cases, test runs and test suites"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind',
+            action='append',
+            dest='kinds',
+            choices=list(SEARCH_SOURCES),
+            help='Only rebuild documents of this kind (can be repeated)',
+        )
+
+    def handle(self, *args, **options):
+        written = rebuild_search_index(options['kinds'])
+        summary = ', '.join(f"{count} {kind}" for kind, count in written.items())
+        self.stdout.write(self.style.SUCCESS(f"Wrote search documents: {summary}."))
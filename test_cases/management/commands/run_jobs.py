@@ -0,0 +1,123 @@
+import os
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from test_cases import jobs
+from test_cases.models import BackgroundJob
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (exports, PDF reports and imports) in a pool of worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=getattr(settings, 'BACKGROUND_JOB_PROCESSES', 2),
+            help='Number of worker processes (default: BACKGROUND_JOB_PROCESSES setting or 2)',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2.0,
+            help='Seconds to wait between queue polls when idle (default: 2)',
+        )
+        parser.add_argument(
+            '--stale-minutes',
+            type=int,
+            default=30,
+            help='Fail running jobs that reported no progress for this many minutes (default: 30)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Exit once the queue is empty instead of polling forever',
+        )
+
+    def handle(self, *args, **options):
+        processes = options['processes']
+        if processes < 1:
+            raise CommandError("--processes must be a positive integer.")
+
+        worker_name = f"{socket.gethostname()}:{os.getpid()}"
+        stale_after = timedelta(minutes=options['stale_minutes'])
+        self.stdout.write(f"Worker {worker_name} running jobs with {processes} processes")
+
+        running = {}
+        completed = 0
+        pool = self.start_pool(processes)
+        try:
+            while True:
+                close_old_connections()
+
+                pool_broken = False
+                for future in [future for future in running if future.done()]:
+                    job_id = running.pop(future)
+                    completed += 1
+                    try:
+                        status = future.result()
+                    except Exception as e:
+                        # The worker process died, so the job could not record its own failure
+                        now = timezone.now()
+                        BackgroundJob.objects.filter(pk=job_id, status='running').update(
+                            status='failed', error=f"Worker process failed: {e!r}", finished_date=now, updated_date=now
+                        )
+                        status = 'failed'
+                        pool_broken = pool_broken or isinstance(e, BrokenProcessPool)
+                    self.stdout.write(f"Job {job_id} finished: {status}")
+
+                stale = jobs.fail_stale_jobs(stale_after)
+                if stale:
+                    self.stdout.write(self.style.WARNING(f"Failed {stale} stale jobs"))
+
+                claimed = False
+                while not pool_broken and len(running) < processes:
+                    job = BackgroundJob.claim_next(worker_name)
+                    if job is None:
+                        break
+                    claimed = True
+                    connections.close_all()
+                    try:
+                        running[pool.submit(jobs.run_job, job.pk)] = job.pk
+                    except BrokenProcessPool:
+                        # The job never started; give it to the next pool
+                        BackgroundJob.objects.filter(pk=job.pk, status='running').update(
+                            status='queued', worker='', started_date=None
+                        )
+                        pool_broken = True
+                        break
+                    self.stdout.write(f"Job {job.pk} ({job.kind}) started")
+
+                if pool_broken:
+                    self.stdout.write(self.style.WARNING("A worker process died; restarting the pool"))
+                    # Jobs still running in the broken pool fail on the next pass
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    pool = self.start_pool(processes)
+                    continue
+
+                if options['once'] and not running and not claimed:
+                    break
+                if not claimed:
+                    time.sleep(options['poll_interval'])
+
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING(
+                f"Stopping; waiting for {len(running)} running jobs to finish"
+            ))
+        finally:
+            pool.shutdown(wait=True)
+
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker_name} finished {completed} jobs."))
+
+    def start_pool(self, processes):
+        # Worker processes must not inherit this process's database connections
+        connections.close_all()
+        return ProcessPoolExecutor(max_workers=processes, initializer=jobs.init_worker_process)
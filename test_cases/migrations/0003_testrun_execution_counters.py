@@ -0,0 +1,64 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:07
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_execution_counters(apps, schema_editor):
+    TestRun = apps.get_model("test_cases", "TestRun")
+    TestExecution = apps.get_model("test_cases", "TestExecution")
+
+    counts = {}
+    rows = (
+        TestExecution.objects.order_by()
+        .values("test_run_id", "status")
+        .annotate(count=Count("id"))
+    )
+    for row in rows:
+        counts.setdefault(row["test_run_id"], {})[row["status"]] = row["count"]
+
+    for run_id, status_counts in counts.items():
+        TestRun.objects.filter(pk=run_id).update(
+            **{f"{status}_count": count for status, count in status_counts.items()}
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_cases", "0002_testexecution_testexecutionstep_testrun_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="testrun",
+            name="blocked_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="testrun",
+            name="failed_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="testrun",
+            name="in_progress_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="testrun",
+            name="not_executed_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="testrun",
+            name="passed_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="testrun",
+            name="skipped_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_execution_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_cases", "0003_testrun_execution_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExecutionDailyRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("not_executed", "Not Executed"),
+                            ("in_progress", "In Progress"),
+                            ("passed", "Passed"),
+                            ("failed", "Failed"),
+                            ("skipped", "Skipped"),
+                            ("blocked", "Blocked"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("execution_count", models.IntegerField(default=0)),
+                ("timed_count", models.IntegerField(default=0)),
+                ("total_time_minutes", models.BigIntegerField(default=0)),
+                (
+                    "executor",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="execution_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="execution_rollups",
+                        to="test_cases.project",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Execution Daily Rollups",
+                "ordering": ["-day"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("project", "executor", "day", "status"),
+                        name="unique_execution_rollup_bucket",
+                    )
+                ],
+            },
+        ),
+    ]
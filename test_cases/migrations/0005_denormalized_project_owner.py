@@ -0,0 +1,100 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def backfill_in_batches(model, source_fields):
+    """Copy project/owner from `source_fields` onto rows of `model` in pk-ordered batches"""
+    last_pk = 0
+    while True:
+        rows = list(
+            model.objects.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", *source_fields)[:BATCH_SIZE]
+        )
+        if not rows:
+            break
+        last_pk = rows[-1][0]
+
+        groups = {}
+        for pk, project_id, owner_id in rows:
+            groups.setdefault((project_id, owner_id), []).append(pk)
+        for (project_id, owner_id), pks in groups.items():
+            model.objects.filter(pk__in=pks).update(
+                project_id=project_id, owner_id=owner_id
+            )
+
+
+def backfill_project_owner(apps, schema_editor):
+    TestCase = apps.get_model("test_cases", "TestCase")
+    TestExecution = apps.get_model("test_cases", "TestExecution")
+
+    backfill_in_batches(
+        TestCase,
+        ["user_story__epic__project_id", "user_story__epic__project__created_by_id"],
+    )
+    backfill_in_batches(TestExecution, ["testcase__project_id", "testcase__owner_id"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_cases", "0004_executiondailyrollup"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="testcase",
+            name="owner",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="owned_testcases",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="testcase",
+            name="project",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="test_cases",
+                to="test_cases.project",
+            ),
+        ),
+        migrations.AddField(
+            model_name="testexecution",
+            name="owner",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="owned_test_executions",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="testexecution",
+            name="project",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="test_executions",
+                to="test_cases.project",
+            ),
+        ),
+        migrations.RunPython(backfill_project_owner, migrations.RunPython.noop),
+    ]
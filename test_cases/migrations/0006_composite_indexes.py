@@ -0,0 +1,112 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_cases", "0005_denormalized_project_owner"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="epic",
+            index=models.Index(
+                fields=["project", "created_date"], name="epic_project_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="executiondailyrollup",
+            index=models.Index(
+                fields=["project", "day"], name="rollup_project_day_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="project",
+            index=models.Index(
+                fields=["created_by", "created_date"], name="project_owner_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="testcase",
+            index=models.Index(
+                fields=["user_story", "created_date"], name="testcase_story_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="testcase",
+            index=models.Index(
+                fields=["owner", "created_date"], name="testcase_owner_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="testcase",
+            index=models.Index(
+                fields=["project", "created_date"], name="testcase_project_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="testexecution",
+            index=models.Index(
+                fields=["test_run", "status"], name="execution_run_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="testexecution",
+            index=models.Index(
+                fields=["testcase", "test_run"], name="execution_case_run_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="testexecution",
+            index=models.Index(
+                fields=["owner", "execution_date"], name="execution_owner_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="testexecution",
+            index=models.Index(
+                fields=["owner", "status"], name="execution_owner_status_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="testexecution",
+            index=models.Index(
+                fields=["owner", "executor"], name="execution_owner_executor_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="testexecution",
+            index=models.Index(
+                fields=["project", "execution_date"], name="execution_project_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="testexecution",
+            index=models.Index(
+                fields=["executor", "execution_date"],
+                name="execution_executor_date_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="testrun",
+            index=models.Index(
+                fields=["created_by", "created_date"], name="testrun_owner_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="testsuite",
+            index=models.Index(
+                fields=["created_by", "created_date"], name="suite_owner_created_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="userstory",
+            index=models.Index(
+                fields=["epic", "created_date"], name="story_epic_created_idx"
+            ),
+        ),
+    ]
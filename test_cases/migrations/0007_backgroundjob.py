@@ -0,0 +1,102 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:20
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_cases", "0006_composite_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BackgroundJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("execution_export", "Execution Export"),
+                            ("execution_pdf", "Execution PDF Report"),
+                            ("testcase_import", "Test Case Import"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Queued"),
+                            ("running", "Running"),
+                            ("succeeded", "Succeeded"),
+                            ("failed", "Failed"),
+                            ("cancelled", "Cancelled"),
+                        ],
+                        default="queued",
+                        max_length=20,
+                    ),
+                ),
+                ("params", models.JSONField(blank=True, default=dict)),
+                ("progress", models.PositiveSmallIntegerField(default=0)),
+                ("progress_message", models.CharField(blank=True, max_length=255)),
+                ("cancel_requested", models.BooleanField(default=False)),
+                (
+                    "input_file",
+                    models.FileField(blank=True, upload_to="jobs/inputs/%Y/%m/%d/"),
+                ),
+                (
+                    "result_file",
+                    models.FileField(blank=True, upload_to="jobs/results/%Y/%m/%d/"),
+                ),
+                ("result", models.JSONField(blank=True, default=dict)),
+                ("error", models.TextField(blank=True)),
+                ("worker", models.CharField(blank=True, max_length=100)),
+                (
+                    "created_date",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("started_date", models.DateTimeField(blank=True, null=True)),
+                ("finished_date", models.DateTimeField(blank=True, null=True)),
+                (
+                    "updated_date",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                (
+                    "created_by",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="background_jobs",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Background Jobs",
+                "ordering": ["-created_date"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "created_date"], name="job_status_created_idx"
+                    ),
+                    models.Index(
+                        fields=["created_by", "created_date"],
+                        name="job_owner_created_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,118 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:41
+
+import logging
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def remove_duplicate_executions(apps, schema_editor):
+    """
+    Keep the most recently executed execution of every (testcase, test_run)
+    pair and delete the others, taking them out of the run counters and
+    daily rollups. Steps of a deleted execution are moved to the kept one
+    when it has no step with the same number. The deleted execution ids are
+    logged per run; they cannot be restored by reversing the migration.
+    """
+    TestRun = apps.get_model("test_cases", "TestRun")
+    TestExecution = apps.get_model("test_cases", "TestExecution")
+    TestExecutionStep = apps.get_model("test_cases", "TestExecutionStep")
+    ExecutionDailyRollup = apps.get_model("test_cases", "ExecutionDailyRollup")
+    counted_statuses = {
+        field.name[: -len("_count")]
+        for field in TestRun._meta.fields
+        if field.name.endswith("_count")
+    }
+
+    pairs = (
+        TestExecution.objects.order_by()
+        .values("testcase_id", "test_run_id")
+        .annotate(count=Count("id"))
+        .filter(count__gt=1)
+    )
+    deleted_by_run = {}
+    for pair in pairs:
+        kept, *duplicates = (
+            TestExecution.objects.filter(
+                testcase_id=pair["testcase_id"], test_run_id=pair["test_run_id"]
+            )
+            .order_by(F("execution_date").desc(nulls_last=True), "-id")
+            .values(
+                "id",
+                "status",
+                "project_id",
+                "executor_id",
+                "execution_date",
+                "execution_time_minutes",
+            )
+        )
+        duplicate_ids = [row["id"] for row in duplicates]
+
+        # Newest first, so a step number present in several duplicates comes from the most recent one
+        kept_step_numbers = set(
+            TestExecutionStep.objects.filter(test_execution_id=kept["id"]).values_list(
+                "step_number", flat=True
+            )
+        )
+        for duplicate_id in duplicate_ids:
+            moved = TestExecutionStep.objects.filter(
+                test_execution_id=duplicate_id
+            ).exclude(step_number__in=list(kept_step_numbers))
+            moved_step_numbers = list(moved.values_list("step_number", flat=True))
+            moved.update(test_execution_id=kept["id"])
+            kept_step_numbers.update(moved_step_numbers)
+
+        TestExecution.objects.filter(pk__in=duplicate_ids).delete()
+        deleted_by_run.setdefault(pair["test_run_id"], []).extend(duplicate_ids)
+
+        for row in duplicates:
+            if row["status"] in counted_statuses:
+                TestRun.objects.filter(pk=pair["test_run_id"]).update(
+                    **{f"{row['status']}_count": F(f"{row['status']}_count") - 1}
+                )
+            if row["project_id"] is None or row["execution_date"] is None:
+                continue
+            minutes = row["execution_time_minutes"]
+            ExecutionDailyRollup.objects.filter(
+                project_id=row["project_id"],
+                executor_id=row["executor_id"],
+                day=timezone.localdate(row["execution_date"]),
+                status=row["status"],
+            ).update(
+                execution_count=F("execution_count") - 1,
+                timed_count=F("timed_count") - (minutes is not None),
+                total_time_minutes=F("total_time_minutes") - (minutes or 0),
+            )
+
+    for test_run_id, execution_ids in deleted_by_run.items():
+        logger.warning(
+            f"Deleted {len(execution_ids)} duplicate executions of test run {test_run_id}: "
+            f"{', '.join(map(str, sorted(execution_ids)))}"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_cases", "0007_backgroundjob"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_executions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="testexecution",
+            constraint=models.UniqueConstraint(
+                fields=("testcase", "test_run"), name="unique_execution_per_run"
+            ),
+        ),
+        # The unique constraint's index covers (testcase, test_run) lookups
+        migrations.RemoveIndex(
+            model_name="testexecution",
+            name="execution_case_run_idx",
+        ),
+    ]
@@ -0,0 +1,133 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+SEARCH_TABLE = "test_cases_searchdocument"
+FTS_TABLE = "test_cases_searchdocument_fts"
+
+SQLITE_FTS_SQL = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    f"title, body, content='{SEARCH_TABLE}', content_rowid='id')",
+    f"CREATE TRIGGER {SEARCH_TABLE}_ai AFTER INSERT ON {SEARCH_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    f"CREATE TRIGGER {SEARCH_TABLE}_ad AFTER DELETE ON {SEARCH_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) "
+    f"VALUES ('delete', old.id, old.title, old.body); END",
+    f"CREATE TRIGGER {SEARCH_TABLE}_au AFTER UPDATE ON {SEARCH_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) "
+    f"VALUES ('delete', old.id, old.title, old.body); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+]
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        # Index every word; the default InnoDB stopword list drops words such as "about" or "will"
+        schema_editor.execute("SET SESSION innodb_ft_enable_stopword = OFF")
+        schema_editor.execute(
+            f"ALTER TABLE {SEARCH_TABLE} ADD FULLTEXT INDEX searchdocument_fulltext (title, body)"
+        )
+    elif vendor == "sqlite":
+        for statement in SQLITE_FTS_SQL:
+            schema_editor.execute(statement)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "mysql":
+        schema_editor.execute(
+            f"ALTER TABLE {SEARCH_TABLE} DROP INDEX searchdocument_fulltext"
+        )
+    elif vendor == "sqlite":
+        for suffix in ("ai", "ad", "au"):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_cases", "0008_unique_execution_per_run"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchDocument",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("testcase", "Test Case"),
+                            ("user_story", "User Story"),
+                            ("test_suite", "Test Suite"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("title", models.CharField(max_length=200)),
+                ("body", models.TextField(blank=True)),
+                ("updated_date", models.DateTimeField(auto_now=True)),
+                (
+                    "owner",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_documents",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "test_suite",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_document",
+                        to="test_cases.testsuite",
+                    ),
+                ),
+                (
+                    "testcase",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_document",
+                        to="test_cases.testcase",
+                    ),
+                ),
+                (
+                    "user_story",
+                    models.OneToOneField(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="search_document",
+                        to="test_cases.userstory",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "Search Documents",
+                "indexes": [
+                    models.Index(fields=["owner", "kind"], name="search_owner_kind_idx")
+                ],
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.3 on 2026-10-18 12:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SEARCH_TABLE = "test_cases_searchdocument"
+FTS_TABLE = "test_cases_searchdocument_fts"
+
+SQLITE_TRIGGER_SQL = [
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai AFTER INSERT ON {SEARCH_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ad AFTER DELETE ON {SEARCH_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) "
+    f"VALUES ('delete', old.id, old.title, old.body); END",
+    f"CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_au AFTER UPDATE ON {SEARCH_TABLE} BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, body) "
+    f"VALUES ('delete', old.id, old.title, old.body); "
+    f"INSERT INTO {FTS_TABLE}(rowid, title, body) VALUES (new.id, new.title, new.body); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+
+def restore_sqlite_fts_triggers(apps, schema_editor):
+    """SQLite adds unique columns by rebuilding the table, which drops its triggers"""
+    if schema_editor.connection.vendor == "sqlite":
+        for statement in SQLITE_TRIGGER_SQL:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_cases", "0009_searchdocument"),
+    ]
+
+    operations = [
+        # Reversing the field changes rebuilds the table as well
+        migrations.RunPython(migrations.RunPython.noop, restore_sqlite_fts_triggers),
+        migrations.AddField(
+            model_name="searchdocument",
+            name="epic",
+            field=models.OneToOneField(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="search_document",
+                to="test_cases.epic",
+            ),
+        ),
+        migrations.AddField(
+            model_name="searchdocument",
+            name="project",
+            field=models.OneToOneField(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="search_document",
+                to="test_cases.project",
+            ),
+        ),
+        migrations.AddField(
+            model_name="searchdocument",
+            name="test_run",
+            field=models.OneToOneField(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="search_document",
+                to="test_cases.testrun",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="searchdocument",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("project", "Project"),
+                    ("epic", "Epic"),
+                    ("user_story", "User Story"),
+                    ("testcase", "Test Case"),
+                    ("test_run", "Test Run"),
+                    ("test_suite", "Test Suite"),
+                ],
+                max_length=20,
+            ),
+        ),
+        migrations.RunPython(restore_sqlite_fts_triggers, migrations.RunPython.noop),
+    ]
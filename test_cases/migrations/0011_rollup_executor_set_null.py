@@ -0,0 +1,27 @@
+# Generated by Django 5.2.3 on 2026-10-18 13:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("test_cases", "0010_search_all_entities"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="executiondailyrollup",
+            name="executor",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="execution_rollups",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
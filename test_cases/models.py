@@ -1,9 +1,43 @@
-from django.db import models
+from collections import Counter
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Coalesce, TruncDate
 from django.contrib.auth.models import User
 from django.utils import timezone
 
 # Create your models here.
 
+EXECUTION_SUMMARY_STATUSES = ['passed', 'failed', 'skipped', 'blocked', 'in_progress', 'not_executed']
+
+
+def build_execution_summary(status_counts):
+    """
+    Build a test run execution summary from a {status: count} mapping.
+    Statuses missing from the mapping are counted as zero.
+    """
+    summary = {status: status_counts.get(status, 0) for status in EXECUTION_SUMMARY_STATUSES}
+
+    total = sum(summary.values())
+    summary['total'] = total
+
+    # Calculate percentages
+    if total > 0:
+        summary['passed_percentage'] = round((summary['passed'] / total) * 100, 1)
+        summary['failed_percentage'] = round((summary['failed'] / total) * 100, 1)
+        summary['skipped_percentage'] = round((summary['skipped'] / total) * 100, 1)
+        summary['blocked_percentage'] = round((summary['blocked'] / total) * 100, 1)
+    else:
+        summary['passed_percentage'] = 0
+        summary['failed_percentage'] = 0
+        summary['skipped_percentage'] = 0
+        summary['blocked_percentage'] = 0
+
+    # Pass rate over executed tests only, as in the execution reports
+    executed = summary['passed'] + summary['failed'] + summary['skipped'] + summary['blocked']
+    summary['pass_rate'] = round((summary['passed'] / executed) * 100, 1) if executed > 0 else 0
+
+    return summary
+
 class Project(models.Model):
     STATUS_CHOICES = [
         ('active', 'Active'),
@@ -20,6 +54,9 @@ class Project(models.Model):
     
     class Meta:
         ordering = ['-created_date']
+        indexes = [
+            models.Index(fields=['created_by', 'created_date'], name='project_owner_created_idx'),
+        ]
         
     def __str__(self):
         return self.name
@@ -42,6 +79,9 @@ class Epic(models.Model):
     
     class Meta:
         ordering = ['-created_date']
+        indexes = [
+            models.Index(fields=['project', 'created_date'], name='epic_project_created_idx'),
+        ]
         
     def __str__(self):
         return f"{self.project.name} - {self.name}"
@@ -77,6 +117,9 @@ class UserStory(models.Model):
     class Meta:
         ordering = ['-created_date']
         verbose_name_plural = "User Stories"
+        indexes = [
+            models.Index(fields=['epic', 'created_date'], name='story_epic_created_idx'),
+        ]
         
     def __str__(self):
         return f"{self.epic.project.name} - {self.epic.name} - {self.name}"
@@ -117,13 +160,46 @@ class TestCase(models.Model):
     created_date = models.DateTimeField(default=timezone.now)
     updated_date = models.DateTimeField(auto_now=True)
     last_executed = models.DateTimeField(null=True, blank=True)
+
+    # Denormalized from user_story.epic.project so ownership filters are single-column predicates
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name='test_cases')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name='owned_testcases')
     
     class Meta:
         ordering = ['-created_date']
+        indexes = [
+            models.Index(fields=['user_story', 'created_date'], name='testcase_story_created_idx'),
+            models.Index(fields=['owner', 'created_date'], name='testcase_owner_created_idx'),
+            models.Index(fields=['project', 'created_date'], name='testcase_project_created_idx'),
+        ]
         
     def __str__(self):
         return f"{self.user_story.epic.project.name} - {self.user_story.name} - {self.name}"
 
+    def save(self, *args, **kwargs):
+        self.sync_ownership()
+        super().save(*args, **kwargs)
+
+    def sync_ownership(self):
+        """Copy project and owner from the user story's epic"""
+        if self.user_story_id is None:
+            return
+        self.project_id, self.owner_id = UserStory.objects.filter(pk=self.user_story_id).values_list(
+            'epic__project_id', 'epic__project__created_by_id'
+        ).get()
+
+    @staticmethod
+    def relocate(testcases, project_id, owner_id):
+        """
+        Point the denormalized project and owner of the given test cases and
+        their executions at a new project, moving their daily rollups along.
+        """
+        with transaction.atomic():
+            executions = TestExecution.objects.filter(testcase__in=testcases.values('pk'))
+            ExecutionDailyRollup.apply_deltas(ExecutionDailyRollup.get_relocation_deltas(executions, project_id))
+            executions.update(project_id=project_id, owner_id=owner_id)
+            testcases.update(project_id=project_id, owner_id=owner_id)
+
 
 class TestSuite(models.Model):
     name = models.CharField(max_length=200)
@@ -135,28 +211,50 @@ class TestSuite(models.Model):
     class Meta:
         ordering = ['-created_date']
         verbose_name_plural = "Test Suites"
+        indexes = [
+            models.Index(fields=['created_by', 'created_date'], name='suite_owner_created_idx'),
+        ]
     
     def __str__(self):
         return self.name
 
     def get_test_case_statistics(self):
         """Get statistics about test cases in this suite"""
-        test_cases = self.test_cases.all()
-        
-        stats = {
-            'total': test_cases.count(),
-            'critical': test_cases.filter(priority='critical').count(),
-            'high': test_cases.filter(priority='high').count(),
-            'medium': test_cases.filter(priority='medium').count(),
-            'low': test_cases.filter(priority='low').count(),
-            'automated': test_cases.filter(is_automated=True).count(),
-            'manual': test_cases.filter(is_automated=False).count(),
-            'ready': test_cases.filter(status='ready').count(),
-            'draft': test_cases.filter(status='draft').count(),
-            'blocked': test_cases.filter(status='blocked').count(),
-        }
-        
-        return stats
+        return TestSuite.get_statistics_for_suites([self.pk])[self.pk]
+
+    @classmethod
+    def get_statistics_for_suites(cls, test_suites):
+        """
+        Get test case statistics for several suites from a single
+        GROUP BY suite aggregation over the suite/test case join table.
+        Accepts TestSuite instances or ids and returns {suite_id: stats}.
+        """
+        suite_ids = [suite.pk if isinstance(suite, TestSuite) else suite for suite in test_suites]
+        stat_names = [
+            'total', 'critical', 'high', 'medium', 'low',
+            'automated', 'manual', 'ready', 'draft', 'blocked',
+        ]
+        statistics = {suite_id: dict.fromkeys(stat_names, 0) for suite_id in suite_ids}
+
+        if suite_ids:
+            rows = cls.test_cases.through.objects.filter(testsuite_id__in=suite_ids).values(
+                'testsuite_id'
+            ).annotate(
+                total=Count('id'),
+                critical=Count('id', filter=Q(testcase__priority='critical')),
+                high=Count('id', filter=Q(testcase__priority='high')),
+                medium=Count('id', filter=Q(testcase__priority='medium')),
+                low=Count('id', filter=Q(testcase__priority='low')),
+                automated=Count('id', filter=Q(testcase__is_automated=True)),
+                manual=Count('id', filter=Q(testcase__is_automated=False)),
+                ready=Count('id', filter=Q(testcase__status='ready')),
+                draft=Count('id', filter=Q(testcase__status='draft')),
+                blocked=Count('id', filter=Q(testcase__status='blocked')),
+            ).order_by()
+            for row in rows:
+                statistics[row.pop('testsuite_id')] = row
+
+        return statistics
 
 
 class TestRun(models.Model):
@@ -175,39 +273,67 @@ class TestRun(models.Model):
     updated_date = models.DateTimeField(auto_now=True)
     scheduled_date = models.DateTimeField(null=True, blank=True)
 
+    # Denormalized per-status execution counters, maintained by the
+    # TestExecution signal handlers and rebuilt by `rebuild_run_counters`
+    passed_count = models.IntegerField(default=0, editable=False)
+    failed_count = models.IntegerField(default=0, editable=False)
+    skipped_count = models.IntegerField(default=0, editable=False)
+    blocked_count = models.IntegerField(default=0, editable=False)
+    in_progress_count = models.IntegerField(default=0, editable=False)
+    not_executed_count = models.IntegerField(default=0, editable=False)
+
     class Meta:
         ordering = ['-created_date']
         verbose_name_plural = "Test Runs"
+        indexes = [
+            models.Index(fields=['created_by', 'created_date'], name='testrun_owner_created_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
     def get_execution_summary(self):
-        summary = {
-            'passed': self.test_executions.filter(status='passed').count(),
-            'failed': self.test_executions.filter(status='failed').count(),
-            'skipped': self.test_executions.filter(status='skipped').count(),
-            'blocked': self.test_executions.filter(status='blocked').count(),
-            'in_progress': self.test_executions.filter(status='in_progress').count(),
-            'not_executed': self.test_executions.filter(status='not_executed').count(),
-        }
-
-        total = sum(summary.values())
-        summary['total'] = total
-
-        # Calculate percentages
-        if total > 0:
-            summary['passed_percentage'] = round((summary['passed'] / total) * 100, 1)
-            summary['failed_percentage'] = round((summary['failed'] / total) * 100, 1)
-            summary['skipped_percentage'] = round((summary['skipped'] / total) * 100, 1)
-            summary['blocked_percentage'] = round((summary['blocked'] / total) * 100, 1)
-        else:
-            summary['passed_percentage'] = 0
-            summary['failed_percentage'] = 0
-            summary['skipped_percentage'] = 0
-            summary['blocked_percentage'] = 0
-
-        return summary
+        """Summary read from the denormalized counters, without touching executions"""
+        return build_execution_summary(self.get_status_counts())
+
+    def get_status_counts(self):
+        return {status: getattr(self, f'{status}_count') for status in EXECUTION_SUMMARY_STATUSES}
+
+    @classmethod
+    def apply_execution_count_deltas(cls, deltas):
+        """
+        Atomically adjust the per-status counters.
+        `deltas` maps (test_run_id, status) to the signed change in executions.
+        """
+        run_deltas = {}
+        for (run_id, status), delta in deltas.items():
+            if delta and status in EXECUTION_SUMMARY_STATUSES:
+                run_deltas.setdefault(run_id, {})[status] = delta
+
+        for run_id, status_deltas in run_deltas.items():
+            cls.objects.filter(pk=run_id).update(**{
+                f'{status}_count': F(f'{status}_count') + delta
+                for status, delta in status_deltas.items()
+            })
+
+    @classmethod
+    def get_execution_summaries(cls, test_runs):
+        """
+        Summarize several test runs by counting their executions with a
+        single grouped query, bypassing the denormalized counters.
+        Accepts TestRun instances or ids and returns {test_run_id: summary}.
+        """
+        run_ids = [run.pk if isinstance(run, TestRun) else run for run in test_runs]
+        status_counts = {run_id: {} for run_id in run_ids}
+
+        if run_ids:
+            rows = TestExecution.objects.filter(test_run_id__in=run_ids).order_by().values(
+                'test_run_id', 'status'
+            ).annotate(count=Count('id'))
+            for row in rows:
+                status_counts[row['test_run_id']][row['status']] = row['count']
+
+        return {run_id: build_execution_summary(counts) for run_id, counts in status_counts.items()}
 
 class TestExecution(models.Model):
     STATUS_CHOICES = [
@@ -228,13 +354,184 @@ class TestExecution(models.Model):
     execution_time_minutes = models.PositiveIntegerField(null=True, blank=True)
     notes = models.TextField(blank=True)
 
+    # Denormalized from testcase so ownership filters are single-column predicates
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name='test_executions')
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, editable=False, related_name='owned_test_executions')
+
+    # Fields feeding the denormalized TestRun counters and daily rollups
+    TRACKED_FIELDS = ('test_run_id', 'status', 'project_id', 'executor_id', 'execution_date', 'execution_time_minutes')
+
     class Meta:
         ordering = ['testcase__priority', 'execution_date']
         verbose_name_plural = "Test Executions"
+        indexes = [
+            models.Index(fields=['test_run', 'status'], name='execution_run_status_idx'),
+            models.Index(fields=['owner', 'execution_date'], name='execution_owner_date_idx'),
+            models.Index(fields=['owner', 'status'], name='execution_owner_status_idx'),
+            models.Index(fields=['owner', 'executor'], name='execution_owner_executor_idx'),
+            models.Index(fields=['project', 'execution_date'], name='execution_project_date_idx'),
+            models.Index(fields=['executor', 'execution_date'], name='execution_executor_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['testcase', 'test_run'], name='unique_execution_per_run'),
+        ]
 
     def __str__(self):
         return f"{self.test_run.name} - {self.testcase.name} - {self.get_status_display()}"
 
+    def save(self, *args, **kwargs):
+        self.sync_ownership()
+        # The signal handlers adjust the run counters; keep them in the same transaction as the row
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    def sync_ownership(self):
+        """Copy project and owner from the test case"""
+        if self.testcase_id is None:
+            return
+        self.project_id, self.owner_id = TestCase.objects.filter(pk=self.testcase_id).values_list(
+            'project_id', 'owner_id'
+        ).get()
+
+    def get_tracked_values(self):
+        return {field: getattr(self, field) for field in self.TRACKED_FIELDS}
+
+    @staticmethod
+    def get_count_deltas(removed=(), added=()):
+        """
+        Build TestRun counter deltas from tracked value dicts of removed and
+        added executions (an update is a removal of the old state plus an
+        addition of the new one).
+        """
+        deltas = Counter()
+        for values in removed:
+            deltas[(values['test_run_id'], values['status'])] -= 1
+        for values in added:
+            deltas[(values['test_run_id'], values['status'])] += 1
+        return deltas
+
+
+class ExecutionDailyRollup(models.Model):
+    """
+    Executions per (project, executor, day, status) with execution time sums.
+    Maintained incrementally by the TestExecution signal handlers and rebuilt
+    by `rebuild_execution_rollups`; executions without an execution date are
+    not rolled up.
+    """
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='execution_rollups')
+    # Deleted executors' buckets are merged into the executor-less ones first (see signals.py)
+    executor = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='execution_rollups')
+    day = models.DateField()
+    status = models.CharField(max_length=20, choices=TestExecution.STATUS_CHOICES)
+    execution_count = models.IntegerField(default=0)
+    timed_count = models.IntegerField(default=0)
+    total_time_minutes = models.BigIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-day']
+        verbose_name_plural = "Execution Daily Rollups"
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'executor', 'day', 'status'], name='unique_execution_rollup_bucket'),
+        ]
+        indexes = [
+            models.Index(fields=['project', 'day'], name='rollup_project_day_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} - {self.day} - {self.status}: {self.execution_count}"
+
+    @staticmethod
+    def get_bucket(values):
+        """Rollup key for tracked execution values, or None if it is not rolled up"""
+        if values['project_id'] is None or values['execution_date'] is None:
+            return None
+        day = timezone.localdate(values['execution_date'])
+        return (values['project_id'], values['executor_id'], day, values['status'])
+
+    @classmethod
+    def get_deltas(cls, removed=(), added=()):
+        """
+        Build rollup deltas from tracked execution values:
+        {bucket: [execution_count, timed_count, total_time_minutes]}.
+        """
+        deltas = {}
+        for values, sign in [(values, -1) for values in removed] + [(values, 1) for values in added]:
+            bucket = cls.get_bucket(values)
+            if bucket is None:
+                continue
+            delta = deltas.setdefault(bucket, [0, 0, 0])
+            delta[0] += sign
+            if values['execution_time_minutes'] is not None:
+                delta[1] += sign
+                delta[2] += sign * values['execution_time_minutes']
+        return {bucket: delta for bucket, delta in deltas.items() if any(delta)}
+
+    @classmethod
+    def get_relocation_deltas(cls, executions, project_id):
+        """Deltas moving the rollups of the given executions to another project"""
+        rows = executions.filter(execution_date__isnull=False).exclude(project_id=project_id).order_by().annotate(
+            day=TruncDate('execution_date')
+        ).values('project_id', 'executor_id', 'day', 'status').annotate(
+            count=Count('id'),
+            timed=Count('execution_time_minutes'),
+            minutes=Coalesce(Sum('execution_time_minutes'), 0),
+        )
+
+        deltas = {}
+        for row in rows:
+            for bucket_project_id, sign in [(row['project_id'], -1), (project_id, 1)]:
+                if bucket_project_id is None:
+                    continue
+                bucket = (bucket_project_id, row['executor_id'], row['day'], row['status'])
+                delta = deltas.setdefault(bucket, [0, 0, 0])
+                delta[0] += sign * row['count']
+                delta[1] += sign * row['timed']
+                delta[2] += sign * row['minutes']
+        return {bucket: delta for bucket, delta in deltas.items() if any(delta)}
+
+    @classmethod
+    def merge_executor_buckets(cls, executor_id):
+        """
+        Fold the buckets of an executor into the matching executor-less
+        buckets, as its executions lose their executor when it is deleted.
+        """
+        buckets = cls.objects.filter(executor_id=executor_id)
+        with transaction.atomic():
+            cls.apply_deltas({
+                (row['project_id'], None, row['day'], row['status']):
+                    [row['execution_count'], row['timed_count'], row['total_time_minutes']]
+                for row in buckets.select_for_update().exclude(execution_count=0).values(
+                    'project_id', 'day', 'status', 'execution_count', 'timed_count', 'total_time_minutes'
+                )
+            })
+            buckets.delete()
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """
+        Atomically add the deltas to their buckets, creating missing buckets.
+        A bucket is only created to add executions: one missing when its
+        executions are removed went away with its project or executor.
+        """
+        for (project_id, executor_id, day, status), (count, timed, minutes) in deltas.items():
+            bucket = cls.objects.filter(project_id=project_id, executor_id=executor_id, day=day, status=status)
+            updates = {
+                'execution_count': F('execution_count') + count,
+                'timed_count': F('timed_count') + timed,
+                'total_time_minutes': F('total_time_minutes') + minutes,
+            }
+            if bucket.update(**updates) or count <= 0:
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(
+                        project_id=project_id, executor_id=executor_id, day=day, status=status,
+                        execution_count=count, timed_count=timed, total_time_minutes=minutes,
+                    )
+            except IntegrityError:
+                # Another writer created the bucket first
+                bucket.update(**updates)
+
 
 class TestExecutionStep(models.Model):
     STATUS_CHOICES = [
@@ -258,4 +555,155 @@ class TestExecutionStep(models.Model):
         verbose_name_plural = "Test Execution Steps"
     
     def __str__(self):
-        return f"{self.test_execution.testcase.name} - Step {self.step_number}"
\ No newline at end of file
+        return f"{self.test_execution.testcase.name} - Step {self.step_number}"
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class BackgroundJob(models.Model):
+    KIND_CHOICES = [
+        ('execution_export', 'Execution Export'),
+        ('execution_pdf', 'Execution PDF Report'),
+        ('testcase_import', 'Test Case Import'),
+    ]
+
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+        ('cancelled', 'Cancelled'),
+    ]
+
+    FINISHED_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    params = models.JSONField(default=dict, blank=True)
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='background_jobs')
+    progress = models.PositiveSmallIntegerField(default=0)
+    progress_message = models.CharField(max_length=255, blank=True)
+    cancel_requested = models.BooleanField(default=False)
+    input_file = models.FileField(upload_to='jobs/inputs/%Y/%m/%d/', blank=True)
+    result_file = models.FileField(upload_to='jobs/results/%Y/%m/%d/', blank=True)
+    result = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    created_date = models.DateTimeField(default=timezone.now)
+    started_date = models.DateTimeField(null=True, blank=True)
+    finished_date = models.DateTimeField(null=True, blank=True)
+    updated_date = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ['-created_date']
+        verbose_name_plural = "Background Jobs"
+        indexes = [
+            models.Index(fields=['status', 'created_date'], name='job_status_created_idx'),
+            models.Index(fields=['created_by', 'created_date'], name='job_owner_created_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in self.FINISHED_STATUSES
+
+    @classmethod
+    def claim_next(cls, worker_name):
+        """
+        Claim the oldest queued job for this worker. The conditional UPDATE
+        guarantees that only one worker wins a job even when several poll
+        the queue at once.
+        """
+        candidates = cls.objects.filter(status='queued').order_by('created_date', 'id').values_list('id', flat=True)
+        for job_id in candidates[:10]:
+            now = timezone.now()
+            claimed = cls.objects.filter(pk=job_id, status='queued').update(
+                status='running', worker=worker_name, started_date=now, updated_date=now
+            )
+            if claimed:
+                return cls.objects.get(pk=job_id)
+        return None
+
+    def report_progress(self, done, total=None, message=''):
+        """
+        Record progress as a percentage of total. The same UPDATE checks the
+        cancel flag, raising JobCancelled once cancellation was requested.
+        """
+        progress = min(100, int(done * 100 / total)) if total else self.progress
+        updated = BackgroundJob.objects.filter(pk=self.pk, cancel_requested=False).update(
+            progress=progress, progress_message=message[:255], updated_date=timezone.now()
+        )
+        if not updated:
+            raise JobCancelled(f"Job {self.pk} was cancelled")
+        self.progress = progress
+        self.progress_message = message
+
+    def request_cancel(self):
+        """Cancel a queued job immediately; ask a running job to stop at its next progress report"""
+        if BackgroundJob.objects.filter(pk=self.pk, status='queued').update(
+            status='cancelled', cancel_requested=True, finished_date=timezone.now()
+        ):
+            return
+        BackgroundJob.objects.filter(pk=self.pk, status='running').update(cancel_requested=True)
+
+    def finish(self, status, result=None, error=''):
+        now = timezone.now()
+        updates = {'status': status, 'finished_date': now, 'updated_date': now, 'error': error}
+        if status == 'succeeded':
+            updates['progress'] = 100
+        if result is not None:
+            updates['result'] = result
+        if self.result_file:
+            updates['result_file'] = self.result_file.name
+        BackgroundJob.objects.filter(pk=self.pk).update(**updates)
+        for field, value in updates.items():
+            setattr(self, field, value)
+
+
+class SearchDocument(models.Model):
+    """
+    Denormalized full-text search row of one searchable object: its name as
+    title, its description and the names of its ancestors as body. Kept up
+    to date by the signal handlers and the bulk writers through
+    test_cases.search, and full-text indexed by a MySQL FULLTEXT index or,
+    on SQLite, an FTS5 table maintained by triggers.
+    """
+    KIND_CHOICES = [
+        ('project', 'Project'),
+        ('epic', 'Epic'),
+        ('user_story', 'User Story'),
+        ('testcase', 'Test Case'),
+        ('test_run', 'Test Run'),
+        ('test_suite', 'Test Suite'),
+    ]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    owner = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='search_documents')
+    title = models.CharField(max_length=200)
+    body = models.TextField(blank=True)
+    updated_date = models.DateTimeField(auto_now=True)
+
+    # The indexed object, named after its kind; deleting it deletes the document
+    project = models.OneToOneField(Project, on_delete=models.CASCADE, null=True, blank=True, related_name='search_document')
+    epic = models.OneToOneField(Epic, on_delete=models.CASCADE, null=True, blank=True, related_name='search_document')
+    test_run = models.OneToOneField(TestRun, on_delete=models.CASCADE, null=True, blank=True, related_name='search_document')
+    testcase = models.OneToOneField(TestCase, on_delete=models.CASCADE, null=True, blank=True, related_name='search_document')
+    user_story = models.OneToOneField(UserStory, on_delete=models.CASCADE, null=True, blank=True, related_name='search_document')
+    test_suite = models.OneToOneField(TestSuite, on_delete=models.CASCADE, null=True, blank=True, related_name='search_document')
+
+    class Meta:
+        verbose_name_plural = "Search Documents"
+        indexes = [
+            models.Index(fields=['owner', 'kind'], name='search_owner_kind_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.title}"
+
+    @property
+    def object_id(self):
+        return getattr(self, f'{self.kind}_id')
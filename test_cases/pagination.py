@@ -0,0 +1,248 @@
+import base64
+import binascii
+import hashlib
+import json
+import operator
+from collections.abc import Sequence
+from datetime import date
+from functools import reduce
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import QueryDict
+from django.utils.functional import cached_property
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class CursorPage(Sequence):
+    """
+    One page of a keyset paginated queryset. Mirrors the parts of
+    django.core.paginator.Page the templates use, plus query strings for
+    the first/previous/next links that keep the current filters.
+    """
+
+    def __init__(self, object_list, paginator, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} items>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+    def first_query(self):
+        return self.paginator.build_query()
+
+    def next_query(self):
+        return self.paginator.build_query(self.next_cursor)
+
+    def previous_query(self):
+        return self.paginator.build_query(self.previous_cursor)
+
+
+class CursorPaginator:
+    """
+    Keyset paginator: pages are fetched with a WHERE on the sort key instead
+    of an OFFSET, so every page costs the same regardless of depth.
+
+    ordering is a sequence of field or annotation names ('-execution_date',
+    '-id'); the last field must be unique. Only the leading field may be
+    nullable, and NULLs are expected to sort last on descending order and
+    first on ascending order, which is how MySQL and SQLite order them
+    natively.
+
+    The total is optional: count() is only run when a template asks for it,
+    and is cached for count_timeout seconds when count_cache_key is given.
+    """
+
+    cursor_query_param = 'cursor'
+
+    def __init__(self, queryset, per_page, ordering, query_params=None, count_cache_key=None, count_timeout=300):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = [(field.lstrip('-'), field.startswith('-')) for field in ordering]
+        self.query_params = query_params.copy() if query_params is not None else None
+        self.count_cache_key = count_cache_key
+        self.count_timeout = count_timeout
+
+        # Annotated keys (e.g. a search relevance) are read from the attribute of the same name
+        annotations = queryset.query.annotations
+        self.fields = [
+            annotations[name].output_field if name in annotations else queryset.model._meta.get_field(name)
+            for name, _ in self.ordering
+        ]
+        self.key_attributes = [
+            name if name in annotations else field.attname
+            for (name, _), field in zip(self.ordering, self.fields)
+        ]
+
+    @cached_property
+    def count(self):
+        if not self.count_cache_key:
+            return self.queryset.count()
+
+        filters = '' if self.query_params is None else self.build_query()
+        digest = hashlib.md5(filters.encode()).hexdigest()
+        return cache.get_or_set(f'{self.count_cache_key}:{digest}', self.queryset.count, self.count_timeout)
+
+    def get_page(self, cursor=None):
+        """Return the page after/before the given cursor; bad cursors fall back to the first page"""
+        if cursor is None and self.query_params is not None:
+            cursor = self.query_params.get(self.cursor_query_param)
+
+        try:
+            position = self.decode_cursor(cursor) if cursor else None
+        except InvalidCursor:
+            position = None
+
+        if position is None:
+            return self._page_after(None, has_previous=False)
+        direction, values = position
+        if direction == 'prev':
+            return self._page_before(values)
+        return self._page_after(values, has_previous=True)
+
+    def _page_after(self, values, has_previous):
+        queryset = self.queryset.order_by(*self._order_by(reverse=False))
+        if values is not None:
+            queryset = queryset.filter(self._seek_filter(values, reverse=False))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_next = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+
+        return CursorPage(
+            rows, self,
+            next_cursor=self.encode_cursor('next', rows[-1]) if has_next else None,
+            previous_cursor=self.encode_cursor('prev', rows[0]) if has_previous and rows else None,
+        )
+
+    def _page_before(self, values):
+        queryset = self.queryset.order_by(*self._order_by(reverse=True))
+        queryset = queryset.filter(self._seek_filter(values, reverse=True))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_previous = len(rows) > self.per_page
+        rows = rows[:self.per_page][::-1]
+
+        if not rows:
+            return self._page_after(None, has_previous=False)
+
+        return CursorPage(
+            rows, self,
+            next_cursor=self.encode_cursor('next', rows[-1]),
+            previous_cursor=self.encode_cursor('prev', rows[0]) if has_previous else None,
+        )
+
+    def _order_by(self, reverse):
+        return [
+            f'{"-" if descending != reverse else ""}{name}'
+            for name, descending in self.ordering
+        ]
+
+    def _seek_filter(self, values, reverse):
+        """
+        Build the WHERE clause selecting rows strictly after `values` in the
+        (possibly reversed) ordering, as an OR of equality prefixes.
+        """
+        branches = []
+        equal_prefix = Q()
+
+        for (name, descending), field, value in zip(self.ordering, self.fields, values):
+            # NULLs come last when walking forwards on a descending key and
+            # first when walking backwards
+            forwards = descending != reverse
+            if value is None:
+                if not forwards:
+                    branches.append(equal_prefix & Q(**{f'{name}__isnull': False}))
+                equal_prefix &= Q(**{f'{name}__isnull': True})
+                continue
+
+            lookup = 'lt' if forwards else 'gt'
+            step = Q(**{f'{name}__{lookup}': value})
+            if forwards and field.null:
+                step |= Q(**{f'{name}__isnull': True})
+            branches.append(equal_prefix & step)
+            equal_prefix &= Q(**{name: value})
+
+        return reduce(operator.or_, branches) if branches else Q(pk__in=[])
+
+    def get_key_values(self, obj):
+        if isinstance(obj, dict):
+            return [obj[name] for name, _ in self.ordering]
+        return [getattr(obj, attribute) for attribute in self.key_attributes]
+
+    def rows_after(self, obj):
+        """Queryset of the rows that come after obj in this ordering"""
+        return self.queryset.filter(self._seek_filter(self.get_key_values(obj), reverse=False))
+
+    def encode_cursor(self, direction, obj):
+        values = self.get_key_values(obj)
+        # Dates are written with full precision, the seek compares for equality
+        payload = json.dumps(
+            {'d': direction, 'v': values},
+            default=lambda value: value.isoformat() if isinstance(value, date) else str(value),
+            separators=(',', ':'),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + '=' * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction, raw_values = payload['d'], payload['v']
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise InvalidCursor(cursor)
+
+        if direction not in ('next', 'prev') or not isinstance(raw_values, list) or len(raw_values) != len(self.fields):
+            raise InvalidCursor(cursor)
+
+        try:
+            values = [None if raw is None else field.to_python(raw) for field, raw in zip(self.fields, raw_values)]
+        except ValidationError:
+            raise InvalidCursor(cursor)
+        return direction, values
+
+    def build_query(self, cursor=None):
+        """Current query string with the cursor replaced (or removed)"""
+        params = self.query_params.copy() if self.query_params is not None else QueryDict(mutable=True)
+        params.pop(self.cursor_query_param, None)
+        params.pop('page', None)
+        if cursor:
+            params[self.cursor_query_param] = cursor
+        return params.urlencode()
+
+
+def iterate_in_chunks(queryset, ordering, chunk_size=2000):
+    """
+    Iterate a large queryset in keyset ordered chunks of chunk_size rows.
+    Unlike QuerySet.iterator() this keeps memory flat on MySQL, whose driver
+    buffers the whole result set client side. values() querysets must
+    include the ordering fields.
+    """
+    paginator = CursorPaginator(queryset, chunk_size, ordering)
+    page = paginator.get_page()
+    while True:
+        yield from page.object_list
+        if not page.has_next():
+            break
+        page = paginator.get_page(page.next_cursor)
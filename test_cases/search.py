@@ -0,0 +1,217 @@
+"""
+Full-text search over SearchDocument rows.
+
+Every searchable object has one SearchDocument holding its name and the
+text it is found by. Documents are rebuilt by index_search_documents, which
+the signal handlers call for single saves and the bulk writers for their
+batches, and matched through the database's full-text index: MATCH ...
+AGAINST on MySQL and the FTS5 table of migration 0009 on SQLite. Other
+backends fall back to substring matching on the documents.
+"""
+import logging
+import re
+
+from django.db import connection, transaction
+from django.db.models import Count, F, FloatField, Q, Value, Window
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import RowNumber
+from django.urls import reverse
+
+from .models import Epic, Project, SearchDocument, TestCase, TestRun, TestSuite, UserStory
+from .pagination import iterate_in_chunks
+
+logger = logging.getLogger(__name__)
+
+INDEX_BATCH_SIZE = 1000
+
+# Per kind: the indexed model, the path to its owner and the fields joined
+# into the document body after the description
+SEARCH_SOURCES = {
+    'project': (Project, 'created_by', ('description',)),
+    'epic': (Epic, 'project__created_by', ('description', 'project__name')),
+    'user_story': (UserStory, 'epic__project__created_by', ('description', 'epic__name', 'epic__project__name')),
+    'testcase': (TestCase, 'owner', ('description', 'user_story__name', 'user_story__epic__name', 'project__name')),
+    'test_run': (TestRun, 'created_by', ('description',)),
+    'test_suite': (TestSuite, 'created_by', ('description',)),
+}
+
+FTS_TABLE = 'test_cases_searchdocument_fts'
+
+# InnoDB's default innodb_ft_min_token_size; shorter words are not indexed
+MYSQL_MIN_TERM_LENGTH = 3
+
+# Decimal places relevance is rounded to. Cursor pagination seeks on
+# relevance with equality, and a float score recomputed in the WHERE clause
+# is not guaranteed to match the one returned to the cursor to the last bit.
+# bm25() scores words found in most documents around 1e-6, so fewer places
+# would turn their ranking into ties.
+RELEVANCE_PRECISION = 9
+
+
+def index_search_documents(kind, objects):
+    """
+    Rebuild the search documents of the objects queryset, holding objects
+    of the given kind. Objects are read in keyset ordered chunks and each
+    batch of INDEX_BATCH_SIZE documents is replaced in one transaction.
+    Returns the number of documents written.
+    """
+    _, owner_path, body_paths = SEARCH_SOURCES[kind]
+    rows = objects.order_by().values('id', 'name', owner_path, *body_paths)
+
+    written = 0
+    batch = []
+    for row in iterate_in_chunks(rows, ('id',), INDEX_BATCH_SIZE):
+        batch.append(row)
+        if len(batch) >= INDEX_BATCH_SIZE:
+            written += _write_documents(kind, batch)
+            batch = []
+    if batch:
+        written += _write_documents(kind, batch)
+    return written
+
+
+def _write_documents(kind, rows):
+    _, owner_path, body_paths = SEARCH_SOURCES[kind]
+    with transaction.atomic():
+        SearchDocument.objects.filter(**{f'{kind}_id__in': [row['id'] for row in rows]}).delete()
+        SearchDocument.objects.bulk_create([
+            SearchDocument(
+                kind=kind,
+                owner_id=row[owner_path],
+                title=row['name'],
+                body='\n'.join(row[path] for path in body_paths if row[path]),
+                **{f'{kind}_id': row['id']}
+            )
+            for row in rows
+        ])
+    return len(rows)
+
+
+def parse_search_terms(query):
+    """Distinct lower-cased words of a search query, in order"""
+    return list(dict.fromkeys(re.findall(r'\w+', query.lower())))
+
+
+def match_documents(documents, query):
+    """
+    Filter the documents queryset to those containing every word of query
+    (as a word prefix) and annotate them with their `relevance`, higher
+    being better, rounded to RELEVANCE_PRECISION decimal places.
+    """
+    terms = parse_search_terms(query)
+    table = connection.ops.quote_name(SearchDocument._meta.db_table)
+
+    if connection.vendor == 'mysql':
+        terms = [term for term in terms if len(term) >= MYSQL_MIN_TERM_LENGTH]
+        if terms:
+            relevance = RawSQL(
+                f"ROUND(MATCH ({table}.title, {table}.body) AGAINST (%s IN BOOLEAN MODE), %s)",
+                [' '.join(f'+{term}*' for term in terms), RELEVANCE_PRECISION],
+                output_field=FloatField(),
+            )
+            return documents.annotate(relevance=relevance).filter(relevance__gt=0)
+
+    elif connection.vendor == 'sqlite' and terms:
+        fts = connection.ops.quote_name(FTS_TABLE)
+        expression = ' '.join(f'"{term}"*' for term in terms)
+        # bm25() is lower for better matches; title matches weigh more than body matches
+        relevance = RawSQL(
+            f"SELECT ROUND(-bm25({fts}, 5.0, 1.0), %s) FROM {fts} WHERE {fts} MATCH %s AND {fts}.rowid = {table}.id",
+            [RELEVANCE_PRECISION, expression],
+            output_field=FloatField(),
+        )
+        return documents.filter(
+            id__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [expression])
+        ).annotate(relevance=relevance)
+
+    # Only words too short for the index, or no full-text index on this backend
+    condition = Q()
+    for term in terms or [query.strip()]:
+        condition &= Q(title__icontains=term) | Q(body__icontains=term)
+    return documents.filter(condition).annotate(relevance=Value(1.0, output_field=FloatField()))
+
+
+def search_documents(objects, kind, query):
+    """
+    Documents of the objects queryset (of the given kind) that match query,
+    annotated with their relevance. Only the document and object ids are
+    loaded; paginate on ('-relevance', '-id') and load the objects of a
+    page with load_search_results.
+    """
+    documents = SearchDocument.objects.filter(**{f'{kind}__in': objects.order_by().values('pk')}).only('id', kind)
+    return match_documents(documents, query)
+
+
+def load_search_results(page, objects, kind):
+    """Replace the documents of a page by their objects, read from the objects queryset, in rank order"""
+    object_ids = [getattr(document, f'{kind}_id') for document in page.object_list]
+    found = objects.in_bulk(object_ids)
+    page.object_list = [found[object_id] for object_id in object_ids if object_id in found]
+    return page
+
+
+def filter_search_matches(objects, kind, query):
+    """Restrict the objects queryset to those matching query, keeping its ordering"""
+    matches = match_documents(SearchDocument.objects.filter(kind=kind), query)
+    return objects.filter(pk__in=matches.values(kind))
+
+
+def search_result_url(kind, object_id):
+    """Page a search result links to: the object's children, its execution page or its edit form"""
+    if kind == 'project':
+        return f"{reverse('test_cases:epic_list')}?project={object_id}"
+    if kind == 'epic':
+        return f"{reverse('test_cases:story_list')}?epic={object_id}"
+    if kind == 'user_story':
+        return f"{reverse('test_cases:testcase_list')}?story={object_id}"
+    if kind == 'testcase':
+        return reverse('test_cases:testcase_edit', args=[object_id])
+    if kind == 'test_run':
+        return reverse('test_cases:test_run_execute', args=[object_id])
+    return reverse('test_cases:test_suite_edit', args=[object_id])
+
+
+def serialize_search_result(document):
+    return {
+        'type': document.kind,
+        'id': document.object_id,
+        'title': document.title,
+        'relevance': document.relevance,
+        'url': search_result_url(document.kind, document.object_id),
+    }
+
+
+def search_top_results(owner, query, kinds, limit):
+    """
+    The `limit` best matches of each kind among the owner's documents and
+    the number of matches per kind, in two queries: one ranking every kind
+    with ROW_NUMBER() OVER (PARTITION BY kind) and one grouped count.
+    Returns {kind: {'count': int, 'results': [document, ...]}}
+    """
+    fields = ['id', 'kind', 'title', *SEARCH_SOURCES]
+    matches = match_documents(SearchDocument.objects.filter(owner=owner, kind__in=kinds), query)
+
+    top = {kind: {'count': 0, 'results': []} for kind in kinds}
+    for row in matches.order_by().values('kind').annotate(count=Count('id')):
+        top[row['kind']]['count'] = row['count']
+
+    ranked = matches.only(*fields).annotate(
+        rank=Window(RowNumber(), partition_by=F('kind'), order_by=[F('relevance').desc(), F('id').desc()])
+    ).filter(rank__lte=limit).order_by('kind', 'rank')
+    for document in ranked:
+        top[document.kind]['results'].append(document)
+    return top
+
+
+def rebuild_search_index(kinds=None):
+    """
+    Rebuild the search documents of every object of the given kinds (all
+    kinds by default). Returns {kind: documents written}.
+    """
+    written = {}
+    for kind in kinds or SEARCH_SOURCES:
+        model = SEARCH_SOURCES[kind][0]
+        SearchDocument.objects.filter(kind=kind).delete()
+        written[kind] = index_search_documents(kind, model.objects.all())
+        logger.info(f"Indexed {written[kind]} {kind} search documents")
+    return written
@@ -0,0 +1,250 @@
+import threading
+from contextlib import contextmanager
+
+from django.contrib.auth.models import User
+from django.db.models.signals import pre_delete, pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .cache import invalidate_user_data_on_commit
+from .models import Project, Epic, UserStory, TestCase, TestSuite, TestRun, TestExecution, ExecutionDailyRollup
+from .search import index_search_documents
+
+
+def apply_execution_changes(removed=(), added=()):
+    """Apply run counter and daily rollup deltas for removed and added execution states"""
+    TestRun.apply_execution_count_deltas(TestExecution.get_count_deltas(removed, added))
+    ExecutionDailyRollup.apply_deltas(ExecutionDailyRollup.get_deltas(removed, added))
+
+
+_tracking_state = threading.local()
+
+
+@contextmanager
+def execution_tracking_suspended():
+    """
+    Skip the per-row TestExecution counter and rollup handlers, for bulk
+    operations that apply aggregated deltas through apply_execution_changes.
+    """
+    previous = getattr(_tracking_state, 'suspended', False)
+    _tracking_state.suspended = True
+    try:
+        yield
+    finally:
+        _tracking_state.suspended = previous
+
+
+def is_execution_tracking_suspended():
+    return getattr(_tracking_state, 'suspended', False)
+
+
+def get_previous_value(sender, instance, field):
+    if instance._state.adding or instance.pk is None:
+        return None
+    return sender.objects.filter(pk=instance.pk).values_list(field, flat=True).first()
+
+
+@receiver(pre_save, sender=TestExecution)
+def capture_previous_execution_state(sender, instance, raw=False, **kwargs):
+    """
+    Remember the stored state of an execution before it is overwritten.
+    The row is locked so concurrent updates cannot double count a transition.
+    """
+    instance._previous_tracked_values = None
+    if raw or instance._state.adding or instance.pk is None or is_execution_tracking_suspended():
+        return
+
+    instance._previous_tracked_values = sender.objects.select_for_update().filter(
+        pk=instance.pk
+    ).order_by('pk').values(*sender.TRACKED_FIELDS).first()
+
+
+@receiver(post_save, sender=TestExecution)
+def track_execution_save(sender, instance, created, raw=False, **kwargs):
+    if raw or is_execution_tracking_suspended():
+        return
+
+    previous = getattr(instance, '_previous_tracked_values', None)
+    apply_execution_changes(removed=[previous] if previous else [], added=[instance.get_tracked_values()])
+
+
+@receiver(post_delete, sender=TestExecution)
+def track_execution_delete(sender, instance, **kwargs):
+    if is_execution_tracking_suspended():
+        return
+    apply_execution_changes(removed=[instance.get_tracked_values()])
+
+
+@receiver(pre_delete, sender=User)
+def merge_deleted_executor_rollups(sender, instance, **kwargs):
+    ExecutionDailyRollup.merge_executor_buckets(instance.pk)
+
+
+# Keep the denormalized project/owner keys consistent when the hierarchy changes
+
+@receiver(pre_save, sender=TestCase)
+def capture_previous_testcase_project(sender, instance, raw=False, **kwargs):
+    previous = None
+    if not raw and not instance._state.adding and instance.pk is not None:
+        previous = sender.objects.filter(pk=instance.pk).values_list('project_id', 'owner_id').first()
+    instance._previous_project_id, instance._previous_owner_id = previous or (None, None)
+
+
+@receiver(post_save, sender=TestCase)
+def relocate_moved_testcase(sender, instance, created, raw=False, **kwargs):
+    previous_project_id = getattr(instance, '_previous_project_id', None)
+    if raw or created or previous_project_id is None or previous_project_id == instance.project_id:
+        return
+
+    TestCase.relocate(TestCase.objects.filter(pk=instance.pk), instance.project_id, instance.owner_id)
+
+
+@receiver(pre_save, sender=UserStory)
+def capture_previous_story_epic(sender, instance, raw=False, **kwargs):
+    instance._previous_epic_id = None if raw else get_previous_value(sender, instance, 'epic_id')
+
+
+@receiver(post_save, sender=UserStory)
+def relocate_moved_story(sender, instance, created, raw=False, **kwargs):
+    previous_epic_id = getattr(instance, '_previous_epic_id', None)
+    if raw or created or previous_epic_id is None or previous_epic_id == instance.epic_id:
+        return
+
+    project_id, owner_id = Epic.objects.filter(pk=instance.epic_id).values_list(
+        'project_id', 'project__created_by_id'
+    ).get()
+    TestCase.relocate(TestCase.objects.filter(user_story=instance), project_id, owner_id)
+
+
+@receiver(pre_save, sender=Epic)
+def capture_previous_epic_project(sender, instance, raw=False, **kwargs):
+    instance._previous_project_id = None if raw else get_previous_value(sender, instance, 'project_id')
+
+
+@receiver(post_save, sender=Epic)
+def relocate_moved_epic(sender, instance, created, raw=False, **kwargs):
+    previous_project_id = getattr(instance, '_previous_project_id', None)
+    if raw or created or previous_project_id is None or previous_project_id == instance.project_id:
+        return
+
+    owner_id = Project.objects.filter(pk=instance.project_id).values_list('created_by_id', flat=True).get()
+    TestCase.relocate(TestCase.objects.filter(user_story__epic=instance), instance.project_id, owner_id)
+
+
+@receiver(pre_save, sender=Project)
+def capture_previous_project_owner(sender, instance, raw=False, **kwargs):
+    instance._previous_created_by_id = None if raw else get_previous_value(sender, instance, 'created_by_id')
+
+
+@receiver(post_save, sender=Project)
+def reassign_project_owner(sender, instance, created, raw=False, **kwargs):
+    previous_created_by_id = getattr(instance, '_previous_created_by_id', None)
+    if raw or created or previous_created_by_id is None or previous_created_by_id == instance.created_by_id:
+        return
+
+    TestCase.objects.filter(project=instance).update(owner_id=instance.created_by_id)
+    TestExecution.objects.filter(project=instance).update(owner_id=instance.created_by_id)
+
+
+# Keep the search documents in step with the searchable objects and the
+# ancestor names copied into them
+
+@receiver(pre_save, sender=Project)
+@receiver(pre_save, sender=Epic)
+@receiver(pre_save, sender=UserStory)
+def capture_previous_name(sender, instance, raw=False, **kwargs):
+    instance._previous_name = None if raw else get_previous_value(sender, instance, 'name')
+
+
+def is_renamed(instance):
+    previous_name = getattr(instance, '_previous_name', None)
+    return previous_name is not None and previous_name != instance.name
+
+
+@receiver(post_save, sender=TestCase)
+def index_testcase(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_search_documents('testcase', TestCase.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=TestSuite)
+def index_test_suite(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_search_documents('test_suite', TestSuite.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=TestRun)
+def index_test_run(sender, instance, raw=False, **kwargs):
+    if not raw:
+        index_search_documents('test_run', TestRun.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=UserStory)
+def index_story(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    index_search_documents('user_story', UserStory.objects.filter(pk=instance.pk))
+
+    previous_epic_id = getattr(instance, '_previous_epic_id', None)
+    if is_renamed(instance) or (previous_epic_id is not None and previous_epic_id != instance.epic_id):
+        index_search_documents('testcase', TestCase.objects.filter(user_story=instance))
+
+
+@receiver(post_save, sender=Epic)
+def index_epic(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    index_search_documents('epic', Epic.objects.filter(pk=instance.pk))
+
+    previous_project_id = getattr(instance, '_previous_project_id', None)
+    moved = previous_project_id is not None and previous_project_id != instance.project_id
+    if not (is_renamed(instance) or moved):
+        return
+    index_search_documents('user_story', UserStory.objects.filter(epic=instance))
+    index_search_documents('testcase', TestCase.objects.filter(user_story__epic=instance))
+
+
+@receiver(post_save, sender=Project)
+def index_project(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    index_search_documents('project', Project.objects.filter(pk=instance.pk))
+
+    previous_created_by_id = getattr(instance, '_previous_created_by_id', None)
+    reassigned = previous_created_by_id is not None and previous_created_by_id != instance.created_by_id
+    if not (is_renamed(instance) or reassigned):
+        return
+    index_search_documents('epic', Epic.objects.filter(project=instance))
+    index_search_documents('user_story', UserStory.objects.filter(epic__project=instance))
+    index_search_documents('testcase', TestCase.objects.filter(project=instance))
+
+
+# Invalidate the cached dashboards and reports of the users whose data an object is part of
+
+DATA_OWNERS = {
+    Project: lambda instance: [instance.created_by_id, getattr(instance, '_previous_created_by_id', None)],
+    Epic: lambda instance: Project.objects.filter(
+        pk__in=[instance.project_id, getattr(instance, '_previous_project_id', None)]
+    ).values_list('created_by_id', flat=True),
+    UserStory: lambda instance: Project.objects.filter(
+        epics__in=[instance.epic_id, getattr(instance, '_previous_epic_id', None)]
+    ).values_list('created_by_id', flat=True),
+    TestCase: lambda instance: [instance.owner_id, getattr(instance, '_previous_owner_id', None)],
+    TestRun: lambda instance: [instance.created_by_id],
+    TestSuite: lambda instance: [instance.created_by_id],
+    TestExecution: lambda instance: [instance.owner_id],
+}
+
+
+def invalidate_owner_cached_data(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Bulk operations suspending execution tracking invalidate once themselves
+    if sender is TestExecution and is_execution_tracking_suspended():
+        return
+    invalidate_user_data_on_commit(*DATA_OWNERS[sender](instance))
+
+
+# Connected per model: a receiver without a sender would disable fast deletes for every model
+for model in DATA_OWNERS:
+    post_save.connect(invalidate_owner_cached_data, sender=model, dispatch_uid=f'invalidate_{model._meta.label_lower}_save')
+    post_delete.connect(invalidate_owner_cached_data, sender=model, dispatch_uid=f'invalidate_{model._meta.label_lower}_delete')
@@ -1,3 +1,883 @@
-from django.test import TestCase
+import io
+import os
+import queue
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from itertools import product
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+import openpyxl
+import pandas as pd
+
+from . import cache as app_cache
+from . import jobs
+from . import models
+from . import search
+from . import utils
+from .pagination import CursorPaginator
+
+
+class QueryPlanRegressionTests(TestCase):
+    """
+    Capture the SQL issued by the hot views against a seeded database and fail
+    when a query against a large table falls back to a full table scan.
+    """
+
+    # Tables that grow with usage; small lookup tables are allowed to be scanned
+    GUARDED_TABLES = {
+        models.TestCase._meta.db_table,
+        models.TestExecution._meta.db_table,
+        models.ExecutionDailyRollup._meta.db_table,
+        models.SearchDocument._meta.db_table,
+    }
+
+    USERS = 3
+    STORIES_PER_USER = 4
+    CASES_PER_STORY = 25
+    RUNS_PER_USER = 4
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        cls.users = [User.objects.create_user(f'planner{i}', password='pw') for i in range(cls.USERS)]
+
+        for user in cls.users:
+            project = models.Project.objects.create(name=f'{user.username} project', created_by=user)
+            epic = models.Epic.objects.create(name=f'{user.username} epic', project=project, created_by=user)
+            stories = [
+                models.UserStory.objects.create(name=f'{user.username} story {i}', epic=epic, created_by=user)
+                for i in range(cls.STORIES_PER_USER)
+            ]
+
+            models.TestCase.objects.bulk_create([
+                models.TestCase(
+                    name=f'{story.name} case {i}',
+                    test_steps='Open the page and submit',
+                    expected_results='The page is submitted',
+                    priority=['low', 'medium', 'high', 'critical'][i % 4],
+                    user_story=story,
+                    project=project,
+                    owner=user,
+                    created_by=user,
+                )
+                for story in stories for i in range(cls.CASES_PER_STORY)
+            ])
+            testcases = list(models.TestCase.objects.filter(owner=user).order_by('pk'))
+
+            for run_index in range(cls.RUNS_PER_USER):
+                test_run = models.TestRun.objects.create(name=f'{user.username} run {run_index}', created_by=user)
+                models.TestExecution.objects.bulk_create([
+                    models.TestExecution(
+                        testcase=testcase,
+                        test_run=test_run,
+                        status=['passed', 'failed', 'blocked', 'not_executed'][i % 4],
+                        executor=user,
+                        project=project,
+                        owner=user,
+                        execution_date=now - timedelta(days=i % 30) if i % 4 != 3 else None,
+                        execution_time_minutes=i % 15,
+                    )
+                    for i, testcase in enumerate(testcases)
+                ])
+
+            cls.suite = models.TestSuite.objects.create(name=f'{user.username} suite', created_by=user)
+            cls.suite.test_cases.set(testcases[:50])
+
+        cls.user = cls.users[0]
+        cls.project = models.Project.objects.get(created_by=cls.user)
+        cls.epic = models.Epic.objects.get(project=cls.project)
+        cls.test_run = models.TestRun.objects.filter(created_by=cls.user).order_by('pk').first()
+        cls.suite = models.TestSuite.objects.get(created_by=cls.user)
+
+        models.ExecutionDailyRollup.objects.all().delete()
+        from .utils import rebuild_execution_rollups
+        rebuild_execution_rollups()
+        search.rebuild_search_index()
+
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute('ANALYZE')
+            elif connection.vendor == 'mysql':
+                for model in (models.TestCase, models.TestExecution, models.ExecutionDailyRollup):
+                    cursor.execute(f'ANALYZE TABLE {model._meta.db_table}')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def get_full_scans(self, sql):
+        """Return the plan lines that read a guarded table in full"""
+        with connection.cursor() as cursor:
+            if connection.vendor == 'sqlite':
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+                details = [row[-1] for row in cursor.fetchall()]
+                return [
+                    detail for detail in details
+                    if detail.startswith('SCAN ') and detail.split()[1] in self.GUARDED_TABLES
+                ]
+            if connection.vendor == 'mysql':
+                cursor.execute(f'EXPLAIN {sql}')
+                columns = [column[0] for column in cursor.description]
+                rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+                return [
+                    f"{row['table']}: type={row['type']} key={row['key']}" for row in rows
+                    if row['type'] == 'ALL' and row['table'] in self.GUARDED_TABLES
+                ]
+        self.skipTest(f'No query plan inspection for {connection.vendor}')
+
+    def assertNoFullScans(self, url, params=None, **headers):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url, params or {}, headers=headers)
+        self.assertEqual(response.status_code, 200, url)
+
+        offenders = []
+        for query in context.captured_queries:
+            sql = query['sql']
+            if not sql.lstrip().upper().startswith('SELECT'):
+                continue
+            scans = self.get_full_scans(sql)
+            if scans:
+                offenders.append(f'{sql}\n    -> ' + '\n    -> '.join(scans))
+
+        self.assertFalse(offenders, f'Full table scans while serving {url}:\n' + '\n'.join(offenders))
+
+    def test_dashboard(self):
+        self.assertNoFullScans(reverse('test_cases:dashboard'))
+
+    def test_testcase_list(self):
+        self.assertNoFullScans(reverse('test_cases:testcase_list'))
+        self.assertNoFullScans(reverse('test_cases:testcase_list'), {'project': self.project.pk})
+
+    def test_test_run_list(self):
+        self.assertNoFullScans(reverse('test_cases:test_run_list'))
+
+    def test_test_suite_list(self):
+        self.assertNoFullScans(reverse('test_cases:test_suite_list'))
+
+    def test_test_suite_stats(self):
+        self.assertNoFullScans(reverse('test_cases:test_suite_stats'), X_REQUESTED_WITH='XMLHttpRequest')
+
+    def test_test_execution_dashboard(self):
+        self.assertNoFullScans(reverse('test_cases:test_execution_dashboard'))
+
+    def test_test_execution_report(self):
+        self.assertNoFullScans(reverse('test_cases:test_execution_report'))
+        self.assertNoFullScans(reverse('test_cases:test_execution_report'), {
+            'project': self.project.pk,
+            'status': 'failed',
+            'date_from': (timezone.localdate() - timedelta(days=7)).isoformat(),
+        })
+
+        # Deep pages seek on (execution_date, id) instead of scanning an offset
+        response = self.client.get(reverse('test_cases:test_execution_report'))
+        page = response.context['executions']
+        for _ in range(3):
+            page = page.paginator.get_page(page.next_cursor)
+        self.assertNoFullScans(reverse('test_cases:test_execution_report'), {'cursor': page.next_cursor})
+
+    def test_test_execution_summary_data(self):
+        self.assertNoFullScans(reverse('test_cases:test_execution_summary_data'))
+        self.assertNoFullScans(reverse('test_cases:test_execution_summary_data'), {'project': self.project.pk})
+        self.assertNoFullScans(reverse('test_cases:test_execution_summary_data'), {'epic': self.epic.pk})
+
+    def test_test_execution_project_breakdown(self):
+        self.assertNoFullScans(reverse('test_cases:test_execution_project_breakdown'))
+
+    def test_test_execution_detail(self):
+        execution = models.TestExecution.objects.filter(test_run=self.test_run).order_by('-pk').first()
+        self.assertNoFullScans(reverse('test_cases:test_execution_detail', args=[execution.pk]))
+        self.assertNoFullScans(reverse('test_cases:test_execution_detail_ajax', args=[execution.pk]))
+
+    def test_search(self):
+        self.assertNoFullScans(reverse('test_cases:testcase_list'), {'search': 'planner0 case'})
+        self.assertNoFullScans(reverse('test_cases:story_list'), {'search': 'story'})
+        self.assertNoFullScans(reverse('test_cases:test_suite_list'), {'search': 'suite'})
+
+    def test_test_cases_by_filters(self):
+        self.assertNoFullScans(reverse('test_cases:get_test_cases_by_filters'), {'project_id': self.project.pk})
+
+
+class ImportValidationTests(SimpleTestCase):
+    """The vectorized import validator must agree with validate_testcase_data row for row"""
+
+    def test_frame_matches_row_validation(self):
+        texts = ['', '   ', 'abcd ', ' abcde ', '123456789', ' 1234567890 ', 'x' * 201]
+        priorities = ['', 'LOW', ' h', 'Critical ', 'med', 'urgent']
+        automated = ['', 'True', ' yes', 'Y', 'no', '0', 'maybe']
+        rows = [
+            {
+                'Test Case Name': name,
+                'Description': ' notes ',
+                'Test Steps': steps,
+                'Expected Results': results,
+                'Priority': priority,
+                'Is Automated': is_automated,
+            }
+            for name, steps, results, priority, is_automated
+            in product(texts, texts[::2], texts[1::2], priorities, automated)
+        ]
+        row_numbers = range(2, len(rows) + 2)
+        errors, valid_frame = utils.validate_testcase_frame(pd.DataFrame.from_records(rows, index=row_numbers))
+
+        for row_number, row in zip(row_numbers, rows):
+            is_valid, row_errors = utils.validate_testcase_data(row, row_number)
+            self.assertEqual(errors.get(row_number, []), row_errors, row)
+            self.assertEqual(row_number in valid_frame.index, is_valid, row)
+            if is_valid:
+                valid_row = valid_frame.loc[row_number]
+                self.assertEqual(valid_row['Test Case Name'], row['Test Case Name'].strip())
+                self.assertEqual(valid_row['Description'], 'notes')
+                self.assertEqual(valid_row['Priority'], utils.normalize_priority(row['Priority']))
+                self.assertEqual(valid_row['Is Automated'], utils.convert_boolean_value(row['Is Automated']))
+
+    def test_missing_columns_use_row_defaults(self):
+        frame = pd.DataFrame({'Test Case Name': ['Login works']}, index=[7])
+        errors, valid_frame = utils.validate_testcase_frame(frame)
+        self.assertEqual(errors[7], utils.validate_testcase_data({'Test Case Name': 'Login works'}, 7)[1])
+        self.assertTrue(valid_frame.empty)
+
+
+class ExecutionTrackingTestCase(TestCase):
+    """
+    A run with 10 failed executions over 40 test cases, and a check that the
+    denormalized run counters and daily rollups match the executions.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('recorder', password='pw')
+        project = models.Project.objects.create(name='Bulk project', created_by=cls.user)
+        epic = models.Epic.objects.create(name='Bulk epic', project=project, created_by=cls.user)
+        story = models.UserStory.objects.create(name='Bulk story', epic=epic, created_by=cls.user)
+        models.TestCase.objects.bulk_create([
+            models.TestCase(name=f'Bulk case {i}', user_story=story, project=project, owner=cls.user, created_by=cls.user)
+            for i in range(40)
+        ])
+        cls.testcases = models.TestCase.objects.filter(owner=cls.user)
+        cls.test_run = models.TestRun.objects.create(name='Bulk run', created_by=cls.user)
+        for testcase in cls.testcases[:10]:
+            models.TestExecution.objects.create(
+                testcase=testcase, test_run=cls.test_run, status='failed', executor=cls.user,
+                execution_date=timezone.now() - timedelta(days=1), execution_time_minutes=4,
+            )
+
+    def assertCountersExact(self, test_run=None):
+        test_run = test_run or self.test_run
+        test_run.refresh_from_db()
+        actual = models.TestRun.get_execution_summaries([test_run])[test_run.pk]
+        for status, count in test_run.get_status_counts().items():
+            self.assertEqual(count, actual[status], status)
+
+        stored = {
+            (row.project_id, row.executor_id, row.day, row.status): (row.execution_count, row.timed_count, row.total_time_minutes)
+            for row in models.ExecutionDailyRollup.objects.exclude(execution_count=0)
+        }
+        utils.rebuild_execution_rollups()
+        rebuilt = {
+            (row.project_id, row.executor_id, row.day, row.status): (row.execution_count, row.timed_count, row.total_time_minutes)
+            for row in models.ExecutionDailyRollup.objects.all()
+        }
+        self.assertEqual(stored, rebuilt)
+
+    def assertDenormalized(self, test_run):
+        mismatched = models.TestExecution.objects.filter(test_run=test_run).exclude(
+            project=F('testcase__project'), owner=F('testcase__owner')
+        )
+        self.assertFalse(mismatched.exists())
+
+
+class BulkResultRecordingTests(ExecutionTrackingTestCase):
+    """record_execution_results must keep the counters and rollups exact with a constant number of writes"""
+
+    def test_updates_and_creates_in_bulk(self):
+        with CaptureQueriesContext(connection) as context:
+            result = utils.record_execution_results(self.test_run, self.testcases, 'passed', self.user, 'Smoke run')
+        self.assertEqual(result, {'created': 30, 'updated': 10})
+        execution_writes = [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith(('INSERT', 'UPDATE')) and models.TestExecution._meta.db_table in query['sql'].split('(')[0]
+        ]
+        self.assertEqual(len(execution_writes), 2)
+        self.assertEqual(
+            models.TestExecution.objects.filter(test_run=self.test_run, status='passed', comments='Smoke run').count(), 40
+        )
+        self.assertCountersExact()
+
+        first_cases = self.testcases.filter(pk__in=list(self.testcases.values_list('pk', flat=True)[:5]))
+        result = utils.record_execution_results(self.test_run, first_cases, 'blocked', None)
+        self.assertEqual(result, {'created': 0, 'updated': 5})
+        self.assertCountersExact()
+
+    def test_skips_and_updates_rows_inserted_concurrently(self):
+        racing_case = self.testcases.exclude(test_executions__test_run=self.test_run).first()
+        bulk_create = models.TestExecution.objects.bulk_create
+
+        def insert_after_racing_writer(executions, **kwargs):
+            # Another tester records the same case between the locking read and the insert
+            models.TestExecution.objects.create(
+                testcase=racing_case, test_run=self.test_run, status='failed', executor=self.user,
+                execution_date=timezone.now() - timedelta(hours=1), execution_time_minutes=2,
+            )
+            return bulk_create(executions, **kwargs)
+
+        with mock.patch.object(models.TestExecution.objects, 'bulk_create', insert_after_racing_writer):
+            result = utils.record_execution_results(self.test_run, self.testcases, 'passed', self.user)
+        self.assertEqual(result, {'created': 29, 'updated': 11})
+        self.assertEqual(models.TestExecution.objects.filter(test_run=self.test_run, testcase=racing_case).get().status, 'passed')
+        self.assertEqual(models.TestExecution.objects.filter(test_run=self.test_run, status='passed').count(), 40)
+        self.assertCountersExact()
+
+
+class TestRunMaterializationTests(ExecutionTrackingTestCase):
+    """materialize_test_run and clone_test_run create a run's executions with one INSERT ... SELECT"""
+
+    def test_materialize_inserts_every_testcase_at_once(self):
+        test_run = models.TestRun.objects.create(name='Materialized run', created_by=self.user)
+        rollups = list(models.ExecutionDailyRollup.objects.values_list('pk', 'execution_count'))
+        with CaptureQueriesContext(connection) as context:
+            metrics = utils.materialize_test_run(test_run, self.testcases)
+        self.assertEqual(metrics['executions'], 40)
+        inserts = [query for query in context.captured_queries if query['sql'].startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+
+        executions = models.TestExecution.objects.filter(test_run=test_run)
+        self.assertEqual(executions.count(), 40)
+        self.assertEqual(executions.filter(status='not_executed', execution_date__isnull=True).count(), 40)
+        self.assertDenormalized(test_run)
+        test_run.refresh_from_db()
+        self.assertEqual(test_run.not_executed_count, 40)
+        # Not executed rows have no day, so no rollup bucket changes
+        self.assertEqual(list(models.ExecutionDailyRollup.objects.values_list('pk', 'execution_count')), rollups)
+        self.assertCountersExact(test_run)
+
+    def test_clone_copies_the_scoped_testcases(self):
+        executed_ids = list(self.testcases.filter(test_executions__test_run=self.test_run).values_list('pk', flat=True))
+        passed = self.testcases.filter(pk__in=executed_ids[:3])
+        utils.record_execution_results(self.test_run, passed, 'passed', self.user)
+
+        clone, metrics = utils.clone_test_run(self.test_run, 'Failed again', self.user, scope='failed')
+        self.assertEqual(metrics['executions'], 7)
+        failed_ids = set(
+            models.TestExecution.objects.filter(test_run=self.test_run, status='failed').values_list('testcase_id', flat=True)
+        )
+        executions = models.TestExecution.objects.filter(test_run=clone)
+        self.assertEqual(set(executions.values_list('testcase_id', flat=True)), failed_ids)
+        self.assertEqual(set(executions.values_list('status', flat=True)), {'not_executed'})
+        self.assertDenormalized(clone)
+        clone.refresh_from_db()
+        self.assertEqual(clone.not_executed_count, 7)
+        self.assertCountersExact(clone)
+        self.assertCountersExact()
+
+        runs = models.TestRun.objects.count()
+        clone, metrics = utils.clone_test_run(self.test_run, 'Blocked again', self.user, scope='blocked')
+        self.assertIsNone(clone)
+        self.assertEqual(metrics['executions'], 0)
+        self.assertEqual(models.TestRun.objects.count(), runs)
+
+
+class TestRunReconcileTests(ExecutionTrackingTestCase):
+    """reconcile_test_run adds and removes executions in bulk and applies their deltas once"""
+
+    def test_reconcile_deletes_and_adds_in_bulk(self):
+        executed_ids = list(
+            models.TestExecution.objects.filter(test_run=self.test_run).order_by('testcase_id').values_list('testcase_id', flat=True)
+        )
+        dropped = models.TestExecution.objects.get(test_run=self.test_run, testcase_id=executed_ids[0])
+        models.TestExecutionStep.objects.create(
+            test_execution=dropped, step_number=1, step_description='Open', expected_result='Opened'
+        )
+        other_ids = list(self.testcases.exclude(pk__in=executed_ids).values_list('pk', flat=True)[:15])
+        selected = self.testcases.filter(pk__in=executed_ids[4:] + other_ids)
+
+        with CaptureQueriesContext(connection) as context:
+            result = utils.reconcile_test_run(self.test_run, selected)
+        self.assertEqual((result['added'], result['removed']), (15, 4))
+        deletes = [query['sql'] for query in context.captured_queries if query['sql'].startswith('DELETE')]
+        self.assertEqual(len(deletes), 2)
+
+        self.assertEqual(
+            set(models.TestExecution.objects.filter(test_run=self.test_run).values_list('testcase_id', flat=True)),
+            set(selected.values_list('pk', flat=True)),
+        )
+        self.assertFalse(models.TestExecutionStep.objects.filter(test_execution_id=dropped.pk).exists())
+        self.test_run.refresh_from_db()
+        self.assertEqual((self.test_run.failed_count, self.test_run.not_executed_count), (6, 15))
+        self.assertCountersExact()
+
+
+class ExecutorDeletionTests(ExecutionTrackingTestCase):
+    """Deleting a user keeps the executions and rollups they executed, without an executor"""
+
+    def test_deleting_an_executor_keeps_their_rollups(self):
+        tester = User.objects.create_user('tester', password='pw')
+        utils.record_execution_results(self.test_run, self.testcases, 'passed', tester)
+        tester.delete()
+
+        self.assertEqual(
+            models.TestExecution.objects.filter(test_run=self.test_run, executor__isnull=True, status='passed').count(), 40
+        )
+        self.assertEqual(
+            sum(models.ExecutionDailyRollup.objects.filter(executor__isnull=True).values_list('execution_count', flat=True)), 40
+        )
+        self.assertCountersExact()
+
+        metrics = utils.calculate_execution_metrics(models.TestExecution.objects.filter(test_run=self.test_run))
+        self.assertEqual((metrics['total'], metrics['passed'], metrics['unique_executors']), (40, 40, 0))
+
+
+class TestCaseMoveTests(ExecutionTrackingTestCase):
+    """Moving a test case to another project moves its executions and rollups with it"""
+
+    def test_moving_a_testcase_moves_its_executions(self):
+        other_user = User.objects.create_user('receiver', password='pw')
+        other_project = models.Project.objects.create(name='Other project', created_by=other_user)
+        other_epic = models.Epic.objects.create(name='Other epic', project=other_project, created_by=other_user)
+        other_story = models.UserStory.objects.create(name='Other story', epic=other_epic, created_by=other_user)
+
+        testcase = models.TestExecution.objects.filter(test_run=self.test_run).first().testcase
+        testcase.user_story = other_story
+        testcase.save()
+
+        executions = models.TestExecution.objects.filter(testcase=testcase)
+        self.assertEqual(set(executions.values_list('project_id', 'owner_id')), {(other_project.pk, other_user.pk)})
+        self.assertEqual(
+            models.ExecutionDailyRollup.objects.filter(project=other_project).values_list('execution_count', flat=True).get(), 1
+        )
+        self.assertCountersExact()
+
+
+class DashboardCacheTests(TestCase):
+    """The dashboard is served from the cache until one of the user's objects changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('lead', password='pw')
+        cls.project = models.Project.objects.create(name='Mobile app', created_by=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def get_dashboard(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('test_cases:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        # Session and user lookups are not part of the dashboard
+        return response.context, len(context.captured_queries) - 2
+
+    def test_served_from_cache_until_changed(self):
+        context, queries = self.get_dashboard()
+        self.assertGreater(queries, 0)
+        self.assertEqual(context['projects_count'], 1)
+        self.assertEqual(self.get_dashboard()[1], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Epic.objects.create(name='Onboarding', project=self.project, created_by=self.user)
+        context, queries = self.get_dashboard()
+        self.assertGreater(queries, 0)
+        self.assertEqual(context['epics_count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            models.Project.objects.create(name='Other', created_by=User.objects.create_user('other'))
+        self.assertEqual(self.get_dashboard()[1], 0)
+
+    def test_untracked_models_keep_fast_deletes(self):
+        for model in (models.ExecutionDailyRollup, models.SearchDocument, models.BackgroundJob):
+            self.assertFalse(post_delete.has_listeners(model), model)
+
+
+class CacheHelperTests(SimpleTestCase):
+    """get_or_compute recomputes a value once, and never while another worker holds its lock"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_computes_once_until_expiry(self):
+        calls = []
+        compute = lambda: calls.append(1) or len(calls)
+        self.assertEqual(app_cache.get_or_compute('answer', compute, 60), 1)
+        self.assertEqual(app_cache.get_or_compute('answer', compute, 60), 1)
+        self.assertEqual(len(calls), 1)
+
+    def test_serves_current_value_while_another_worker_refreshes(self):
+        app_cache.get_or_compute('answer', lambda: 'old', 60)
+        entry = cache.get('answer')
+        cache.set('answer', {**entry, 'expires': entry['expires'] - 120})
+        cache.add('answer:lock', 1)
+        self.assertEqual(app_cache.get_or_compute('answer', lambda: 'new', 60), 'old')
+
+        cache.delete('answer:lock')
+        self.assertEqual(app_cache.get_or_compute('answer', lambda: 'new', 60), 'new')
+        self.assertIsNone(cache.get('answer:lock'))
+
+    def test_coalesces_concurrent_requests_in_process(self):
+        calls = []
+        started = threading.Event()
+
+        def compute():
+            calls.append(1)
+            started.set()
+            time.sleep(0.2)
+            return 'report'
+
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(app_cache.get_or_compute('report', compute, 60)))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, ['report'] * 5)
+        self.assertEqual(len(calls), 1)
+
+    def test_waits_for_value_computed_by_another_process(self):
+        cache.add('report:lock', 1)
+        finish = threading.Timer(0.2, lambda: cache.set('report', {'value': 'shared', 'cost': 0.2, 'expires': time.time() + 60}))
+        finish.start()
+        self.assertEqual(app_cache.get_or_compute('report', lambda: 'recomputed', 60), 'shared')
+        finish.join()
+
+    def test_user_data_version_bump_changes_keys(self):
+        version = app_cache.get_user_data_version(7)
+        self.assertEqual(app_cache.get_user_data_version(7), version)
+        app_cache.bump_user_data_version(7)
+        self.assertEqual(app_cache.get_user_data_version(7), version + 1)
+
+
+class SearchIndexTests(TestCase):
+    """The search documents follow saves, renames and deletes, and title matches rank first"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('searcher', password='pw')
+        cls.project = models.Project.objects.create(name='Storefront', created_by=cls.user)
+        cls.epic = models.Epic.objects.create(name='Checkout', project=cls.project, created_by=cls.user)
+        cls.story = models.UserStory.objects.create(name='Pay by card', epic=cls.epic, created_by=cls.user)
+        cls.described = models.TestCase.objects.create(
+            name='Submit order', description='Uses a saved coupon', test_steps='Submit', expected_results='Done',
+            user_story=cls.story, created_by=cls.user,
+        )
+        cls.named = models.TestCase.objects.create(
+            name='Coupon discount', test_steps='Apply', expected_results='Discounted',
+            user_story=cls.story, created_by=cls.user,
+        )
+
+    def search(self, query):
+        testcases = models.TestCase.objects.filter(owner=self.user)
+        documents = search.search_documents(testcases, 'testcase', query).order_by('-relevance', '-id')
+        return [document.testcase_id for document in documents]
+
+    def test_ranks_title_matches_first(self):
+        self.assertEqual(self.search('coup'), [self.named.pk, self.described.pk])
+        self.assertEqual(self.search('coupon saved'), [self.described.pk])
+        self.assertEqual(self.search('storefront checkout card'), [self.named.pk, self.described.pk])
+
+    def test_cursor_pages_seek_on_rounded_relevance(self):
+        models.TestCase.objects.bulk_create([
+            models.TestCase(
+                name=f'Coupon case {i}', description='coupon ' * (i % 4), test_steps='Apply', expected_results='Done',
+                user_story=self.story, project=self.project, owner=self.user, created_by=self.user,
+            )
+            for i in range(12)
+        ])
+        search.index_search_documents('testcase', models.TestCase.objects.filter(owner=self.user))
+        testcases = models.TestCase.objects.filter(owner=self.user)
+        documents = search.search_documents(testcases, 'testcase', 'coupon')
+        ranked = list(documents.order_by('-relevance', '-id').values_list('testcase_id', 'relevance'))
+        self.assertEqual(len(ranked), 14)
+        for _, relevance in ranked:
+            self.assertEqual(relevance, round(relevance, search.RELEVANCE_PRECISION))
+
+        paginator = CursorPaginator(documents, 3, ('-relevance', '-id'))
+        page = paginator.get_page()
+        paged = [document.testcase_id for document in page]
+        while page.next_cursor:
+            page = paginator.get_page(page.next_cursor)
+            paged.extend(document.testcase_id for document in page)
+        self.assertEqual(paged, [testcase_id for testcase_id, _ in ranked])
+
+    def test_follows_renames_and_deletes(self):
+        self.epic.name = 'Payments'
+        self.epic.save()
+        self.assertEqual(self.search('checkout'), [])
+        self.assertEqual(len(self.search('payments')), 2)
+
+        self.named.delete()
+        self.assertEqual(self.search('payments'), [self.described.pk])
+        self.assertEqual(models.SearchDocument.objects.filter(kind='testcase').count(), 1)
+
+    def test_global_search_groups_by_type(self):
+        models.TestRun.objects.create(name='Coupon regression', created_by=self.user)
+        self.client.force_login(self.user)
+        url = reverse('test_cases:global_search')
+
+        results = self.client.get(url, {'q': 'coupon', 'limit': 1}).json()['results']
+        self.assertEqual(results['testcase']['count'], 2)
+        self.assertEqual([found['id'] for found in results['testcase']['results']], [self.named.pk])
+        self.assertEqual(results['test_run']['count'], 1)
+        self.assertEqual(results['project']['count'], 0)
+
+        page = self.client.get(results['testcase']['more']).json()
+        self.assertEqual([found['id'] for found in page['results']], [self.named.pk])
+        page = self.client.get(page['next']).json()
+        self.assertEqual([found['id'] for found in page['results']], [self.described.pk])
+        self.assertIsNone(page['next'])
+
+        results = self.client.get(url, {'q': 'storefront', 'types': 'project,epic'}).json()['results']
+        self.assertEqual(list(results), ['project', 'epic'])
+        self.assertEqual(results['project']['results'][0]['url'], f"{reverse('test_cases:epic_list')}?project={self.project.pk}")
+        self.assertEqual(results['epic']['count'], 1)
+
+
+class BackgroundJobTests(TestCase):
+    """Jobs are claimed once, run to completion and downloadable only by their owner"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('exporter', password='pw')
+        cls.other = User.objects.create_user('onlooker', password='pw')
+        project = models.Project.objects.create(name='Job project', created_by=cls.user)
+        epic = models.Epic.objects.create(name='Job epic', project=project, created_by=cls.user)
+        story = models.UserStory.objects.create(name='Job story', epic=epic, created_by=cls.user)
+        test_run = models.TestRun.objects.create(name='Job run', created_by=cls.user)
+        for i in range(3):
+            testcase = models.TestCase.objects.create(
+                name=f'Job case {i}', user_story=story, project=project, owner=cls.user, created_by=cls.user
+            )
+            models.TestExecution.objects.create(
+                testcase=testcase, test_run=test_run, status='passed', executor=cls.user, execution_date=timezone.now()
+            )
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        media_override = override_settings(MEDIA_ROOT=media_root.name)
+        media_override.enable()
+        self.addCleanup(media_override.disable)
+
+    def run_job(self, job):
+        # run_job closes the connections a worker process inherited, which would end the test transaction
+        with mock.patch('test_cases.jobs.connections'):
+            return jobs.run_job(job.pk)
+
+    def test_claim_run_and_download(self):
+        job = jobs.enqueue_job('execution_export', self.user, {'format': 'csv', 'filters': {}})
+        claimed = models.BackgroundJob.claim_next('worker-1')
+        self.assertEqual((claimed.pk, claimed.status, claimed.worker), (job.pk, 'running', 'worker-1'))
+        self.assertIsNone(models.BackgroundJob.claim_next('worker-2'))
+
+        self.assertEqual(self.run_job(claimed), 'succeeded')
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.progress, job.result), ('succeeded', 100, {'rows': 3, 'format': 'csv'}))
+        self.assertIsNotNone(job.finished_date)
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('test_cases:job_download', args=[job.pk]))
+        self.assertEqual(response.status_code, 200)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertEqual(len(content.strip().splitlines()), 4)
+        self.assertIn('Job case 2', content)
+
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(reverse('test_cases:job_download', args=[job.pk])).status_code, 404)
+
+    def test_reports_are_queued_only_by_post(self):
+        self.client.force_login(self.user)
+        for export_format in ('xlsx', 'pdf'):
+            response = self.client.get(reverse('test_cases:test_execution_export'), {'format': export_format, 'status': 'passed'})
+            self.assertRedirects(response, f"{reverse('test_cases:test_execution_report')}?status=passed", fetch_redirect_response=False)
+        self.assertFalse(models.BackgroundJob.objects.exists())
+
+        response = self.client.get(reverse('test_cases:test_execution_export'), {'format': 'csv'})
+        self.assertEqual(len(b''.join(response.streaming_content).decode('utf-8').strip().splitlines()), 4)
+
+        response = self.client.post(f"{reverse('test_cases:test_execution_export_job')}?status=passed", {'format': 'pdf'})
+        job = models.BackgroundJob.objects.get()
+        self.assertRedirects(response, reverse('test_cases:job_detail', args=[job.pk]), fetch_redirect_response=False)
+        self.assertEqual((job.kind, job.params), ('execution_pdf', {'filters': {'status': 'passed'}}))
+
+    def test_cancel(self):
+        queued = jobs.enqueue_job('execution_export', self.user, {'format': 'csv'})
+        queued.request_cancel()
+        queued.refresh_from_db()
+        self.assertEqual((queued.status, queued.cancel_requested), ('cancelled', True))
+        self.assertIsNotNone(queued.finished_date)
+        self.assertIsNone(models.BackgroundJob.claim_next('worker-1'))
+
+        jobs.enqueue_job('execution_export', self.user, {'format': 'csv'})
+        running = models.BackgroundJob.claim_next('worker-1')
+        running.report_progress(1, 4, 'Started')
+        running.request_cancel()
+        with self.assertRaises(models.JobCancelled):
+            running.report_progress(2, 4, 'Halfway')
+
+        self.assertEqual(self.run_job(running), 'cancelled')
+        running.refresh_from_db()
+        self.assertEqual((running.status, running.progress), ('cancelled', 25))
+        self.assertFalse(running.result_file)
+
+
+class TestCaseImportTests(TestCase):
+    """Imports write whole batches: upserts update in place and hierarchy columns create missing parents"""
+
+    HEADERS = ['Test Case Name', 'Description', 'Test Steps', 'Expected Results', 'Priority', 'Is Automated']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user('importer', password='pw')
+        cls.project = models.Project.objects.create(name='Import project', created_by=cls.user)
+        cls.epic = models.Epic.objects.create(name='Import epic', project=cls.project, created_by=cls.user)
+        cls.story = models.UserStory.objects.create(name='Import story', epic=cls.epic, created_by=cls.user)
+
+    def build_workbook(self, rows, headers=HEADERS):
+        workbook = openpyxl.Workbook()
+        worksheet = workbook.active
+        worksheet.append(headers)
+        for row in rows:
+            worksheet.append(row)
+        output = io.BytesIO()
+        workbook.save(output)
+        output.seek(0)
+        return output
+
+    def case_row(self, name, priority='medium', steps='Open the page and submit'):
+        return [name, 'Imported case', steps, 'The page is submitted', priority, 'No']
+
+    def test_upsert_twice_updates_in_place(self):
+        rows = [self.case_row(f'Imported case {i}') for i in range(5)]
+        result = utils.import_testcases_from_excel(self.build_workbook(rows), self.story, self.user, mode='upsert')
+        self.assertEqual((result['success'], result['created'], result['updated']), (True, 5, 0))
+        original_ids = set(models.TestCase.objects.filter(user_story=self.story).values_list('pk', flat=True))
+
+        rows[1] = self.case_row('  imported CASE 1 ', priority='critical')
+        rows[3] = self.case_row('Imported case 3', steps='Open the page and submit twice')
+        rows.append(self.case_row('Imported case 5'))
+        result = utils.import_testcases_from_excel(self.build_workbook(rows), self.story, self.user, mode='upsert')
+        self.assertEqual(
+            (result['success'], result['created'], result['updated'], result['unchanged']), (True, 1, 2, 3)
+        )
+
+        testcases = models.TestCase.objects.filter(user_story=self.story)
+        self.assertEqual(testcases.count(), 6)
+        self.assertTrue(original_ids <= set(testcases.values_list('pk', flat=True)))
+        renamed = testcases.get(name='imported CASE 1')
+        self.assertEqual(renamed.priority, 'critical')
+        self.assertEqual(testcases.get(name='Imported case 3').test_steps, 'Open the page and submit twice')
+        self.assertEqual(testcases.get(name='Imported case 0').priority, 'medium')
+
+    def test_hierarchy_columns_create_missing_epics_and_stories(self):
+        headers = [*self.HEADERS, *utils.HIERARCHY_HEADERS]
+        rows = [
+            [*self.case_row('Existing story case'), 'import PROJECT', 'Import epic', 'Import story'],
+            [*self.case_row('New story case'), 'Import project', 'Import epic', 'Checkout'],
+            [*self.case_row('New epic case'), 'Import project', 'Payments', 'Refunds'],
+            [*self.case_row('Second new epic case'), 'Import project', ' payments', 'refunds '],
+            [*self.case_row('Unknown project case'), 'Elsewhere', 'Payments', 'Refunds'],
+        ]
+        result = utils.import_testcases_from_excel(self.build_workbook(rows, headers), None, self.user)
+        self.assertEqual((result['success'], result['created'], result['skipped']), (True, 4, 1))
+        self.assertEqual(result['errors'], ["Row 6: Project 'Elsewhere' not found"])
+
+        self.assertEqual(
+            sorted(models.Epic.objects.filter(project=self.project).values_list('name', flat=True)),
+            ['Import epic', 'Payments'],
+        )
+        self.assertEqual(
+            sorted(models.UserStory.objects.filter(epic__project=self.project).values_list('epic__name', 'name')),
+            [('Import epic', 'Checkout'), ('Import epic', 'Import story'), ('Payments', 'Refunds')],
+        )
+        refunds = models.UserStory.objects.get(name='Refunds')
+        self.assertEqual(
+            sorted(models.TestCase.objects.filter(user_story=refunds).values_list('name', flat=True)),
+            ['New epic case', 'Second new epic case'],
+        )
+        self.assertFalse(
+            models.TestCase.objects.filter(user_story__epic__project=self.project).exclude(
+                project=self.project, owner=self.user
+            ).exists()
+        )
+
+    def test_workbooks_import_as_one_batch(self):
+        with tempfile.TemporaryDirectory() as directory:
+            contents = {
+                'first.xlsx': [self.case_row('Batch case 1'), self.case_row('Bad')],
+                'second.xlsx': [self.case_row('batch case 1'), self.case_row('Batch case 2')],
+            }
+            for filename, rows in contents.items():
+                with open(os.path.join(directory, filename), 'wb') as output:
+                    output.write(self.build_workbook(rows).getvalue())
+
+            result = utils.import_testcase_workbooks(
+                utils.find_import_workbooks(directory), self.user, user_story=self.story, mode='upsert', processes=2
+            )
+
+        self.assertEqual((result['success'], result['created'], result['skipped']), (True, 2, 2))
+        self.assertEqual([file['file'] for file in result['files']], ['first.xlsx', 'second.xlsx'])
+        self.assertEqual(sum(file['skipped'] for file in result['files']), 2)
+        # Workbooks finish in any order, so either spelling of the duplicate may win
+        self.assertEqual(
+            sorted(name.casefold() for name in models.TestCase.objects.filter(user_story=self.story).values_list('name', flat=True)),
+            ['batch case 1', 'batch case 2'],
+        )
+
+    def write_workbooks(self, directory, contents):
+        for filename, rows in contents.items():
+            with open(os.path.join(directory, filename), 'wb') as output:
+                output.write(self.build_workbook(rows).getvalue())
+        return utils.find_import_workbooks(directory)
+
+    def test_workbook_rows_are_sent_in_batches(self):
+        rows = [self.case_row(f'Streamed case {i}') for i in range(5)]
+        rows.insert(2, self.case_row('Bad'))
+        with tempfile.TemporaryDirectory() as directory:
+            [(label, path)] = self.write_workbooks(directory, {'streamed.xlsx': rows})
+            messages = queue.Queue()
+            utils.parse_workbook_for_import(path, label, messages, batch_size=2)
+            utils.parse_workbook_for_import(os.path.join(directory, 'missing.xlsx'), 'missing.xlsx', messages)
+
+        sent = [messages.get_nowait() for _ in range(messages.qsize())]
+        summary = [
+            (kind, label, [row_number for row_number, _ in payload] if kind == 'rows' else payload)
+            for kind, label, payload in sent[:5]
+        ]
+        self.assertEqual(
+            summary,
+            [
+                ('rows', 'streamed.xlsx', [2, 3]),
+                ('errors', 'streamed.xlsx', [['Row 4: Test Case Name must be at least 5 characters long']]),
+                ('rows', 'streamed.xlsx', [5]),
+                ('rows', 'streamed.xlsx', [6, 7]),
+                ('done', 'streamed.xlsx', ''),
+            ],
+        )
+        self.assertEqual(sent[5][:2], ('done', 'missing.xlsx'))
+        self.assertTrue(sent[5][2].startswith('Error reading Excel file'))
+
+    def test_cancelled_batch_import_stops_blocked_workers(self):
+        def cancel(done, total):
+            raise models.JobCancelled()
+
+        with tempfile.TemporaryDirectory() as directory:
+            workbooks = self.write_workbooks(directory, {
+                f'{name}.xlsx': [self.case_row(f'{name} case {i}') for i in range(50)] for name in ('first', 'second', 'third')
+            })
+            with self.assertRaises(models.JobCancelled):
+                utils.import_testcase_workbooks(
+                    workbooks, self.user, user_story=self.story, processes=1, batch_size=5, progress=cancel
+                )
+        self.assertEqual(models.TestCase.objects.filter(user_story=self.story).count(), 50)
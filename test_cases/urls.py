@@ -33,6 +33,7 @@ urlpatterns = [
     # Test Case URLs
     path('testcases/', views.testcase_list, name='testcase_list'),
     path('testcases/create/', views.testcase_create, name='testcase_create'),
+    path('testcases/export/', views.testcase_export, name='testcase_export'),
     path('testcases/<int:pk>/edit/', views.testcase_edit, name='testcase_edit'),
     path('testcases/<int:pk>/delete/', views.testcase_delete, name='testcase_delete'),
     path('testcases/<int:pk>/execute/', views.testcase_execute, name='testcase_execute'),
@@ -46,6 +47,7 @@ urlpatterns = [
     path('test-runs/<int:pk>/edit/', views.test_run_edit, name='test_run_edit'),
     path('test-runs/<int:pk>/delete/', views.test_run_delete, name='test_run_delete'),
     path('test-runs/<int:pk>/execute/', views.test_run_execute, name='test_run_execute'),
+    path('test-runs/<int:pk>/clone/', views.test_run_clone, name='test_run_clone'),
     
     # Test Execution URLs
     path('test-execution/dashboard/', views.test_execution_dashboard, name='test_execution_dashboard'),
@@ -53,6 +55,7 @@ urlpatterns = [
     path('test-execution/<int:pk>/record/', views.test_execution_record, name='test_execution_record'),
     path('test-execution/report/', views.test_execution_report, name='test_execution_report'),
     path('test-execution/export/', views.test_execution_export, name='test_execution_export'),
+    path('test-execution/export/background/', views.test_execution_export_job, name='test_execution_export_job'),
     
     # Test Suite URLs
     path('test-suites/', views.test_suite_list, name='test_suite_list'),
@@ -62,6 +65,10 @@ urlpatterns = [
     
     # Bulk Operations URLs
     path('bulk/test-execution/', views.bulk_test_execution, name='bulk_test_execution'),
+    path('jobs/', views.job_list, name='job_list'),
+    path('jobs/<int:pk>/', views.job_detail, name='job_detail'),
+    path('jobs/<int:pk>/cancel/', views.job_cancel, name='job_cancel'),
+    path('jobs/<int:pk>/download/', views.job_download, name='job_download'),
     
     # AJAX URLs for dynamic dropdowns
     path('ajax/projects-by-user/', views.get_projects_by_user, name='get_projects_by_user'),
@@ -69,6 +76,7 @@ urlpatterns = [
     path('ajax/stories-by-epic/', views.get_stories_by_epic, name='get_stories_by_epic'),
     path('ajax/testcases-by-filters/', views.get_test_cases_by_filters, name='get_test_cases_by_filters'),
     path('ajax/execution-stats/', views.get_execution_stats, name='get_execution_stats'),
+    path('ajax/search/', views.global_search, name='global_search'),
     
     # Additional AJAX URLs for test execution
     path('ajax/test-execution/<int:pk>/detail/', views.test_execution_detail_ajax, name='test_execution_detail_ajax'),
@@ -76,4 +84,5 @@ urlpatterns = [
     path('ajax/test-execution/project-breakdown/', views.test_execution_project_breakdown, name='test_execution_project_breakdown'),
     path('ajax/test-suite/stats/', views.test_suite_stats, name='test_suite_stats'),
     path('ajax/test-run/create-from-suite/', views.test_run_create_from_suite, name='test_run_create_from_suite'),
+    path('ajax/jobs/<int:pk>/status/', views.job_status, name='job_status'),
 ]
\ No newline at end of file
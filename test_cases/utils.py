@@ -1,18 +1,34 @@
+import django
 import openpyxl
 import pandas as pd
-from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import connection, transaction
 from django.db.models import Sum, Avg, F, Q, Count
+from django.db.models.functions import Coalesce, TruncDate
 from django.utils import timezone
 from django.core.mail import send_mail, EmailMessage
 from django.conf import settings
 from django.template.loader import render_to_string
-from fpdf import FPDF
-from datetime import timedelta, date
+from fpdf import FPDF, XPos, YPos
+from datetime import datetime, time, timedelta, date
+from itertools import chain, islice
+from time import perf_counter
+from openpyxl.utils import get_column_letter
+from django.core.serializers.json import DjangoJSONEncoder
 import logging
-import io
+import multiprocessing
+import os
+import csv
+import json
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from queue import Empty
 
-from .models import TestCase, UserStory, TestExecution, TestRun, Project
+from .models import TestCase, Epic, UserStory, TestExecution, TestRun, Project, ExecutionDailyRollup, JobCancelled
+from .pagination import CursorPaginator, iterate_in_chunks
+from .cache import invalidate_user_data_on_commit
+from .search import index_search_documents
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +64,9 @@ def validate_excel_headers(worksheet):
     return True, headers
 
 
+TESTCASE_NAME_MAX_LENGTH = TestCase._meta.get_field('name').max_length
+
+
 def validate_testcase_data(row_data, row_number):
     """
     Validate individual test case data from Excel row.
@@ -60,6 +79,8 @@ def validate_testcase_data(row_data, row_number):
         errors.append(f"Row {row_number}: Test Case Name is required")
     elif len(row_data.get('Test Case Name', '').strip()) < 5:
         errors.append(f"Row {row_number}: Test Case Name must be at least 5 characters long")
+    elif len(row_data.get('Test Case Name', '').strip()) > TESTCASE_NAME_MAX_LENGTH:
+        errors.append(f"Row {row_number}: Test Case Name must be at most {TESTCASE_NAME_MAX_LENGTH} characters long")
     
     if not row_data.get('Test Steps', '').strip():
         errors.append(f"Row {row_number}: Test Steps are required")
@@ -85,55 +106,86 @@ def validate_testcase_data(row_data, row_number):
     return len(errors) == 0, errors
 
 
+def open_excel_worksheet(excel_file):
+    """
+    Open an Excel file in read-only mode and validate its headers.
+    Rows are streamed from disk instead of loading the whole workbook.
+    Returns tuple (success, workbook, headers or error_message)
+    """
+    try:
+        workbook = openpyxl.load_workbook(excel_file, read_only=True, data_only=True)
+    except Exception as e:
+        logger.error(f"Error opening Excel file: {str(e)}")
+        return False, None, f"Error reading Excel file: {str(e)}"
+
+    headers_valid, headers_or_error = validate_excel_headers(workbook.active)
+    if not headers_valid:
+        workbook.close()
+    return headers_valid, workbook, headers_or_error
+
+
+def iter_excel_rows(worksheet, headers):
+    """
+    Yield (row_number, row_data) for the non-empty data rows of a worksheet,
+    with every value converted to a string as the validators expect.
+    """
+    for row_idx, row in enumerate(worksheet.iter_rows(min_row=2, values_only=True), start=2):
+        if not any(row):  # Skip empty rows
+            continue
+
+        row_data = {}
+        for col_idx, header in enumerate(headers):
+            cell_value = row[col_idx] if col_idx < len(row) else None
+            row_data[header] = str(cell_value) if cell_value is not None else ''
+        yield row_idx, row_data
+
+
 def parse_excel_file(excel_file):
     """
     Parse Excel file and return list of test case data dictionaries.
     Returns tuple (success, data_list, error_message)
     """
+    opened, workbook, headers_or_error = open_excel_worksheet(excel_file)
+    if not opened:
+        return False, [], headers_or_error
+
     try:
-        # Try to read with openpyxl first
-        workbook = openpyxl.load_workbook(excel_file, data_only=True)
-        worksheet = workbook.active
-        
-        # Validate headers
-        headers_valid, headers_or_error = validate_excel_headers(worksheet)
-        if not headers_valid:
-            return False, [], headers_or_error
-        
-        headers = headers_or_error
-        
-        # Parse data rows
         data_list = []
         errors = []
-        
-        for row_idx, row in enumerate(worksheet.iter_rows(min_row=2, values_only=True), start=2):
-            if not any(row):  # Skip empty rows
-                continue
-            
-            # Create dictionary from row data
-            row_data = {}
-            for col_idx, header in enumerate(headers):
-                if col_idx < len(row):
-                    cell_value = row[col_idx]
-                    row_data[header] = str(cell_value) if cell_value is not None else ''
-                else:
-                    row_data[header] = ''
-            
-            # Validate row data
+
+        for row_idx, row_data in iter_excel_rows(workbook.active, headers_or_error):
             is_valid, validation_errors = validate_testcase_data(row_data, row_idx)
             if is_valid:
                 data_list.append(row_data)
             else:
                 errors.extend(validation_errors)
-        
+
         if errors:
             return False, [], f"Validation errors found:\n" + "\n".join(errors)
-        
+
         return True, data_list, ""
-        
+
     except Exception as e:
         logger.error(f"Error parsing Excel file: {str(e)}")
         return False, [], f"Error reading Excel file: {str(e)}"
+    finally:
+        workbook.close()
+
+
+TRUE_VALUES = ['true', '1', 'yes', 'y']
+
+PRIORITY_ALIASES = {
+    'low': 'low',
+    'l': 'low',
+    'medium': 'medium',
+    'med': 'medium',
+    'm': 'medium',
+    'high': 'high',
+    'h': 'high',
+    'critical': 'critical',
+    'crit': 'critical',
+    'c': 'critical'
+}
 
 
 def convert_boolean_value(value):
@@ -144,7 +196,7 @@ def convert_boolean_value(value):
         return value
     
     value_str = str(value).lower().strip()
-    return value_str in ['true', '1', 'yes', 'y']
+    return value_str in TRUE_VALUES
 
 
 def normalize_priority(priority_value):
@@ -152,138 +204,665 @@ def normalize_priority(priority_value):
     Normalize priority value to valid choice.
     """
     priority_str = str(priority_value).lower().strip()
-    priority_mapping = {
-        'low': 'low',
-        'l': 'low',
-        'medium': 'medium',
-        'med': 'medium',
-        'm': 'medium',
-        'high': 'high',
-        'h': 'high',
-        'critical': 'critical',
-        'crit': 'critical',
-        'c': 'critical'
+    return PRIORITY_ALIASES.get(priority_str, 'medium')
+
+
+# (header, minimum length, message when empty, message when too short),
+# in the order validate_testcase_data checks them
+TESTCASE_TEXT_RULES = [
+    ('Test Case Name', 5, "Test Case Name is required", "Test Case Name must be at least 5 characters long"),
+    ('Test Steps', 10, "Test Steps are required", "Test Steps must be at least 10 characters long"),
+    ('Expected Results', 10, "Expected Results are required", "Expected Results must be at least 10 characters long"),
+]
+
+
+def validate_testcase_frame(frame):
+    """
+    Vectorized validate_testcase_data for a DataFrame of import rows (one
+    string column per header, indexed by spreadsheet row number).
+
+    Returns tuple (errors, valid_frame): errors maps row numbers to the same
+    messages validate_testcase_data gives, and valid_frame holds the rows
+    without errors with text stripped, Priority normalized and Is Automated
+    converted to booleans. Other columns are passed through unchanged.
+    """
+    def column(header, default=''):
+        if header not in frame:
+            return pd.Series(default, index=frame.index, dtype=object)
+        return frame[header].fillna('').astype(str)
+
+    checks = []
+    stripped = {}
+    for header, min_length, required_message, length_message in TESTCASE_TEXT_RULES:
+        stripped[header] = column(header).str.strip()
+        lengths = stripped[header].str.len()
+        checks.append((lengths == 0, required_message))
+        checks.append(((lengths > 0) & (lengths < min_length), length_message))
+        if header == 'Test Case Name':
+            checks.append((
+                lengths > TESTCASE_NAME_MAX_LENGTH,
+                f"Test Case Name must be at most {TESTCASE_NAME_MAX_LENGTH} characters long",
+            ))
+
+    valid_priorities = ['low', 'medium', 'high', 'critical']
+    priority = column('Priority', 'medium').str.lower().str.strip()
+    checks.append((
+        (priority != '') & ~priority.isin(valid_priorities),
+        f"Priority must be one of: {', '.join(valid_priorities)}",
+    ))
+
+    is_automated = column('Is Automated', 'False').str.lower().str.strip()
+    checks.append((
+        ~is_automated.isin(['true', 'false', '1', '0', 'yes', 'no']),
+        "Is Automated must be True/False, Yes/No, or 1/0",
+    ))
+
+    failures = pd.concat([mask for mask, _ in checks], axis=1).to_numpy()
+    failed_rows = failures.any(axis=1)
+    messages = [message for _, message in checks]
+    errors = {
+        row_number: [f"Row {row_number}: {message}" for message, failed in zip(messages, row_failures) if failed]
+        for row_number, row_failures in zip(frame.index[failed_rows], failures[failed_rows])
     }
-    
-    return priority_mapping.get(priority_str, 'medium')
+
+    valid = ~failed_rows
+    valid_frame = frame[valid].assign(**{
+        'Test Case Name': stripped['Test Case Name'][valid],
+        'Description': column('Description')[valid].str.strip(),
+        'Test Steps': stripped['Test Steps'][valid],
+        'Expected Results': stripped['Expected Results'][valid],
+        'Priority': priority[valid].map(PRIORITY_ALIASES).fillna('medium'),
+        'Is Automated': is_automated[valid].isin(TRUE_VALUES),
+    })
+    return errors, valid_frame
 
 
-def create_testcase_from_data(testcase_data, user_story, created_by):
+def build_import_frame(rows):
+    """DataFrame of (row number, row data) pairs from iter_excel_rows, indexed by row number"""
+    return pd.DataFrame.from_records(
+        [row_data for _, row_data in rows],
+        index=[row_number for row_number, _ in rows],
+    )
+
+
+def build_testcase_from_row(row_data, user_story, created_by):
     """
-    Create a TestCase instance from parsed Excel data.
-    Returns tuple (testcase_instance, success, error_message)
+    Unsaved TestCase for a row of the valid_frame of validate_testcase_frame.
+    The frame already checked every constraint the model would, so the row
+    is not cleaned again.
     """
-    try:
-        # Normalize data
-        name = testcase_data.get('Test Case Name', '').strip()
-        description = testcase_data.get('Description', '').strip()
-        test_steps = testcase_data.get('Test Steps', '').strip()
-        expected_results = testcase_data.get('Expected Results', '').strip()
-        priority = normalize_priority(testcase_data.get('Priority', 'medium'))
-        is_automated = convert_boolean_value(testcase_data.get('Is Automated', 'False'))
-        
-        # Create TestCase instance
-        testcase = TestCase(
-            name=name,
-            description=description,
-            test_steps=test_steps,
-            expected_results=expected_results,
-            priority=priority,
-            is_automated=is_automated,
-            user_story=user_story,
-            created_by=created_by,
-            status='draft',
-            execution_status='not_executed'
-        )
-        
-        # Validate the instance
-        testcase.full_clean()
-        
-        return testcase, True, ""
-        
-    except ValidationError as e:
-        error_msg = "; ".join([f"{field}: {', '.join(errors)}" for field, errors in e.message_dict.items()])
-        return None, False, f"Validation error: {error_msg}"
-    except Exception as e:
-        return None, False, f"Error creating test case: {str(e)}"
+    return TestCase(
+        name=row_data['Test Case Name'],
+        description=row_data['Description'],
+        test_steps=row_data['Test Steps'],
+        expected_results=row_data['Expected Results'],
+        priority=row_data['Priority'],
+        is_automated=row_data['Is Automated'],
+        user_story=user_story,
+        project_id=user_story.epic.project_id,
+        owner_id=user_story.epic.project.created_by_id,
+        created_by=created_by,
+        status='draft',
+        execution_status='not_executed'
+    )
 
 
-@transaction.atomic
-def import_testcases_from_excel(excel_file, user_story, created_by):
+# Fields an upsert import compares and rewrites on existing test cases
+UPSERT_FIELDS = ['name', 'description', 'test_steps', 'expected_results', 'priority', 'is_automated']
+
+# Optional columns placing each row in the project hierarchy
+HIERARCHY_HEADERS = ['Project', 'Epic', 'User Story']
+
+
+def normalize_import_name(name):
+    """Key used to match spreadsheet names to stored ones: ignores case and spacing"""
+    return ' '.join(name.split()).casefold()
+
+
+def build_testcase_name_index(user_story_ids):
     """
-    Main function to import test cases from Excel file.
-    Returns dictionary with results: {
-        'success': bool,
-        'created': int,
-        'errors': list,
-        'error': str (if success is False)
-    }
+    Hash index of the test cases of the given user stories by (user story id,
+    normalized name), holding the values upsert imports compare. When names
+    collide the oldest case wins.
     """
-    result = {
+    index = {}
+    existing = TestCase.objects.filter(user_story_id__in=user_story_ids).order_by('-pk').values(
+        'pk', 'user_story_id', *UPSERT_FIELDS
+    )
+    for values in existing.iterator():
+        index[(values['user_story_id'], normalize_import_name(values['name']))] = values
+    return index
+
+
+class ImportHierarchy:
+    """
+    Resolves the Project, Epic and User Story columns of an import to user
+    stories of the importing user. The lookup maps are loaded with one query
+    per level; epics and stories missing from them are bulk created. Projects
+    are never created and must already exist.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        # Newest first, so the oldest object wins when normalized names collide
+        projects = list(Project.objects.filter(created_by=user).order_by('-pk'))
+        self.projects = {normalize_import_name(project.name): project for project in projects}
+        projects_by_id = {project.pk: project for project in projects}
+
+        epics = list(Epic.objects.filter(project__created_by=user).order_by('-pk'))
+        self.epics = {}
+        for epic in epics:
+            epic.project = projects_by_id[epic.project_id]
+            self.epics[(epic.project_id, normalize_import_name(epic.name))] = epic
+        epics_by_id = {epic.pk: epic for epic in epics}
+
+        self.stories = {}
+        for story in UserStory.objects.filter(epic__project__created_by=user).order_by('-pk'):
+            story.epic = epics_by_id[story.epic_id]
+            self.stories[(story.epic_id, normalize_import_name(story.name))] = story
+
+    def resolve(self, rows):
+        """
+        Map (row number, project, epic, user story) name tuples to user
+        stories, creating the epics and stories that do not exist yet.
+        Returns tuple (stories by row number, errors by row number)
+        """
+        errors = {}
+        placements = []
+        for row_number, *names in rows:
+            names = [name.strip() for name in names]
+            row_errors = []
+            for header, name in zip(HIERARCHY_HEADERS, names):
+                if not name:
+                    row_errors.append(f"Row {row_number}: {header} is required")
+                elif len(name) > 200:
+                    row_errors.append(f"Row {row_number}: {header} must be at most 200 characters long")
+
+            project_name, epic_name, story_name = names
+            if not row_errors:
+                project = self.projects.get(normalize_import_name(project_name))
+                if project is None:
+                    row_errors.append(f"Row {row_number}: Project '{project_name}' not found")
+
+            if row_errors:
+                errors[row_number] = row_errors
+            else:
+                placements.append((row_number, project, epic_name, story_name))
+
+        new_epics = {}
+        for _, project, epic_name, _ in placements:
+            key = (project.pk, normalize_import_name(epic_name))
+            if key not in self.epics and key not in new_epics:
+                new_epics[key] = Epic(name=epic_name, project=project, created_by=self.user)
+        self._create(Epic, new_epics, self.epics, 'project_id')
+
+        new_stories = {}
+        stories = {}
+        for row_number, project, epic_name, story_name in placements:
+            epic = self.epics[(project.pk, normalize_import_name(epic_name))]
+            key = (epic.pk, normalize_import_name(story_name))
+            if key not in self.stories and key not in new_stories:
+                new_stories[key] = UserStory(name=story_name, epic=epic, created_by=self.user)
+            stories[row_number] = key
+        self._create(UserStory, new_stories, self.stories, 'epic_id')
+
+        return {row_number: self.stories[key] for row_number, key in stories.items()}, errors
+
+    def _create(self, model, new_objects, lookup, parent_field):
+        if not new_objects:
+            return
+        model.objects.bulk_create(new_objects.values())
+
+        if any(obj.pk is None for obj in new_objects.values()):
+            # Backends without RETURNING (MySQL) leave the primary keys unset
+            saved = model.objects.filter(
+                **{f'{parent_field}__in': {getattr(obj, parent_field) for obj in new_objects.values()}},
+                name__in=[obj.name for obj in new_objects.values()],
+            ).order_by('pk').values_list('pk', parent_field, 'name')
+            for pk, parent_id, name in saved:
+                obj = new_objects.get((parent_id, normalize_import_name(name)))
+                if obj is not None:
+                    obj.pk = pk
+                    obj._state.adding = False
+
+        lookup.update(new_objects)
+
+
+IMPORT_MAX_REPORTED_ERRORS = 500
+
+
+def new_import_result(error=''):
+    return {
         'success': False,
         'created': 0,
+        'updated': 0,
+        'unchanged': 0,
+        'skipped': 0,
         'errors': [],
-        'error': ''
+        'error': error
     }
-    
-    try:
-        # Validate user_story exists and user has permission
-        if not isinstance(user_story, UserStory):
-            result['error'] = "Invalid user story provided"
-            return result
-        
-        # Check if user has permission to create test cases for this user story
-        if user_story.epic.project.created_by != created_by:
-            result['error'] = "You don't have permission to create test cases for this user story"
-            return result
-        
-        # Parse Excel file
-        parse_success, testcase_data_list, parse_error = parse_excel_file(excel_file)
-        if not parse_success:
-            result['error'] = parse_error
-            return result
-        
-        if not testcase_data_list:
+
+
+class TestCaseImportWriter:
+    """
+    Saves validated import rows batch by batch, each batch in its own
+    transaction, and accumulates the result of an import that may span
+    several workbooks. See import_testcases_from_excel for user_story and
+    mode.
+    """
+
+    def __init__(self, created_by, user_story=None, mode='append', batch_size=None):
+        self.created_by = created_by
+        self.user_story = user_story
+        self.batch_size = batch_size or getattr(settings, 'TESTCASE_IMPORT_BATCH_SIZE', 1000)
+        self.hierarchy = ImportHierarchy(created_by) if user_story is None else None
+        self.name_index = {} if mode == 'upsert' else None
+        self.indexed_story_ids = set()
+        self.seen_names = {}
+        self.result = new_import_result()
+
+    def report_errors(self, errors, source=''):
+        room = IMPORT_MAX_REPORTED_ERRORS - len(self.result['errors'])
+        if room > 0:
+            prefix = f"{source}: " if source else ''
+            self.result['errors'].extend(prefix + error for error in errors[:room])
+
+    def skip_row(self, row_errors, source=''):
+        self.result['skipped'] += 1
+        self.report_errors(row_errors, source)
+
+    def write(self, rows, source=''):
+        """
+        Save a batch of validated (row number, row data) pairs, as produced
+        by validate_testcase_frame, in one transaction. source names the
+        workbook in error messages.
+        """
+        with transaction.atomic():
+            if self.hierarchy is None:
+                row_stories = {row_idx: self.user_story for row_idx, _ in rows}
+            else:
+                row_stories, placement_errors = self.hierarchy.resolve(
+                    (row_idx, *(row_data.get(header, '') for header in HIERARCHY_HEADERS))
+                    for row_idx, row_data in rows
+                )
+                for errors in placement_errors.values():
+                    self.skip_row(errors, source)
+
+            if self.name_index is not None:
+                story_ids = {story.pk for story in row_stories.values()} - self.indexed_story_ids
+                if story_ids:
+                    self.name_index.update(build_testcase_name_index(story_ids))
+                    self.indexed_story_ids |= story_ids
+
+            testcases = []
+            updates = {}
+            for row_idx, row_data in rows:
+                row_story = row_stories.get(row_idx)
+                if row_story is None:
+                    continue
+                testcase = build_testcase_from_row(row_data, row_story, self.created_by)
+                if self.name_index is None:
+                    testcases.append(testcase)
+                    continue
+
+                key = (row_story.pk, normalize_import_name(testcase.name))
+                if key in self.seen_names:
+                    seen_source, seen_row = self.seen_names[key]
+                    duplicate_of = f"row {seen_row}" if seen_source == source else f"row {seen_row} of {seen_source}"
+                    self.skip_row([f"Row {row_idx}: Test Case Name duplicates {duplicate_of}"], source)
+                    continue
+                self.seen_names[key] = (source, row_idx)
+
+                existing = self.name_index.get(key)
+                if existing is None:
+                    testcases.append(testcase)
+                    continue
+
+                changed_fields = tuple(
+                    field for field in UPSERT_FIELDS if getattr(testcase, field) != existing[field]
+                )
+                if not changed_fields:
+                    self.result['unchanged'] += 1
+                    continue
+                testcase.pk = existing['pk']
+                updates.setdefault(changed_fields, []).append(testcase)
+
+            if testcases:
+                TestCase.objects.bulk_create(testcases, batch_size=self.batch_size)
+            # One UPDATE per combination of changed fields, so untouched
+            # columns are never rewritten
+            now = timezone.now()
+            for changed_fields, changed_testcases in updates.items():
+                for testcase in changed_testcases:
+                    testcase.updated_date = now
+                TestCase.objects.bulk_update(
+                    changed_testcases, [*changed_fields, 'updated_date'], batch_size=self.batch_size
+                )
+
+            # Bulk writes bypass the signal handlers that maintain the search documents
+            story_ids = {story.pk for story in row_stories.values()}
+            if self.hierarchy is not None:
+                epic_ids = {story.epic_id for story in row_stories.values()}
+                index_search_documents('epic', Epic.objects.filter(pk__in=epic_ids, search_document__isnull=True))
+                index_search_documents(
+                    'user_story', UserStory.objects.filter(pk__in=story_ids, search_document__isnull=True)
+                )
+            if testcases:
+                index_search_documents(
+                    'testcase', TestCase.objects.filter(user_story_id__in=story_ids, search_document__isnull=True)
+                )
+            renamed_ids = [
+                testcase.pk
+                for changed_fields, changed_testcases in updates.items()
+                if {'name', 'description'} & set(changed_fields)
+                for testcase in changed_testcases
+            ]
+            if renamed_ids:
+                index_search_documents('testcase', TestCase.objects.filter(pk__in=renamed_ids))
+            if testcases or updates or self.hierarchy is not None:
+                invalidate_user_data_on_commit(self.created_by.pk)
+
+        self.result['created'] += len(testcases)
+        self.result['updated'] += sum(len(changed_testcases) for changed_testcases in updates.values())
+
+    def fail(self, error):
+        self.result['error'] = error
+        if self.result['created'] or self.result['updated']:
+            self.result['error'] += (
+                f" ({self.result['created']} test cases were created and {self.result['updated']} "
+                f"updated before the error)"
+            )
+        return self.result
+
+    def finish(self):
+        result = self.result
+        if not (result['created'] or result['updated'] or result['unchanged']):
             result['error'] = "No valid test case data found in Excel file"
+            if result['errors']:
+                result['error'] += ":\n" + "\n".join(result['errors'][:20])
             return result
-        
-        # Create test cases
-        created_testcases = []
-        errors = []
-        
-        for idx, testcase_data in enumerate(testcase_data_list, start=1):
-            testcase, create_success, create_error = create_testcase_from_data(
-                testcase_data, user_story, created_by
-            )
-            
-            if create_success:
-                created_testcases.append(testcase)
-            else:
-                errors.append(f"Row {idx + 1}: {create_error}")
-        
-        # Bulk create test cases if any were successfully prepared
-        if created_testcases:
-            try:
-                TestCase.objects.bulk_create(created_testcases)
-                result['created'] = len(created_testcases)
-                logger.info(f"Successfully imported {len(created_testcases)} test cases for user {created_by.username}")
-            except Exception as e:
-                result['error'] = f"Error saving test cases to database: {str(e)}"
-                return result
-        
+
         result['success'] = True
-        result['errors'] = errors
-        
+        logger.info(
+            f"Successfully imported test cases for user {self.created_by.username}: {result['created']} created, "
+            f"{result['updated']} updated, {result['unchanged']} unchanged"
+        )
+
         # Log summary
-        if errors:
-            logger.warning(f"Import completed with {len(errors)} errors for user {created_by.username}")
-        
+        if result['skipped']:
+            logger.warning(f"Import skipped {result['skipped']} rows with errors for user {self.created_by.username}")
+
         return result
-        
+
+
+def check_import_target(user_story, created_by, mode):
+    """Return an error message when an import cannot start, or an empty string"""
+    if mode not in ('append', 'upsert'):
+        return f"Unknown import mode: {mode}"
+    if user_story is None:
+        return ""
+
+    # Validate user_story exists and user has permission
+    if not isinstance(user_story, UserStory):
+        return "Invalid user story provided"
+
+    # Check if user has permission to create test cases for this user story
+    if user_story.epic.project.created_by != created_by:
+        return "You don't have permission to create test cases for this user story"
+    return ""
+
+
+def import_testcases_from_excel(excel_file, user_story, created_by, batch_size=None, progress=None, mode='append'):
+    """
+    Main function to import test cases from Excel file.
+
+    Rows are streamed from a read-only workbook, validated and inserted in
+    batches of batch_size (settings.TESTCASE_IMPORT_BATCH_SIZE), each in its
+    own transaction, so memory use does not grow with the file. Invalid rows
+    are skipped and reported; batches already saved are kept if a later one
+    fails. progress, if given, is called with (rows processed, total rows)
+    after every batch.
+
+    With a user_story every row is imported into it. Without one the sheet
+    must have Project, Epic and User Story columns; each row goes to the
+    named story, and epics and stories that do not exist yet are created
+    in the user's existing projects.
+
+    mode 'append' adds every row as a new test case. mode 'upsert' matches
+    rows to the story's test cases by normalized name: new names are
+    created, existing ones are updated through bulk_update over only the
+    fields that changed, and identical rows are left alone.
+
+    Returns dictionary with results: {
+        'success': bool,
+        'created': int,
+        'updated': int (upsert mode),
+        'unchanged': int (upsert mode),
+        'skipped': int,
+        'errors': list (at most IMPORT_MAX_REPORTED_ERRORS),
+        'error': str (if success is False)
+    }
+    """
+    target_error = check_import_target(user_story, created_by, mode)
+    if target_error:
+        return new_import_result(target_error)
+
+    opened, workbook, headers_or_error = open_excel_worksheet(excel_file)
+    if not opened:
+        return new_import_result(headers_or_error)
+
+    try:
+        writer = TestCaseImportWriter(created_by, user_story, mode, batch_size)
+    except Exception:
+        workbook.close()
+        raise
+
+    try:
+        if user_story is None:
+            missing_headers = [header for header in HIERARCHY_HEADERS if header not in headers_or_error]
+            if missing_headers:
+                return writer.fail(f"Missing required headers: {', '.join(missing_headers)}")
+
+        worksheet = workbook.active
+        total_rows = max(worksheet.max_row - 1, 0) if worksheet.max_row else None
+        rows = iter_excel_rows(worksheet, headers_or_error)
+        processed = 0
+
+        while True:
+            batch = list(islice(rows, writer.batch_size))
+            if not batch:
+                break
+
+            row_errors, valid_frame = validate_testcase_frame(build_import_frame(batch))
+            for validation_errors in row_errors.values():
+                writer.skip_row(validation_errors)
+            writer.write(list(zip(valid_frame.index, valid_frame.to_dict('records'))))
+
+            processed += len(batch)
+            if progress:
+                progress(processed, max(total_rows or 0, processed))
+
+    except JobCancelled:
+        raise
     except Exception as e:
         logger.error(f"Unexpected error during Excel import: {str(e)}")
-        result['error'] = f"Unexpected error during import: {str(e)}"
-        return result
+        return writer.fail(f"Unexpected error during import: {str(e)}")
+    finally:
+        workbook.close()
+
+    return writer.finish()
+
+
+# Parsed batches each worker process may have waiting for the importing process
+IMPORT_QUEUED_BATCHES_PER_PROCESS = 2
+IMPORT_QUEUE_POLL_INTERVAL = 0.5
+
+
+def parse_workbook_for_import(path, label, queue, require_hierarchy=False, batch_size=1000):
+    """
+    Process pool task of batch imports: read and validate one workbook,
+    sending each batch to the importing process through queue as soon as it
+    is parsed. Messages are (kind, label, payload) tuples:
+        ('rows', label, list of valid (row number, row data) pairs)
+        ('errors', label, list of error lists, one per invalid row)
+        ('done', label, error message, empty unless the workbook could not be read)
+    'done' is always sent last.
+    """
+    error = ''
+    try:
+        opened, workbook, headers_or_error = open_excel_worksheet(path)
+        if not opened:
+            error = headers_or_error
+            return
+
+        try:
+            missing_headers = [header for header in HIERARCHY_HEADERS if header not in headers_or_error]
+            if require_hierarchy and missing_headers:
+                error = f"Missing required headers: {', '.join(missing_headers)}"
+                return
+
+            rows = iter_excel_rows(workbook.active, headers_or_error)
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                row_errors, valid_frame = validate_testcase_frame(build_import_frame(batch))
+                if row_errors:
+                    queue.put(('errors', label, list(row_errors.values())))
+                if not valid_frame.empty:
+                    queue.put(('rows', label, list(zip(valid_frame.index.tolist(), valid_frame.to_dict('records')))))
+        finally:
+            workbook.close()
+    except Exception as e:
+        error = f"Error reading Excel file: {str(e)}"
+    finally:
+        queue.put(('done', label, error))
+
+
+def find_import_workbooks(path):
+    """Return sorted (label, file path) pairs for the .xlsx files under a directory"""
+    workbooks = []
+    for directory, _, filenames in os.walk(path):
+        for filename in filenames:
+            if filename.lower().endswith('.xlsx') and not filename.startswith('~$'):
+                file_path = os.path.join(directory, filename)
+                workbooks.append((os.path.relpath(file_path, path), file_path))
+    return sorted(workbooks)
+
+
+def extract_import_archive(archive, directory):
+    """
+    Extract the .xlsx members of a zip archive into directory and return
+    (label, file path) pairs. Members are written under generated names, so
+    paths inside the archive cannot escape the directory.
+    """
+    workbooks = []
+    with zipfile.ZipFile(archive) as zip_file:
+        for index, member in enumerate(zip_file.infolist()):
+            name = member.filename
+            if member.is_dir() or not name.lower().endswith('.xlsx') or os.path.basename(name).startswith('~$'):
+                continue
+            file_path = os.path.join(directory, f'{index}.xlsx')
+            with zip_file.open(member) as source, open(file_path, 'wb') as target:
+                shutil.copyfileobj(source, target)
+            workbooks.append((name, file_path))
+    return sorted(workbooks)
+
+
+def import_testcase_workbooks(workbooks, created_by, user_story=None, mode='append', processes=None,
+                              batch_size=None, progress=None):
+    """
+    Import many workbooks as one batch. openpyxl parsing is CPU bound, so
+    workbooks are read and validated in a ProcessPoolExecutor while this
+    process funnels their rows through a single TestCaseImportWriter.
+    Workers hand their rows over in batches through a queue holding at most
+    IMPORT_QUEUED_BATCHES_PER_PROCESS batches per process, and wait while it
+    is full, so memory use does not grow with the size of the workbooks.
+
+    workbooks is a list of (label, file path) pairs; labels prefix the row
+    errors. user_story and mode are as for import_testcases_from_excel.
+    progress, if given, is called with (workbooks done, workbooks) after
+    each workbook. Returns the aggregated import result, with a 'files'
+    list of {'file', 'rows', 'skipped', 'error'} per workbook.
+    """
+    target_error = check_import_target(user_story, created_by, mode)
+    if target_error:
+        return {**new_import_result(target_error), 'files': []}
+
+    writer = TestCaseImportWriter(created_by, user_story, mode, batch_size)
+    files = []
+    workbooks = list(workbooks)
+    pending_workbooks = iter(workbooks)
+    processes = processes or os.cpu_count() or 1
+
+    # Spawned rather than forked workers, so they never share this
+    # process's open database connection. The initializer must not import
+    # the models, which need the app registry it sets up.
+    context = multiprocessing.get_context('spawn')
+    pool = ProcessPoolExecutor(max_workers=processes, mp_context=context, initializer=django.setup)
+    # The manager is shut down first on the way out, which fails the puts of
+    # workers still blocked on a full queue, so the pool can then exit
+    with pool, context.Manager() as manager:
+        queue = manager.Queue(maxsize=processes * IMPORT_QUEUED_BATCHES_PER_PROCESS)
+        running = {}
+
+        def submit_next():
+            for label, path in islice(pending_workbooks, 1):
+                future = pool.submit(
+                    parse_workbook_for_import, path, label, queue, user_story is None, writer.batch_size
+                )
+                running[label] = {'future': future, 'rows': 0, 'skipped': 0}
+
+        def finish_workbook(label, error):
+            state = running.pop(label)
+            if error:
+                writer.report_errors([error], label)
+            files.append({'file': label, 'rows': state['rows'], 'skipped': state['skipped'], 'error': error})
+            submit_next()
+            if progress:
+                progress(len(files), len(workbooks))
+
+        for _ in range(processes):
+            submit_next()
+
+        try:
+            while running:
+                try:
+                    kind, label, payload = queue.get(timeout=IMPORT_QUEUE_POLL_INTERVAL)
+                except Empty:
+                    # A worker that died never sends its 'done' message
+                    for label, state in list(running.items()):
+                        if state['future'].done() and state['future'].exception() is not None:
+                            finish_workbook(label, f"Error reading Excel file: {str(state['future'].exception())}")
+                    continue
+
+                if kind == 'done':
+                    if label in running:
+                        finish_workbook(label, payload)
+                    continue
+
+                skipped_before = writer.result['skipped']
+                if kind == 'rows':
+                    writer.write(payload, label)
+                else:
+                    for row_errors in payload:
+                        writer.skip_row(row_errors, label)
+                if label in running:
+                    running[label]['rows'] += len(payload)
+                    running[label]['skipped'] += writer.result['skipped'] - skipped_before
+        except JobCancelled:
+            pool.shutdown(cancel_futures=True, wait=False)
+            raise
+        except Exception as e:
+            pool.shutdown(cancel_futures=True, wait=False)
+            logger.error(f"Unexpected error during batch import: {str(e)}")
+            result = writer.fail(f"Unexpected error during import: {str(e)}")
+            result['files'] = sorted(files, key=lambda file: file['file'])
+            return result
+
+    result = writer.finish()
+    result['files'] = sorted(files, key=lambda file: file['file'])
+    return result
 
 
 def generate_sample_excel_data():
@@ -321,140 +900,262 @@ def generate_sample_excel_data():
     return sample_data
 
 
+TESTCASE_EXPORT_HEADERS = [
+    'Test Case Name', 'Description', 'Test Steps', 'Expected Results',
+    'Priority', 'Status', 'Execution Status', 'Is Automated',
+    'User Story', 'Epic', 'Project', 'Created Date', 'Updated Date'
+]
+
+TESTCASE_EXPORT_FIELDS = (
+    'id', 'name', 'description', 'test_steps', 'expected_results',
+    'priority', 'status', 'execution_status', 'is_automated',
+    'user_story__name', 'user_story__epic__name', 'user_story__epic__project__name',
+    'created_date', 'updated_date',
+)
+
+
+def iter_testcase_export_records(testcases, chunk_size=2000):
+    """Yield test cases as flat dicts, newest first, fetched in keyset chunks"""
+    return iterate_in_chunks(
+        testcases.values(*TESTCASE_EXPORT_FIELDS), ('-created_date', '-id'), chunk_size
+    )
+
+
+def iter_testcase_export_rows(testcases, chunk_size=2000):
+    """Yield one formatted row per test case, in TESTCASE_EXPORT_HEADERS order"""
+    priority_labels = dict(TestCase.PRIORITY_CHOICES)
+    status_labels = dict(TestCase.STATUS_CHOICES)
+    execution_status_labels = dict(TestCase.EXECUTION_STATUS_CHOICES)
+
+    for record in iter_testcase_export_records(testcases, chunk_size=chunk_size):
+        yield [
+            record['name'],
+            record['description'],
+            record['test_steps'],
+            record['expected_results'],
+            priority_labels.get(record['priority'], record['priority']),
+            status_labels.get(record['status'], record['status']),
+            execution_status_labels.get(record['execution_status'], record['execution_status']),
+            'Yes' if record['is_automated'] else 'No',
+            record['user_story__name'],
+            record['user_story__epic__name'],
+            record['user_story__epic__project__name'],
+            record['created_date'].strftime('%Y-%m-%d %H:%M:%S'),
+            record['updated_date'].strftime('%Y-%m-%d %H:%M:%S'),
+        ]
+
+
+def iter_testcase_ndjson_records(testcases, chunk_size=2000):
+    """Yield machine readable test case records for NDJSON export"""
+    for record in iter_testcase_export_records(testcases, chunk_size=chunk_size):
+        yield {
+            'id': record['id'],
+            'name': record['name'],
+            'description': record['description'],
+            'test_steps': record['test_steps'],
+            'expected_results': record['expected_results'],
+            'priority': record['priority'],
+            'status': record['status'],
+            'execution_status': record['execution_status'],
+            'is_automated': record['is_automated'],
+            'user_story': record['user_story__name'],
+            'epic': record['user_story__epic__name'],
+            'project': record['user_story__epic__project__name'],
+            'created_date': record['created_date'],
+            'updated_date': record['updated_date'],
+        }
+
+
 def export_testcases_to_excel(testcases, filename=None):
     """
     Export test cases to Excel format.
-    Returns tuple (success, file_path_or_error_message)
+    Returns tuple (success, file_path_or_error_message); without a filename
+    the file is a temporary file positioned at the start.
     """
+    output = filename or tempfile.TemporaryFile(suffix='.xlsx')
     try:
-        # Create workbook and worksheet
-        workbook = openpyxl.Workbook()
-        worksheet = workbook.active
-        worksheet.title = "Test Cases"
-        
-        # Define headers
-        headers = [
-            'Test Case Name', 'Description', 'Test Steps', 'Expected Results',
-            'Priority', 'Status', 'Execution Status', 'Is Automated',
-            'User Story', 'Epic', 'Project', 'Created Date', 'Updated Date'
-        ]
-        
-        # Write headers
-        for col_idx, header in enumerate(headers, start=1):
-            worksheet.cell(row=1, column=col_idx, value=header)
-        
-        # Write test case data
-        for row_idx, testcase in enumerate(testcases, start=2):
-            worksheet.cell(row=row_idx, column=1, value=testcase.name)
-            worksheet.cell(row=row_idx, column=2, value=testcase.description)
-            worksheet.cell(row=row_idx, column=3, value=testcase.test_steps)
-            worksheet.cell(row=row_idx, column=4, value=testcase.expected_results)
-            worksheet.cell(row=row_idx, column=5, value=testcase.get_priority_display())
-            worksheet.cell(row=row_idx, column=6, value=testcase.get_status_display())
-            worksheet.cell(row=row_idx, column=7, value=testcase.get_execution_status_display())
-            worksheet.cell(row=row_idx, column=8, value='Yes' if testcase.is_automated else 'No')
-            worksheet.cell(row=row_idx, column=9, value=testcase.user_story.name)
-            worksheet.cell(row=row_idx, column=10, value=testcase.user_story.epic.name)
-            worksheet.cell(row=row_idx, column=11, value=testcase.user_story.epic.project.name)
-            worksheet.cell(row=row_idx, column=12, value=testcase.created_date.strftime('%Y-%m-%d %H:%M:%S'))
-            worksheet.cell(row=row_idx, column=13, value=testcase.updated_date.strftime('%Y-%m-%d %H:%M:%S'))
-        
-        # Auto-adjust column widths
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 50)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-        
-        # Save to BytesIO if no filename provided (for HTTP response)
+        write_streaming_workbook(
+            output, "Test Cases", TESTCASE_EXPORT_HEADERS,
+            iter_testcase_export_rows(testcases), max_width=50,
+        )
         if not filename:
-            excel_buffer = io.BytesIO()
-            workbook.save(excel_buffer)
-            excel_buffer.seek(0)
-            return True, excel_buffer
-        else:
-            workbook.save(filename)
-            return True, filename
-            
+            output.seek(0)
+        return True, output
+
     except Exception as e:
+        if not filename:
+            output.close()
         logger.error(f"Error exporting test cases to Excel: {str(e)}")
         return False, f"Error exporting to Excel: {str(e)}"
 
 
-def generate_execution_excel_report(executions):
+EXECUTION_REPORT_HEADERS = [
+    "Test Run", "Test Case", "Project", "Epic", "User Story", "Status",
+    "Executor", "Execution Date", "Duration (min)", "Comments", "Notes"
+]
+
+
+def filter_report_executions(executions, filters):
+    """Apply cleaned TestExecutionReportForm filters to an executions queryset"""
+    if filters['date_from']:
+        executions = executions.filter(execution_date__gte=filters['date_from'])
+    if filters['date_to']:
+        # Adjust date_to to include the whole day
+        date_to = filters['date_to'] + timedelta(days=1) - timedelta(microseconds=1)
+        executions = executions.filter(execution_date__lte=date_to)
+    if filters['project']:
+        executions = executions.filter(project=filters['project'])
+    if filters['epic']:
+        executions = executions.filter(testcase__user_story__epic=filters['epic'])
+    if filters['status']:
+        executions = executions.filter(status=filters['status'])
+    if filters['executor']:
+        executions = executions.filter(executor=filters['executor'])
+    return executions
+
+
+EXECUTION_EXPORT_FIELDS = (
+    'id', 'test_run__name', 'testcase__name', 'project__name',
+    'testcase__user_story__epic__name', 'testcase__user_story__name', 'status',
+    'executor_id', 'executor__username', 'executor__first_name', 'executor__last_name',
+    'execution_date', 'execution_time_minutes', 'comments', 'notes',
+)
+
+
+def iter_execution_export_records(executions, chunk_size=2000):
     """
-    Generates an Excel report for a given queryset of TestExecution objects.
-    Returns a BytesIO object containing the Excel file.
+    Yield executions as flat dicts in report order (newest first). The
+    related names come from a single join and rows are fetched in keyset
+    chunks, so memory stays flat however many executions match.
     """
-    try:
-        workbook = openpyxl.Workbook()
-        worksheet = workbook.active
-        worksheet.title = "Execution Report"
+    return iterate_in_chunks(
+        executions.values(*EXECUTION_EXPORT_FIELDS), ('-execution_date', '-id'), chunk_size
+    )
+
+
+def iter_execution_report_rows(executions, chunk_size=2000):
+    """Yield one formatted report row per execution, in EXECUTION_REPORT_HEADERS order"""
+    status_labels = dict(TestExecution.STATUS_CHOICES)
 
-        headers = [
-            "Test Run", "Test Case", "Project", "Epic", "User Story", "Status",
-            "Executor", "Execution Date", "Duration (min)", "Comments", "Notes"
+    for record in iter_execution_export_records(executions, chunk_size=chunk_size):
+        executor_name = f"{record['executor__first_name']} {record['executor__last_name']}".strip()
+        execution_date = record['execution_date']
+        minutes = record['execution_time_minutes']
+        yield [
+            record['test_run__name'],
+            record['testcase__name'],
+            record['project__name'],
+            record['testcase__user_story__epic__name'],
+            record['testcase__user_story__name'],
+            status_labels.get(record['status'], record['status']),
+            executor_name if record['executor_id'] else "N/A",
+            execution_date.strftime("%Y-%m-%d %H:%M:%S") if execution_date else "N/A",
+            minutes if minutes is not None else "N/A",
+            record['comments'],
+            record['notes'],
         ]
-        worksheet.append(headers)
-
-        for execution in executions:
-            row_data = [
-                execution.test_run.name,
-                execution.testcase.name,
-                execution.testcase.user_story.epic.project.name,
-                execution.testcase.user_story.epic.name,
-                execution.testcase.user_story.name,
-                execution.get_status_display(),
-                execution.executor.get_full_name() if execution.executor else "N/A",
-                execution.execution_date.strftime("%Y-%m-%d %H:%M:%S") if execution.execution_date else "N/A",
-                execution.execution_time_minutes if execution.execution_time_minutes is not None else "N/A",
-                execution.comments,
-                execution.notes,
-            ]
-            worksheet.append(row_data)
-        
-        # Auto-adjust column widths
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            adjusted_width = min(max_length + 2, 70)
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-
-        excel_buffer = io.BytesIO()
-        workbook.save(excel_buffer)
-        excel_buffer.seek(0)
-        logger.info("Successfully generated execution Excel report.")
-        return excel_buffer
 
-    except Exception as e:
-        logger.error(f"Error generating execution Excel report: {e}")
-        return None
+
+def iter_execution_ndjson_records(executions, chunk_size=2000):
+    """Yield machine readable execution records for NDJSON export"""
+    for record in iter_execution_export_records(executions, chunk_size=chunk_size):
+        yield {
+            'id': record['id'],
+            'test_run': record['test_run__name'],
+            'test_case': record['testcase__name'],
+            'project': record['project__name'],
+            'epic': record['testcase__user_story__epic__name'],
+            'user_story': record['testcase__user_story__name'],
+            'status': record['status'],
+            'executor': record['executor__username'],
+            'execution_date': record['execution_date'],
+            'execution_time_minutes': record['execution_time_minutes'],
+            'comments': record['comments'],
+            'notes': record['notes'],
+        }
+
+
+class Echo:
+    """File-like object whose write() hands the value back, for streaming csv.writer output"""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(headers, rows, rows_per_chunk=500):
+    """Yield CSV text in blocks of rows_per_chunk rows"""
+    writer = csv.writer(Echo())
+    buffer = [writer.writerow(headers)]
+    for row in rows:
+        buffer.append(writer.writerow(row))
+        if len(buffer) >= rows_per_chunk:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def stream_ndjson(records, rows_per_chunk=500):
+    """Yield newline delimited JSON in blocks of rows_per_chunk records"""
+    buffer = []
+    for record in records:
+        buffer.append(json.dumps(record, cls=DjangoJSONEncoder) + '\n')
+        if len(buffer) >= rows_per_chunk:
+            yield ''.join(buffer)
+            buffer = []
+    if buffer:
+        yield ''.join(buffer)
+
+
+def write_streaming_workbook(output, title, headers, rows, max_width=70, sample_size=None):
+    """
+    Write rows to an xlsx file using openpyxl's write-only mode, which keeps
+    memory flat regardless of the number of rows.
+    Write-only sheets emit their column widths before the first row, so the
+    widths cannot follow the whole stream: they are sized from the headers
+    and the first sample_size rows (settings.EXPORT_COLUMN_WIDTH_SAMPLE_ROWS),
+    which are held in memory until the widths are set.
+    """
+    if sample_size is None:
+        sample_size = getattr(settings, 'EXPORT_COLUMN_WIDTH_SAMPLE_ROWS', 1000)
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet(title)
+
+    rows = iter(rows)
+    sample = list(islice(rows, sample_size))
+    widths = [len(str(header)) for header in headers]
+    for row in sample:
+        for col_idx, value in enumerate(row):
+            if value is not None:
+                widths[col_idx] = max(widths[col_idx], len(str(value)))
+    for col_idx, width in enumerate(widths, start=1):
+        worksheet.column_dimensions[get_column_letter(col_idx)].width = min(width + 2, max_width)
+
+    worksheet.append(headers)
+    for row in chain(sample, rows):
+        worksheet.append(row)
+
+    workbook.save(output)
+    return output
+
 
 def calculate_execution_metrics(executions_queryset):
     """
     Calculates execution metrics for a given queryset of TestExecution objects.
     Returns a dictionary with various statistics.
     """
+    statuses = ['passed', 'failed', 'skipped', 'blocked', 'not_executed', 'in_progress']
+    # Every per-status count and time statistic in one aggregate query
+    totals = executions_queryset.order_by().aggregate(
+        total=Count('id'),
+        **{status: Count('id', filter=Q(status=status)) for status in statuses},
+        avg_time=Avg('execution_time_minutes'),
+        total_time=Sum('execution_time_minutes'),
+        unique_executors=Count('executor', distinct=True),
+    )
     metrics = {
-        'total': executions_queryset.count(),
-        'passed': 0,
-        'failed': 0,
-        'skipped': 0,
-        'blocked': 0,
-        'not_executed': 0,
-        'in_progress': 0,
+        'total': totals['total'],
+        **{status: totals[status] for status in statuses},
         'pass_rate': 0.0,
         'avg_execution_time': 0.0,
         'total_execution_time': 0,
@@ -468,49 +1169,34 @@ def calculate_execution_metrics(executions_queryset):
         return metrics
 
     try:
-        metrics['passed'] = executions_queryset.filter(status='passed').count()
-        metrics['failed'] = executions_queryset.filter(status='failed').count()
-        metrics['skipped'] = executions_queryset.filter(status='skipped').count()
-        metrics['blocked'] = executions_queryset.filter(status='blocked').count()
-        metrics['not_executed'] = executions_queryset.filter(status='not_executed').count()
-        metrics['in_progress'] = executions_queryset.filter(status='in_progress').count()
-
         executed_count = metrics['passed'] + metrics['failed'] + metrics['skipped'] + metrics['blocked']
         if executed_count > 0:
             metrics['pass_rate'] = (metrics['passed'] / executed_count) * 100
 
-        avg_time_agg = executions_queryset.filter(
-            execution_time_minutes__isnull=False
-        ).aggregate(avg_time=Avg('execution_time_minutes'))
-        metrics['avg_execution_time'] = avg_time_agg['avg_time'] if avg_time_agg['avg_time'] is not None else 0.0
-
-        total_time_agg = executions_queryset.filter(
-            execution_time_minutes__isnull=False
-        ).aggregate(total_time=Sum('execution_time_minutes'))
-        metrics['total_execution_time'] = total_time_agg['total_time'] if total_time_agg['total_time'] is not None else 0
-
-        metrics['unique_executors'] = executions_queryset.filter(executor__isnull=False).values('executor').distinct().count()
+        metrics['avg_execution_time'] = totals['avg_time'] if totals['avg_time'] is not None else 0.0
+        metrics['total_execution_time'] = totals['total_time'] if totals['total_time'] is not None else 0
+        metrics['unique_executors'] = totals['unique_executors']
 
         # Project-wise breakdown
-        project_stats = Project.objects.filter(
-            epics__user_stories__test_cases__test_executions__in=executions_queryset
+        project_stats = executions_queryset.filter(project__isnull=False).order_by().values(
+            'project_id', 'project__name'
         ).annotate(
-            total_executions=Count('epics__user_stories__test_cases__test_executions', distinct=True),
-            passed_executions=Count('epics__user_stories__test_cases__test_executions', filter=Q(epics__user_stories__test_cases__test_executions__status='passed'), distinct=True),
-            failed_executions=Count('epics__user_stories__test_cases__test_executions', filter=Q(epics__user_stories__test_cases__test_executions__status='failed'), distinct=True),
-            avg_time=Avg('epics__user_stories__test_cases__test_executions__execution_time_minutes')
+            total_executions=Count('id'),
+            passed_executions=Count('id', filter=Q(status='passed')),
+            failed_executions=Count('id', filter=Q(status='failed')),
+            avg_time=Avg('execution_time_minutes')
         ).order_by('-total_executions')
 
         for project in project_stats:
-            pass_rate = (project.passed_executions / (project.passed_executions + project.failed_executions) * 100) if (project.passed_executions + project.failed_executions) > 0 else 0
+            pass_rate = (project['passed_executions'] / (project['passed_executions'] + project['failed_executions']) * 100) if (project['passed_executions'] + project['failed_executions']) > 0 else 0
             metrics['projects_breakdown'].append({
-                'id': project.id,
-                'name': project.name,
-                'total_executions': project.total_executions,
-                'passed_executions': project.passed_executions,
-                'failed_executions': project.failed_executions,
+                'id': project['project_id'],
+                'name': project['project__name'],
+                'total_executions': project['total_executions'],
+                'passed_executions': project['passed_executions'],
+                'failed_executions': project['failed_executions'],
                 'pass_rate': pass_rate,
-                'avg_execution_time': project.avg_time if project.avg_time is not None else 0.0
+                'avg_execution_time': project['avg_time'] if project['avg_time'] is not None else 0.0
             })
         
         # Assignee performance
@@ -538,16 +1224,7 @@ def calculate_execution_metrics(executions_queryset):
             })
 
         # Execution Trends (last 30 days)
-        today = timezone.localdate()
-        for i in range(30):
-            current_date = today - timedelta(days=29 - i)
-            metrics['trends']['labels'].append(current_date.strftime('%Y-%m-%d'))
-            daily_executions = executions_queryset.filter(
-                execution_date__date=current_date
-            )
-            metrics['trends']['total'].append(daily_executions.count())
-            metrics['trends']['passed'].append(daily_executions.filter(status='passed').count())
-            metrics['trends']['failed'].append(daily_executions.filter(status='failed').count())
+        metrics['trends'] = get_queryset_execution_trends(executions_queryset, label_format='%Y-%m-%d')
 
         logger.info("Successfully calculated execution metrics.")
         return metrics
@@ -579,128 +1256,407 @@ def send_execution_notification(subject, message, recipient_list, from_email=Non
         logger.error(f"Failed to send execution notification: {e}")
         return False
 
+def pdf_text(value):
+    """Core PDF fonts only cover latin-1; replace anything else"""
+    return str(value if value is not None else '').encode('latin-1', 'replace').decode('latin-1')
+
+
 class PDFReport(FPDF):
+    # (header, width in mm) of the detailed results table on a landscape A4 page
+    TABLE_COLUMNS = [
+        ('Execution Date', 32), ('Test Case', 60), ('Test Run', 40), ('Project', 35),
+        ('Status', 22), ('Executor', 30), ('Min', 14), ('Comments', 44),
+    ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.table_header = False
+
     def header(self):
-        self.set_font('Arial', 'B', 15)
-        self.cell(0, 10, 'Test Execution Report', 0, 1, 'C')
-        self.ln(10)
+        self.set_font('Helvetica', 'B', 15)
+        self.cell(0, 10, 'Test Execution Report', align='C', new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+        self.ln(4)
+        if self.table_header:
+            self.table_header_row()
 
     def footer(self):
         self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.cell(0, 10, f'Page {self.page_no()}/{{nb}}', 0, 0, 'C')
+        self.set_font('Helvetica', 'I', 8)
+        self.cell(0, 10, f'Page {self.page_no()}/{{nb}}', align='C')
 
     def chapter_title(self, title):
-        self.set_font('Arial', 'B', 12)
-        self.cell(0, 10, title, 0, 1, 'L')
+        self.set_font('Helvetica', 'B', 12)
+        self.cell(0, 10, pdf_text(title), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
         self.ln(2)
 
     def chapter_body(self, body):
-        self.set_font('Arial', '', 10)
-        self.multi_cell(0, 5, body)
+        self.set_font('Helvetica', '', 10)
+        self.multi_cell(0, 5, pdf_text(body))
         self.ln()
 
-def create_execution_pdf_report(executions_queryset):
+    def table_header_row(self):
+        self.set_font('Helvetica', 'B', 8)
+        for title, width in self.TABLE_COLUMNS:
+            self.cell(width, 6, title, border=1)
+        self.ln()
+
+    def table_row(self, values):
+        self.set_font('Helvetica', '', 8)
+        for value, (_, width) in zip(values, self.TABLE_COLUMNS):
+            self.cell(width, 5, self.fit_text(pdf_text(value), width - 2), border=1)
+        self.ln()
+
+    def fit_text(self, text, width):
+        """Truncate text so it fits in a cell of the given width"""
+        # No character is narrower than half a millimetre at table font sizes
+        text = ' '.join(text[:int(width * 2) + 1].split())
+        if self.get_string_width(text) <= width:
+            return text
+        while text and self.get_string_width(text + '...') > width:
+            text = text[:-1]
+        return text + '...'
+
+
+def get_execution_report_summary(executions_queryset):
+    """Headline numbers for an executions report, computed in a single aggregate query"""
+    summary = executions_queryset.order_by().aggregate(
+        total=Count('id'),
+        unique_executors=Count('executor', distinct=True),
+        avg_execution_time=Avg('execution_time_minutes'),
+        total_execution_time=Sum('execution_time_minutes'),
+        **{status: Count('id', filter=Q(status=status)) for status, _ in TestExecution.STATUS_CHOICES},
+    )
+    executed_count = summary['passed'] + summary['failed'] + summary['skipped'] + summary['blocked']
+    summary['pass_rate'] = (summary['passed'] / executed_count) * 100 if executed_count else 0.0
+    summary['avg_execution_time'] = summary['avg_execution_time'] or 0.0
+    summary['total_execution_time'] = summary['total_execution_time'] or 0
+    return summary
+
+
+def create_execution_pdf_report(executions_queryset, output_path=None, max_rows=None, chunk_size=1000, progress=None):
     """
-    Generates a PDF report for a given queryset of TestExecution objects.
-    Returns a BytesIO object containing the PDF file.
+    Generates a PDF report for a given queryset of TestExecution objects and
+    writes it to output_path (a new temporary file when omitted).
+
+    Rows are read in chunks from a flat values() projection. FPDF keeps the
+    document in memory until it is written, so at most max_rows executions
+    (PDF_REPORT_MAX_ROWS by default) are listed individually; the rest are
+    summarised per project and status in an appendix.
+
+    progress, if given, is called with (rows written, rows to write) after
+    every chunk. Returns the file path, or None on error.
     """
+    if max_rows is None:
+        max_rows = getattr(settings, 'PDF_REPORT_MAX_ROWS', 5000)
+    if output_path is None:
+        fd, output_path = tempfile.mkstemp(suffix='.pdf')
+        os.close(fd)
+
     try:
-        pdf = PDFReport()
+        pdf = PDFReport(orientation='L', format='A4')
         pdf.alias_nb_pages()
-        pdf.add_page()
         pdf.set_auto_page_break(auto=True, margin=15)
+        pdf.add_page()
 
-        metrics = calculate_execution_metrics(executions_queryset)
+        summary = get_execution_report_summary(executions_queryset)
+        listed_rows = min(summary['total'], max_rows)
 
         # Summary Section
         pdf.chapter_title("1. Execution Summary")
         summary_text = (
-            f"Total Executions: {metrics['total']}\\n"
-            f"Passed: {metrics['passed']}\\n"
-            f"Failed: {metrics['failed']}\\n"
-            f"Skipped: {metrics['skipped']}\\n"
-            f"Blocked: {metrics['blocked']}\\n"
-            f"Not Executed: {metrics['not_executed']}\\n"
-            f"In Progress: {metrics['in_progress']}\\n"
-            f"Pass Rate: {metrics['pass_rate']:.2f}%\\n"
-            f"Average Execution Time: {metrics['avg_execution_time']:.2f} minutes\\n"
-            f"Total Execution Time: {metrics['total_execution_time']} minutes\\n"
+            f"Total Executions: {summary['total']}\n"
+            f"Passed: {summary['passed']}\n"
+            f"Failed: {summary['failed']}\n"
+            f"Skipped: {summary['skipped']}\n"
+            f"Blocked: {summary['blocked']}\n"
+            f"Not Executed: {summary['not_executed']}\n"
+            f"In Progress: {summary['in_progress']}\n"
+            f"Pass Rate: {summary['pass_rate']:.2f}%\n"
+            f"Average Execution Time: {summary['avg_execution_time']:.2f} minutes\n"
+            f"Total Execution Time: {summary['total_execution_time']} minutes\n"
+            f"Executors: {summary['unique_executors']}\n"
         )
         pdf.chapter_body(summary_text)
 
         # Detailed Executions
         pdf.chapter_title("2. Detailed Execution Results")
-        if not executions_queryset.exists():
+        if not summary['total']:
             pdf.chapter_body("No detailed execution results found for the selected filters.")
         else:
-            for i, execution in enumerate(executions_queryset, 1):
-                pdf.chapter_title(f"2.{i}. Test Case: {execution.testcase.name} ({execution.test_run.name})")
-                details = (
-                    f"Project: {execution.testcase.user_story.epic.project.name}\\n"
-                    f"Epic: {execution.testcase.user_story.epic.name}\\n"
-                    f"User Story: {execution.testcase.user_story.name}\\n"
-                    f"Status: {execution.get_status_display()}\\n"
-                    f"Executor: {execution.executor.get_full_name() if execution.executor else 'N/A'}\\n"
-                    f"Execution Date: {execution.execution_date.strftime('%Y-%m-%d %H:%M:%S') if execution.execution_date else 'N/A'}\\n"
-                    f"Duration: {execution.execution_time_minutes} minutes\\n"
-                    f"Comments: {execution.comments}\\n"
-                    f"Notes: {execution.notes}\\n"
+            if listed_rows < summary['total']:
+                pdf.chapter_body(
+                    f"The {listed_rows} most recent executions are listed below. The remaining "
+                    f"{summary['total'] - listed_rows} are summarised in the appendix."
                 )
-                pdf.chapter_body(details)
-        
-        pdf_buffer = io.BytesIO()
-        pdf.output(pdf_buffer)
-        pdf_buffer.seek(0)
+
+            status_labels = dict(TestExecution.STATUS_CHOICES)
+            ordering = ('-execution_date', '-id')
+            records = executions_queryset.values(*EXECUTION_EXPORT_FIELDS)
+            pdf.table_header_row()
+            pdf.table_header = True
+
+            written = 0
+            last_record = None
+            for record in iterate_in_chunks(records, ordering, chunk_size):
+                if written >= listed_rows:
+                    break
+                execution_date = record['execution_date']
+                executor_name = f"{record['executor__first_name']} {record['executor__last_name']}".strip()
+                pdf.table_row([
+                    execution_date.strftime('%Y-%m-%d %H:%M') if execution_date else 'N/A',
+                    record['testcase__name'],
+                    record['test_run__name'],
+                    record['project__name'],
+                    status_labels.get(record['status'], record['status']),
+                    (executor_name or record['executor__username']) if record['executor_id'] else 'N/A',
+                    record['execution_time_minutes'] if record['execution_time_minutes'] is not None else '',
+                    record['comments'],
+                ])
+                written += 1
+                last_record = record
+                if progress and written % chunk_size == 0:
+                    progress(written, listed_rows)
+            pdf.table_header = False
+
+            if last_record is not None and listed_rows < summary['total']:
+                omitted = CursorPaginator(records, chunk_size, ordering).rows_after(last_record).order_by().values('project__name', 'status').annotate(
+                    count=Count('id'), total_time=Sum('execution_time_minutes')
+                ).order_by('project__name', 'status')
+
+                pdf.add_page()
+                pdf.chapter_title(f"Appendix: {summary['total'] - listed_rows} Executions Not Listed")
+                for row in omitted:
+                    pdf.chapter_body(
+                        f"{row['project__name'] or 'No project'} - {status_labels.get(row['status'], row['status'])}: "
+                        f"{row['count']} executions, {row['total_time'] or 0} minutes"
+                    )
+
+        pdf.output(output_path)
+        if progress:
+            progress(listed_rows, listed_rows)
         logger.info("Successfully generated PDF execution report.")
-        return pdf_buffer
+        return output_path
+    except JobCancelled:
+        os.remove(output_path)
+        raise
     except Exception as e:
+        os.remove(output_path)
         logger.error(f"Error generating PDF execution report: {e}")
         return None
 
 @transaction.atomic
+def materialize_test_run(test_run, testcases):
+    """
+    Create a not executed TestExecution in test_run for every test case of
+    the testcases queryset with a single INSERT ... SELECT, so no rows make
+    a round trip through Python. Signals are bypassed; the run's
+    not_executed counter is adjusted here (rollups only count executed
+    rows). Call inside a transaction together with the run's creation.
+    Returns metrics: {'executions': int, 'elapsed_ms': float}
+    """
+    started = perf_counter()
+    execution_table = TestExecution._meta.db_table
+    quote = connection.ops.quote_name
+
+    # Aliased so the derived table's column names are known on every backend
+    source = testcases.order_by().annotate(
+        source_testcase=F('pk'), source_project=F('project_id'), source_owner=F('owner_id')
+    ).values_list('source_testcase', 'source_project', 'source_owner')
+    source_sql, source_params = source.query.sql_with_params()
+    source_columns = ['source_testcase', 'source_project', 'source_owner']
+    constants = {
+        'test_run': test_run.pk,
+        'status': 'not_executed',
+        'comments': '',
+        'notes': '',
+    }
+    insert_columns = [TestExecution._meta.get_field(name).column for name in ('testcase', 'project', 'owner', *constants)]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(execution_table)} ({', '.join(quote(column) for column in insert_columns)}) "
+            f"SELECT {', '.join(f'source.{quote(column)}' for column in source_columns)}, "
+            f"{', '.join(['%s'] * len(constants))} "
+            f"FROM ({source_sql}) source",
+            [*constants.values(), *source_params],
+        )
+        created = cursor.rowcount
+
+    TestRun.apply_execution_count_deltas({(test_run.pk, 'not_executed'): created})
+    # Runs are built from their creator's test cases
+    invalidate_user_data_on_commit(test_run.created_by_id)
+    elapsed_ms = round((perf_counter() - started) * 1000, 1)
+    logger.info(f"Materialized {created} executions for test run {test_run.pk} in {elapsed_ms}ms")
+    return {'executions': created, 'elapsed_ms': elapsed_ms}
+
+
+# Statuses of the source executions copied by each clone scope (None copies every execution)
+TEST_RUN_CLONE_STATUSES = {
+    'all': None,
+    'failed': ('failed',),
+    'blocked': ('blocked',),
+}
+
+
+def clone_test_run(source_run, name, created_by, scope='all', description=''):
+    """
+    Start a new test run from the test cases of source_run, limited to the
+    executions whose status is in the scope's TEST_RUN_CLONE_STATUSES. The
+    new executions are created not executed with the single INSERT ... SELECT
+    of materialize_test_run, joined on the source run's executions. Nothing
+    is created when no execution matches.
+    Returns (test_run or None, metrics)
+    """
+    source = {'test_executions__test_run': source_run}
+    statuses = TEST_RUN_CLONE_STATUSES[scope]
+    if statuses:
+        # One filter() call, so the run and status conditions apply to the same execution
+        source['test_executions__status__in'] = statuses
+
+    with transaction.atomic():
+        test_run = TestRun.objects.create(
+            name=name,
+            description=description,
+            created_by=created_by,
+            status='not_started'
+        )
+        metrics = materialize_test_run(test_run, TestCase.objects.filter(**source))
+        if not metrics['executions']:
+            transaction.set_rollback(True)
+            return None, metrics
+
+    logger.info(f"Cloned test run {source_run.pk} ({scope}) into {test_run.pk}")
+    return test_run, metrics
+
+
+def reconcile_test_run(test_run, testcases):
+    """
+    Make the executions of test_run match the testcases queryset in one
+    transaction. Both sides of the diff are computed in SQL: executions of
+    test cases no longer selected are deleted through the queryset, with
+    their cascades, and the newly selected test cases are materialized in
+    bulk. The per-row counter and rollup handlers are suspended during the
+    delete; the deltas of the removed executions are applied once, in
+    aggregate.
+    Returns metrics: {'added': int, 'removed': int, 'elapsed_ms': float}
+    """
+    from .signals import apply_execution_changes, execution_tracking_suspended
+
+    started = perf_counter()
+    run_executions = TestExecution.objects.filter(test_run=test_run)
+
+    with transaction.atomic():
+        dropped = run_executions.exclude(testcase_id__in=testcases.values('pk'))
+        removed_values = list(dropped.select_for_update().values(*TestExecution.TRACKED_FIELDS))
+        if removed_values:
+            with execution_tracking_suspended():
+                dropped.delete()
+            apply_execution_changes(removed=removed_values)
+            invalidate_user_data_on_commit(test_run.created_by_id)
+
+        added = materialize_test_run(
+            test_run, testcases.exclude(pk__in=run_executions.values('testcase_id'))
+        )['executions']
+
+    elapsed_ms = round((perf_counter() - started) * 1000, 1)
+    logger.info(
+        f"Reconciled test run {test_run.pk}: {added} executions added, {len(removed_values)} removed in {elapsed_ms}ms"
+    )
+    return {'added': added, 'removed': len(removed_values), 'elapsed_ms': elapsed_ms}
+
+
+def record_execution_results(test_run, testcases, status, executor, comments=''):
+    """
+    Record the same result for every test case of the testcases queryset in
+    test_run. Existing executions are updated with a single UPDATE ... WHERE
+    id IN and the missing ones created with a single bulk_create, in one
+    transaction. The insert skips rows another writer created since the
+    read (the unique (testcase, test_run) constraint detects them); those
+    are locked and updated like the existing ones. Signals are bypassed and
+    counter and rollup deltas applied once, in aggregate.
+    Returns {'created': int, 'updated': int}
+    """
+    from .signals import apply_execution_changes
+
+    result = {
+        'status': status,
+        'executor_id': executor.pk if executor else None,
+        'execution_date': timezone.now(),
+        'comments': comments,
+    }
+    tracked_result = {field: value for field, value in result.items() if field in TestExecution.TRACKED_FIELDS}
+    run_executions = TestExecution.objects.filter(test_run=test_run)
+    locked_fields = ('pk', 'testcase_id', 'owner_id', *TestExecution.TRACKED_FIELDS)
+
+    with transaction.atomic():
+        existing = list(
+            run_executions.select_for_update().filter(
+                testcase_id__in=testcases.values('pk')
+            ).order_by('pk').values(*locked_fields)
+        )
+        if existing:
+            TestExecution.objects.filter(pk__in=[row['pk'] for row in existing]).update(**result)
+
+        recorded = {row['testcase_id'] for row in existing}
+        missing = [
+            TestExecution(testcase_id=testcase_id, test_run=test_run, project_id=project_id, owner_id=owner_id, **result)
+            for testcase_id, project_id, owner_id in testcases.order_by().values_list('pk', 'project_id', 'owner_id')
+            if testcase_id not in recorded
+        ]
+        TestExecution.objects.bulk_create(missing, ignore_conflicts=True)
+
+        # Rows not carrying this call's execution date were inserted concurrently and skipped
+        conflicting = []
+        if missing:
+            conflicting = [
+                row for row in run_executions.select_for_update().filter(
+                    testcase_id__in=[execution.testcase_id for execution in missing]
+                ).order_by('pk').values(*locked_fields)
+                if row['execution_date'] != result['execution_date']
+            ]
+        if conflicting:
+            TestExecution.objects.filter(pk__in=[row['pk'] for row in conflicting]).update(**result)
+            conflicting_ids = {row['testcase_id'] for row in conflicting}
+            missing = [execution for execution in missing if execution.testcase_id not in conflicting_ids]
+            existing += conflicting
+
+        invalidate_user_data_on_commit(
+            test_run.created_by_id, *(row['owner_id'] for row in existing), *(execution.owner_id for execution in missing)
+        )
+
+        previous = [{field: row[field] for field in TestExecution.TRACKED_FIELDS} for row in existing]
+        apply_execution_changes(
+            removed=previous,
+            added=[{**values, **tracked_result} for values in previous] + [
+                execution.get_tracked_values() for execution in missing
+            ],
+        )
+
+    return {'created': len(missing), 'updated': len(existing)}
+
+
 def bulk_execute_testcases(test_case_ids, status, comments, executor_user, test_run=None):
     """
-    Executes multiple test cases with a given status and comments.
-    Can create a new TestRun or update an existing one.
+    Executes multiple test cases with a given status and comments in an
+    existing TestRun.
     Returns a dictionary with success status and message.
     """
     try:
         if not isinstance(test_case_ids, list):
             raise TypeError("test_case_ids must be a list of integers.")
-        
-        if not TestExecution.STATUS_CHOICES: # Accessing STATUS_CHOICES requires a model instance or class
-            raise ValueError("Invalid status provided.")
+        if test_run is None:
+            raise ValueError("A test run is required for bulk execution.")
+
         valid_statuses = [choice[0] for choice in TestExecution.STATUS_CHOICES]
         if status not in valid_statuses:
             raise ValueError(f"Invalid status '{status}'. Must be one of {', '.join(valid_statuses)}.")
 
         test_cases = TestCase.objects.filter(id__in=test_case_ids)
-        if test_cases.count() != len(test_case_ids):
+        counts = record_execution_results(test_run, test_cases, status, executor_user, comments)
+        if counts['created'] + counts['updated'] != len(set(test_case_ids)):
             logger.warning("Some test_case_ids provided for bulk execution were not found.")
 
-        created_count = 0
-        updated_count = 0
-
-        for tc in test_cases:
-            execution, created = TestExecution.objects.update_or_create(
-                testcase=tc,
-                test_run=test_run, # Assuming test_run is provided or can be None for a general execution
-                defaults={
-                    'status': status,
-                    'executor': executor_user,
-                    'execution_date': timezone.now(),
-                    'comments': comments,
-                    # 'execution_time_minutes': None, # Can be set if timer is involved
-                    # 'notes': ''
-                }
-            )
-            if created:
-                created_count += 1
-            else:
-                updated_count += 1
-        
-        message = f"Bulk execution completed: {created_count} new executions, {updated_count} updated."
+        message = f"Bulk execution completed: {counts['created']} new executions, {counts['updated']} updated."
         logger.info(message)
         return {'success': True, 'message': message}
 
@@ -708,46 +1664,105 @@ def bulk_execute_testcases(test_case_ids, status, comments, executor_user, test_
         logger.error(f"Error during bulk test case execution: {e}")
         return {'success': False, 'message': f"An error occurred: {e}"}
 
-def execution_time_analysis(executions_queryset, period='day'):
+
+def _build_trends(day_status_counts, start_day, days, label_format):
+    """Turn {(day, status): count} into the labels/total/passed/failed chart series"""
+    trends = {'labels': [], 'total': [], 'passed': [], 'failed': []}
+    totals = {}
+    for (day, status), count in day_status_counts.items():
+        totals[day] = totals.get(day, 0) + count
+
+    for i in range(days):
+        current_date = start_day + timedelta(days=i)
+        trends['labels'].append(current_date.strftime(label_format))
+        trends['total'].append(totals.get(current_date, 0))
+        trends['passed'].append(day_status_counts.get((current_date, 'passed'), 0))
+        trends['failed'].append(day_status_counts.get((current_date, 'failed'), 0))
+    return trends
+
+
+def get_execution_trends(user, days=30, project=None, executor=None, status=None, label_format='%m/%d'):
     """
-    Analyzes execution time trends over a specified period.
-    Returns a dictionary suitable for charting.
+    Daily execution trends for the user's projects over the last `days` days,
+    read from the ExecutionDailyRollup table in a single grouped query.
     """
-    if not executions_queryset.exists():
-        return {'labels': [], 'avg_times': [], 'total_times': []}
+    today = timezone.localdate()
+    start_day = today - timedelta(days=days - 1)
 
-    try:
-        if period == 'day':
-            date_col = 'execution_date__date'
-        elif period == 'week':
-            date_col = 'execution_date__week'
-        elif period == 'month':
-            date_col = 'execution_date__month'
-        else:
-            raise ValueError("Period must be 'day', 'week', or 'month'.")
-
-        # Annotate with the period and then aggregate
-        time_data = executions_queryset.filter(execution_date__isnull=False, execution_time_minutes__isnull=False) \
-                                      .annotate(period_label=F(date_col)) \
-                                      .values('period_label') \
-                                      .annotate(
-                                          avg_time=Avg('execution_time_minutes'),
-                                          total_time=Sum('execution_time_minutes')
-                                      ) \
-                                      .order_by('period_label')
-
-        labels = []
-        avg_times = []
-        total_times = []
-
-        for entry in time_data:
-            labels.append(entry['period_label'])
-            avg_times.append(entry['avg_time'] if entry['avg_time'] is not None else 0)
-            total_times.append(entry['total_time'] if entry['total_time'] is not None else 0)
-        
-        logger.info(f"Successfully performed execution time analysis for period: {period}.")
-        return {'labels': labels, 'avg_times': avg_times, 'total_times': total_times}
+    rollups = ExecutionDailyRollup.objects.filter(
+        project__created_by=user, day__gte=start_day, day__lte=today
+    )
+    if project:
+        rollups = rollups.filter(project=project)
+    if executor:
+        rollups = rollups.filter(executor=executor)
+    if status:
+        rollups = rollups.filter(status=status)
 
-    except Exception as e:
-        logger.error(f"Error during execution time analysis: {e}")
-        return {'labels': [], 'avg_times': [], 'total_times': [], 'error': str(e)}
\ No newline at end of file
+    rows = rollups.order_by().values('day', 'status').annotate(count=Sum('execution_count'))
+    return _build_trends({(row['day'], row['status']): row['count'] for row in rows}, start_day, days, label_format)
+
+
+def get_queryset_execution_trends(executions_queryset, days=30, label_format='%m/%d'):
+    """
+    Daily execution trends for an arbitrary execution queryset, for filters
+    the rollup table cannot answer. Uses one grouped query over a sargable
+    execution_date range instead of per-day `execution_date__date` lookups.
+    """
+    today = timezone.localdate()
+    start_day = today - timedelta(days=days - 1)
+    start = timezone.make_aware(datetime.combine(start_day, time.min))
+
+    rows = executions_queryset.filter(execution_date__gte=start).order_by().annotate(
+        day=TruncDate('execution_date')
+    ).values('day', 'status').annotate(count=Count('id'))
+    return _build_trends({(row['day'], row['status']): row['count'] for row in rows}, start_day, days, label_format)
+
+
+def rebuild_execution_rollups(since=None, project_ids=None, batch_size=1000):
+    """
+    Rebuild ExecutionDailyRollup rows from the executions table.
+    `since` limits the rebuild to days on or after that date and
+    `project_ids` to the given projects. Returns the number of rows written.
+    """
+    rollups = ExecutionDailyRollup.objects.all()
+    executions = TestExecution.objects.filter(execution_date__isnull=False)
+    if since:
+        rollups = rollups.filter(day__gte=since)
+        executions = executions.filter(execution_date__gte=timezone.make_aware(datetime.combine(since, time.min)))
+    if project_ids:
+        rollups = rollups.filter(project_id__in=project_ids)
+        executions = executions.filter(project_id__in=project_ids)
+
+    rows = executions.filter(project__isnull=False).order_by().annotate(
+        day=TruncDate('execution_date'),
+    ).values('project_id', 'executor_id', 'day', 'status').annotate(
+        execution_count=Count('id'),
+        timed_count=Count('execution_time_minutes'),
+        total_time_minutes=Coalesce(Sum('execution_time_minutes'), 0),
+    )
+
+    written = 0
+    with transaction.atomic():
+        rollups.delete()
+        batch = []
+        for row in rows.iterator(chunk_size=batch_size):
+            batch.append(ExecutionDailyRollup(
+                project_id=row['project_id'],
+                executor_id=row['executor_id'],
+                day=row['day'],
+                status=row['status'],
+                execution_count=row['execution_count'],
+                timed_count=row['timed_count'],
+                total_time_minutes=row['total_time_minutes'],
+            ))
+            if len(batch) >= batch_size:
+                ExecutionDailyRollup.objects.bulk_create(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            ExecutionDailyRollup.objects.bulk_create(batch)
+            written += len(batch)
+
+    logger.info(f"Rebuilt {written} execution rollup rows.")
+    return written
@@ -3,20 +3,25 @@ from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import Group
 from django.contrib import messages
+from django.conf import settings
 from django.core.paginator import Paginator
+from django.db import transaction
 from django.db.models import Q
 from django.utils import timezone
-from django.http import JsonResponse
+from django.http import FileResponse, Http404, JsonResponse, StreamingHttpResponse
 from django.views.decorators.http import require_POST
 from django.db.models import Avg
 from datetime import timedelta
+import os
+from urllib.parse import urlencode
 from django.template.loader import render_to_string
 from django.urls import reverse
-from .models import Project, Epic, UserStory, TestCase, TestRun, TestExecution, TestSuite
+from .models import Project, Epic, UserStory, TestCase, TestRun, TestExecution, TestSuite, BackgroundJob, SearchDocument
+from .pagination import CursorPaginator
 from .forms import (
     ProjectForm, EpicForm, UserStoryForm, TestCaseForm,
     ExcelUploadForm, UserRegistrationForm, UserLoginForm,
-    TestRunForm, TestExecutionForm, TestSuiteForm,
+    TestRunForm, TestRunCloneForm, TestExecutionForm, TestSuiteForm,
     TestExecutionReportForm, BulkTestExecutionForm
 )
 
@@ -76,56 +81,8 @@ def user_logout(request):
 
 @login_required
 def dashboard(request):
-    # Get basic statistics
-    projects_count = Project.objects.filter(created_by=request.user).count()
-    epics_count = Epic.objects.filter(project__created_by=request.user).count()
-    stories_count = UserStory.objects.filter(epic__project__created_by=request.user).count()
-    testcases_count = TestCase.objects.filter(user_story__epic__project__created_by=request.user).count()
-
-    # Get test execution statistics
-    test_runs_count = TestRun.objects.filter(created_by=request.user).count()
-    test_suites_count = TestSuite.objects.filter(created_by=request.user).count()
-
-    # Get user's test executions for calculation
-    user_projects = Project.objects.filter(created_by=request.user)
-    user_testcases = TestCase.objects.filter(user_story__epic__project__in=user_projects)
-    all_executions = TestExecution.objects.filter(testcase__in=user_testcases)
-
-    # Calculate test execution metrics
-    total_executions = all_executions.count()
-    executed_tests = all_executions.exclude(status__in=['not_executed', 'in_progress'])
-    passed_executions = executed_tests.filter(status='passed').count()
-    pass_rate = (passed_executions / executed_tests.count() * 100) if executed_tests.count() > 0 else 0
-
-    # Recent test executions (last 7 days)
-    recent_executions_count = all_executions.filter(
-        execution_date__gte=timezone.now() - timedelta(days=7),
-        execution_date__isnull=False
-    ).count()
-
-    # Get recent activities
-    recent_projects = Project.objects.filter(created_by=request.user)[:5]
-    recent_testcases = TestCase.objects.filter(user_story__epic__project__created_by=request.user)[:5]
-    recent_executions = all_executions.filter(
-        execution_date__isnull=False
-    ).order_by('-execution_date')[:5]
-
-    context = {
-        'projects_count': projects_count,
-        'epics_count': epics_count,
-        'stories_count': stories_count,
-        'testcases_count': testcases_count,
-        'test_runs_count': test_runs_count,
-        'test_suites_count': test_suites_count,
-        'total_executions': total_executions,
-        'passed_executions': passed_executions,
-        'pass_rate': round(pass_rate, 1),
-        'recent_executions_count': recent_executions_count,
-        'recent_projects': recent_projects,
-        'recent_testcases': recent_testcases,
-        'recent_executions': recent_executions,
-    }
-    return render(request, 'dashboard.html', context)
+    from .dashboard import get_dashboard_data
+    return render(request, 'dashboard.html', get_dashboard_data(request.user))
 
 
 # Project Views
@@ -142,9 +99,8 @@ def project_list(request):
         )
 
     # Pagination
-    paginator = Paginator(projects, 10)
-    page_number = request.GET.get('page')
-    projects = paginator.get_page(page_number)
+    paginator = CursorPaginator(projects, 10, ('-created_date', '-id'), request.GET)
+    projects = paginator.get_page()
 
     context = {
         'projects': projects,
@@ -227,9 +183,8 @@ def epic_list(request):
         )
 
     # Pagination
-    paginator = Paginator(epics, 10)
-    page_number = request.GET.get('page')
-    epics = paginator.get_page(page_number)
+    paginator = CursorPaginator(epics, 10, ('-created_date', '-id'), request.GET)
+    epics = paginator.get_page()
 
     # Get projects for filter dropdown
     projects = Project.objects.filter(created_by=request.user)
@@ -311,20 +266,18 @@ def story_list(request):
     if epic_id:
         stories = stories.filter(epic_id=epic_id)
 
-    # Search functionality
+    # Search functionality, ranked by relevance
     search_query = request.GET.get('search', '')
     if search_query:
-        stories = stories.filter(
-            Q(name__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(epic__name__icontains=search_query) |
-            Q(epic__project__name__icontains=search_query)
+        from .search import load_search_results, search_documents
+        paginator = CursorPaginator(
+            search_documents(stories, 'user_story', search_query), 10, ('-relevance', '-id'), request.GET
         )
-
-    # Pagination
-    paginator = Paginator(stories, 10)
-    page_number = request.GET.get('page')
-    stories = paginator.get_page(page_number)
+        stories = load_search_results(paginator.get_page(), stories, 'user_story')
+    else:
+        # Pagination
+        paginator = CursorPaginator(stories, 10, ('-created_date', '-id'), request.GET)
+        stories = paginator.get_page()
 
     # Get projects and epics for filter dropdowns
     projects = Project.objects.filter(created_by=request.user)
@@ -401,7 +354,7 @@ def story_delete(request, pk):
 # TestCase Views
 @login_required
 def testcase_list(request):
-    testcases = TestCase.objects.filter(user_story__epic__project__created_by=request.user).order_by('-created_date')
+    testcases = TestCase.objects.filter(owner=request.user).order_by('-created_date')
 
     # Filter by project, epic, and story
     project_id = request.GET.get('project')
@@ -409,27 +362,24 @@ def testcase_list(request):
     story_id = request.GET.get('story')
 
     if project_id:
-        testcases = testcases.filter(user_story__epic__project_id=project_id)
+        testcases = testcases.filter(project_id=project_id)
     if epic_id:
         testcases = testcases.filter(user_story__epic_id=epic_id)
     if story_id:
         testcases = testcases.filter(user_story_id=story_id)
 
-    # Search functionality
+    # Search functionality, ranked by relevance
     search_query = request.GET.get('search', '')
     if search_query:
-        testcases = testcases.filter(
-            Q(name__icontains=search_query) |
-            Q(description__icontains=search_query) |
-            Q(user_story__name__icontains=search_query) |
-            Q(user_story__epic__name__icontains=search_query) |
-            Q(user_story__epic__project__name__icontains=search_query)
+        from .search import load_search_results, search_documents
+        paginator = CursorPaginator(
+            search_documents(testcases, 'testcase', search_query), 15, ('-relevance', '-id'), request.GET
         )
-
-    # Pagination
-    paginator = Paginator(testcases, 15)
-    page_number = request.GET.get('page')
-    testcases = paginator.get_page(page_number)
+        testcases = load_search_results(paginator.get_page(), testcases, 'testcase')
+    else:
+        # Pagination
+        paginator = CursorPaginator(testcases, 15, ('-created_date', '-id'), request.GET)
+        testcases = paginator.get_page()
 
     # Get filter options
     projects = Project.objects.filter(created_by=request.user)
@@ -448,6 +398,58 @@ def testcase_list(request):
     return render(request, 'testcases/list.html', context)
 
 
+@login_required
+def testcase_export(request):
+    testcases = TestCase.objects.filter(owner=request.user)
+
+    # Apply same filters as the test case list
+    project_id = request.GET.get('project')
+    epic_id = request.GET.get('epic')
+    story_id = request.GET.get('story')
+
+    if project_id:
+        testcases = testcases.filter(project_id=project_id)
+    if epic_id:
+        testcases = testcases.filter(user_story__epic_id=epic_id)
+    if story_id:
+        testcases = testcases.filter(user_story_id=story_id)
+
+    search_query = request.GET.get('search', '')
+    if search_query:
+        from .search import filter_search_matches
+        testcases = filter_search_matches(testcases, 'testcase', search_query)
+
+    export_format = request.GET.get('format', 'xlsx')
+    timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+
+    if export_format in ('csv', 'ndjson'):
+        from .utils import (
+            TESTCASE_EXPORT_HEADERS, iter_testcase_export_rows, iter_testcase_ndjson_records,
+            stream_csv, stream_ndjson
+        )
+        if export_format == 'csv':
+            content = stream_csv(TESTCASE_EXPORT_HEADERS, iter_testcase_export_rows(testcases))
+            content_type = 'text/csv'
+        else:
+            content = stream_ndjson(iter_testcase_ndjson_records(testcases))
+            content_type = 'application/x-ndjson'
+
+        response = StreamingHttpResponse(content, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="testcases_{timestamp}.{export_format}"'
+        return response
+
+    from .utils import export_testcases_to_excel
+    success, result = export_testcases_to_excel(testcases)
+    if not success:
+        messages.error(request, result)
+        return redirect('test_cases:testcase_list')
+
+    return FileResponse(
+        result, as_attachment=True, filename=f"testcases_{timestamp}.xlsx",
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    )
+
+
 @login_required
 def testcase_create(request):
     if request.method == 'POST':
@@ -480,7 +482,7 @@ def testcase_create(request):
 
 @login_required
 def testcase_edit(request, pk):
-    testcase = get_object_or_404(TestCase, pk=pk, user_story__epic__project__created_by=request.user)
+    testcase = get_object_or_404(TestCase, pk=pk, owner=request.user)
 
     if request.method == 'POST':
         form = TestCaseForm(request.POST, instance=testcase, user=request.user)
@@ -512,7 +514,7 @@ def testcase_edit(request, pk):
 
 @login_required
 def testcase_delete(request, pk):
-    testcase = get_object_or_404(TestCase, pk=pk, user_story__epic__project__created_by=request.user)
+    testcase = get_object_or_404(TestCase, pk=pk, owner=request.user)
 
     if request.method == 'POST':
         testcase_name = testcase.name
@@ -525,7 +527,7 @@ def testcase_delete(request, pk):
 
 @login_required
 def testcase_execute(request, pk):
-    testcase = get_object_or_404(TestCase, pk=pk, user_story__epic__project__created_by=request.user)
+    testcase = get_object_or_404(TestCase, pk=pk, owner=request.user)
 
     if request.method == 'POST':
         execution_status = request.POST.get('execution_status')
@@ -546,30 +548,29 @@ def testcase_import(request):
     if request.method == 'POST':
         form = ExcelUploadForm(request.POST, request.FILES, user=request.user)
         if form.is_valid():
-            try:
-                from .utils import import_testcases_from_excel
-                excel_file = request.FILES['excel_file']
-                user_story = form.cleaned_data['user_story']
-
-                result = import_testcases_from_excel(excel_file, user_story, request.user)
-
-                if result['success']:
-                    messages.success(request, f"Successfully imported {result['created']} test cases!")
-                    if result['errors']:
-                        messages.warning(request, f"Skipped {len(result['errors'])} rows due to errors.")
-                else:
-                    messages.error(request, f"Import failed: {result['error']}")
-
-            except ImportError:
-                messages.error(request, "Excel import functionality is not available. Please check utils module.")
-            except Exception as e:
-                messages.error(request, f"An error occurred during import: {str(e)}")
-
-            return redirect('test_cases:testcase_list')
+            # The workbook is parsed and imported by the background worker
+            from .jobs import enqueue_job
+            user_story = form.cleaned_data['user_story'] if form.cleaned_data['placement'] == 'story' else None
+            job = enqueue_job(
+                'testcase_import', request.user,
+                params={
+                    'user_story_id': user_story.pk if user_story else None,
+                    'mode': form.cleaned_data['import_mode'],
+                },
+                input_file=request.FILES['excel_file'],
+            )
+            if user_story:
+                messages.info(request, f"Import queued. Test cases will be added to {user_story.name} shortly.")
+            else:
+                messages.info(request, "Import queued. Test cases will be added to the user stories named in the file shortly.")
+            return redirect('test_cases:job_detail', pk=job.pk)
     else:
         form = ExcelUploadForm(user=request.user)
 
-    return render(request, 'testcases/import.html', {'form': form})
+    return render(request, 'testcases/import.html', {
+        'form': form,
+        'max_upload_mb': getattr(settings, 'TESTCASE_IMPORT_MAX_UPLOAD_MB', 100),
+    })
 
 
 # AJAX Views for dynamic dropdowns
@@ -614,7 +615,7 @@ def get_projects_by_user(request):
 # Test Run Views
 @login_required
 def test_run_list(request):
-    test_runs = TestRun.objects.filter(created_by=request.user).order_by('-created_date')
+    test_runs = TestRun.objects.filter(created_by=request.user).select_related('created_by').order_by('-created_date')
 
     # Filter by status
     status = request.GET.get('status')
@@ -638,9 +639,8 @@ def test_run_list(request):
         )
 
     # Pagination
-    paginator = Paginator(test_runs, 10)
-    page_number = request.GET.get('page')
-    test_runs = paginator.get_page(page_number)
+    paginator = CursorPaginator(test_runs, 10, ('-created_date', '-id'), request.GET)
+    test_runs = paginator.get_page()
 
     context = {
         'test_runs': test_runs,
@@ -659,20 +659,17 @@ def test_run_create(request):
         form = TestRunForm(request.POST, user=request.user)
         if form.is_valid():
             try:
-                test_run = form.save(commit=False)
-                test_run.created_by = request.user
-                test_run.save()
-                # Create TestExecution objects for selected test cases
-                test_case_ids = form.cleaned_data['test_cases']
-                for test_case in TestCase.objects.filter(id__in=test_case_ids, user_story__epic__project__created_by=request.user):
-                    TestExecution.objects.create(
-                        testcase=test_case,
-                        test_run=test_run,
-                        status='not_executed',
-                        executor=None,
-                        execution_date=None
+                from .utils import materialize_test_run
+                with transaction.atomic():
+                    test_run = form.save(commit=False)
+                    test_run.created_by = request.user
+                    test_run.save()
+                    # Create TestExecution objects for selected test cases
+                    test_case_ids = form.cleaned_data['test_cases']
+                    metrics = materialize_test_run(
+                        test_run, TestCase.objects.filter(id__in=test_case_ids, owner=request.user)
                     )
-                messages.success(request, 'Test Run created successfully!')
+                messages.success(request, f"Test Run created successfully with {metrics['executions']} test executions!")
                 return redirect('test_cases:test_run_list')
             except Exception as e:
                 messages.error(request, f'Error creating test run: {str(e)}')
@@ -697,30 +694,19 @@ def test_run_edit(request, pk):
         form = TestRunForm(request.POST, instance=test_run, user=request.user)
         if form.is_valid():
             try:
-                test_run = form.save()
-                # Update TestExecution objects if test cases change
-                test_case_ids = form.cleaned_data['test_cases']
-                existing_executions = test_run.test_executions.all()
-                existing_test_case_ids = set(te.testcase_id for te in existing_executions)
-                new_test_case_ids = set(test_case.id for test_case in test_case_ids)
-
-                # Remove executions for test cases no longer selected
-                for execution in existing_executions:
-                    if execution.testcase_id not in new_test_case_ids:
-                        execution.delete()
-
-                # Add executions for new test cases
-                for test_case in test_case_ids:
-                    if test_case.id not in existing_test_case_ids:
-                        TestExecution.objects.create(
-                            testcase=test_case,
-                            test_run=test_run,
-                            status='not_executed',
-                            executor=None,
-                            execution_date=None
-                        )
-
-                messages.success(request, 'Test Run updated successfully!')
+                from .utils import reconcile_test_run
+                with transaction.atomic():
+                    test_run = form.save()
+                    # Update TestExecution objects if test cases change
+                    test_case_ids = form.cleaned_data['test_cases']
+                    changes = reconcile_test_run(
+                        test_run, TestCase.objects.filter(id__in=test_case_ids, owner=request.user)
+                    )
+
+                messages.success(
+                    request,
+                    f"Test Run updated successfully! {changes['added']} test executions added, {changes['removed']} removed."
+                )
                 return redirect('test_cases:test_run_list')
             except Exception as e:
                 messages.error(request, f'Error updating test run: {str(e)}')
@@ -751,6 +737,51 @@ def test_run_delete(request, pk):
     return render(request, 'test_runs/confirm_delete.html', {'test_run': test_run})
 
 
+@login_required
+@require_POST
+def test_run_clone(request, pk):
+    """Start a new test run from all, the failed or the blocked executions of an existing one"""
+    from .utils import clone_test_run
+    source_run = get_object_or_404(TestRun, pk=pk, created_by=request.user)
+    is_ajax = request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+    form = TestRunCloneForm(request.POST)
+    if not form.is_valid():
+        if is_ajax:
+            return JsonResponse({'success': False, 'errors': form.errors}, status=400)
+        for field, errors in form.errors.items():
+            for error in errors:
+                messages.error(request, f"{field.title()}: {error}")
+        return redirect('test_cases:test_run_list')
+
+    scope = form.cleaned_data['scope']
+    scope_label = dict(TestRunCloneForm.SCOPE_CHOICES)[scope]
+    name = form.cleaned_data['name'] or f"{source_run.name} - re-run ({scope})"
+    test_run, metrics = clone_test_run(
+        source_run, name, request.user,
+        scope=scope,
+        description=f'Re-run of "{source_run.name}": {scope_label.lower()}.'
+    )
+
+    if test_run is None:
+        error = f'"{source_run.name}" has no executions to re-run for: {scope_label.lower()}.'
+        if is_ajax:
+            return JsonResponse({'success': False, 'error': error}, status=400)
+        messages.warning(request, error)
+        return redirect('test_cases:test_run_list')
+
+    if is_ajax:
+        return JsonResponse({
+            'success': True,
+            'test_run_id': test_run.id,
+            'executions': metrics['executions'],
+            'elapsed_ms': metrics['elapsed_ms'],
+            'redirect_url': reverse('test_cases:test_run_execute', args=[test_run.id])
+        })
+    messages.success(request, f'Test Run "{test_run.name}" created with {metrics["executions"]} test executions!')
+    return redirect('test_cases:test_run_execute', pk=test_run.pk)
+
+
 @login_required
 def test_run_create_from_suite(request):
     """AJAX endpoint to create test run from suite"""
@@ -765,30 +796,26 @@ def test_run_create_from_suite(request):
         return JsonResponse({'error': 'Missing required fields'}, status=400)
 
     try:
+        from .utils import materialize_test_run
         suite = TestSuite.objects.get(id=suite_id, created_by=request.user)
 
-        # Create test run
-        test_run = TestRun.objects.create(
-            name=test_run_name,
-            description=test_run_description,
-            created_by=request.user,
-            status='not_started'
-        )
-
-        # Create test executions for all test cases in suite
-        executions = []
-        for test_case in suite.test_cases.all():
-            execution = TestExecution.objects.create(
-                testcase=test_case,
-                test_run=test_run,
-                status='not_executed',
-                executor=None
+        with transaction.atomic():
+            # Create test run
+            test_run = TestRun.objects.create(
+                name=test_run_name,
+                description=test_run_description,
+                created_by=request.user,
+                status='not_started'
             )
-            executions.append(execution)
+
+            # Create test executions for all test cases in suite
+            metrics = materialize_test_run(test_run, suite.test_cases.all())
 
         return JsonResponse({
             'success': True,
             'test_run_id': test_run.id,
+            'executions': metrics['executions'],
+            'elapsed_ms': metrics['elapsed_ms'],
             'redirect_url': reverse('test_cases:test_run_execute', args=[test_run.id])
         })
 
@@ -827,10 +854,17 @@ def test_run_execute(request, pk):
 # Test Execution Views
 @login_required
 def test_execution_dashboard(request):
+    from .cache import get_or_compute_for_user
+    context = get_or_compute_for_user(
+        request.user, 'test_execution_dashboard', {},
+        lambda: compute_execution_dashboard(request.user), settings.REPORT_CACHE_TIMEOUT,
+    )
+    return render(request, 'test_execution/dashboard.html', context)
+
+
+def compute_execution_dashboard(user):
     # Get user's test executions
-    user_projects = Project.objects.filter(created_by=request.user)
-    user_testcases = TestCase.objects.filter(user_story__epic__project__in=user_projects)
-    all_executions = TestExecution.objects.filter(testcase__in=user_testcases)
+    all_executions = TestExecution.objects.filter(owner=user)
 
     # Calculate metrics
     total_executions = all_executions.count()
@@ -854,11 +888,11 @@ def test_execution_dashboard(request):
     ).aggregate(avg_time=Avg('execution_time_minutes'))['avg_time'] or 0
 
     # Recent executions for timeline
-    recent_timeline = all_executions.filter(
+    recent_timeline = list(all_executions.filter(
         execution_date__isnull=False
-    ).order_by('-execution_date')[:10]
+    ).select_related('testcase__user_story', 'test_run', 'executor').order_by('-execution_date')[:10])
 
-    context = {
+    return {
         'total_executions': total_executions,
         'recent_executions': recent_executions,
         'status_counts': status_counts,
@@ -866,7 +900,6 @@ def test_execution_dashboard(request):
         'avg_execution_time': round(avg_execution_time, 1),
         'recent_timeline': recent_timeline,
     }
-    return render(request, 'test_execution/dashboard.html', context)
 
 
 @login_required
@@ -874,7 +907,7 @@ def test_execution_detail(request, pk):
     execution = get_object_or_404(TestExecution, pk=pk)
 
     # Check user access
-    if execution.testcase.user_story.epic.project.created_by != request.user:
+    if execution.owner_id != request.user.id:
         messages.error(request, 'You do not have permission to access this execution.')
         return redirect('test_cases:test_execution_dashboard')
 
@@ -906,7 +939,7 @@ def test_execution_record(request, pk):
     execution = get_object_or_404(TestExecution, pk=pk)
 
     # Check user access
-    if execution.testcase.user_story.epic.project.created_by != request.user:
+    if execution.owner_id != request.user.id:
         return JsonResponse({'error': 'Permission denied'}, status=403)
 
     if request.method == 'POST':
@@ -935,7 +968,7 @@ def test_execution_detail_ajax(request, pk):
     execution = get_object_or_404(TestExecution, pk=pk)
 
     # Check user access
-    if execution.testcase.user_story.epic.project.created_by != request.user:
+    if execution.owner_id != request.user.id:
         return JsonResponse({'error': 'Permission denied'}, status=403)
 
     # Get priority color mapping
@@ -991,28 +1024,24 @@ def test_execution_detail_ajax(request, pk):
 
 @login_required
 def test_execution_summary_data(request):
-    user_projects = Project.objects.filter(created_by=request.user)
-    user_testcases = TestCase.objects.filter(user_story__epic__project__in=user_projects)
-    executions = TestExecution.objects.filter(testcase__in=user_testcases)
+    from .cache import get_or_compute_for_user
+    # Identical concurrent requests are computed once and shared
+    form = TestExecutionReportForm(request.GET, user=request.user)
+    data = get_or_compute_for_user(
+        request.user, 'test_execution_summary', form.get_filter_key(),
+        lambda: compute_execution_summary(request.user, form), settings.REPORT_CACHE_TIMEOUT,
+    )
+    return JsonResponse(data)
+
+
+def compute_execution_summary(user, form):
+    executions = TestExecution.objects.filter(owner=user)
 
     # Apply same filters as report view
-    form = TestExecutionReportForm(request.GET, user=request.user)
     form_is_valid = form.is_valid()
     if form_is_valid:
-        if form.cleaned_data['date_from']:
-            executions = executions.filter(execution_date__gte=form.cleaned_data['date_from'])
-        if form.cleaned_data['date_to']:
-            # Adjust date_to to include the whole day
-            date_to = form.cleaned_data['date_to'] + timedelta(days=1) - timedelta(microseconds=1)
-            executions = executions.filter(execution_date__lte=date_to)
-        if form.cleaned_data['project']:
-            executions = executions.filter(testcase__user_story__epic__project=form.cleaned_data['project'])
-        if form.cleaned_data['epic']:
-            executions = executions.filter(testcase__user_story__epic=form.cleaned_data['epic'])
-        if form.cleaned_data['status']:
-            executions = executions.filter(status=form.cleaned_data['status'])
-        if form.cleaned_data['executor']:
-            executions = executions.filter(executor=form.cleaned_data['executor'])
+        from .utils import filter_report_executions
+        executions = filter_report_executions(executions, form.cleaned_data)
 
     # Calculate summary statistics
     status_counts = {}
@@ -1046,13 +1075,18 @@ def test_execution_summary_data(request):
     # For this implementation, we will generate trends for the last 30 days if no date filters are present,
     # otherwise, the trends data will be empty.
     if not (form_is_valid and (form.cleaned_data['date_from'] or form.cleaned_data['date_to'])):
-        for i in range(29, -1, -1):
-            date = timezone.now().date() - timedelta(days=i)
-            day_executions = executions.filter(execution_date__date=date)
-            trends_data['labels'].append(date.strftime('%m/%d'))
-            trends_data['total'].append(day_executions.count())
-            trends_data['passed'].append(day_executions.filter(status='passed').count())
-            trends_data['failed'].append(day_executions.filter(status='failed').count())
+        from .utils import get_execution_trends, get_queryset_execution_trends
+        if form_is_valid and form.cleaned_data['epic']:
+            # The daily rollup is not kept per epic, so group the filtered executions directly
+            trends_data = get_queryset_execution_trends(executions)
+        else:
+            filters = form.cleaned_data if form_is_valid else {}
+            trends_data = get_execution_trends(
+                user,
+                project=filters.get('project'),
+                executor=filters.get('executor'),
+                status=filters.get('status'),
+            )
 
     data = {
         'passed_count': passed_count,
@@ -1066,21 +1100,30 @@ def test_execution_summary_data(request):
         'trends': trends_data
     }
 
-    return JsonResponse(data)
+    return data
 
 
 @login_required
 def test_execution_project_breakdown(request):
-    user_projects = Project.objects.filter(created_by=request.user)
+    from .cache import get_or_compute_for_user
+    # Identical concurrent requests are computed once and shared
+    form = TestExecutionReportForm(request.GET, user=request.user)
+    data = get_or_compute_for_user(
+        request.user, 'test_execution_project_breakdown', form.get_filter_key(),
+        lambda: compute_project_breakdown(request.user, form), settings.REPORT_CACHE_TIMEOUT,
+    )
+    return JsonResponse(data)
+
+
+def compute_project_breakdown(user, form):
+    user_projects = Project.objects.filter(created_by=user)
 
     projects_data = []
     # Apply same filters as report view, but for each project
-    form = TestExecutionReportForm(request.GET, user=request.user)
     form_is_valid = form.is_valid()
 
     for project in user_projects:
-        project_testcases = TestCase.objects.filter(user_story__epic__project=project)
-        project_executions = TestExecution.objects.filter(testcase__in=project_testcases)
+        project_executions = TestExecution.objects.filter(project=project)
 
         if form_is_valid:
             if form.cleaned_data['date_from']:
@@ -1116,38 +1159,29 @@ def test_execution_project_breakdown(request):
                 'last_execution': last_execution.execution_date.strftime('%Y-%m-%d %H:%M') if last_execution else None
             })
 
-    return JsonResponse({'projects': projects_data})
+    return {'projects': projects_data}
 
 
 @login_required
 def test_execution_report(request):
-    user_projects = Project.objects.filter(created_by=request.user)
-    user_testcases = TestCase.objects.filter(user_story__epic__project__in=user_projects)
-    executions = TestExecution.objects.filter(testcase__in=user_testcases)
+    executions = TestExecution.objects.filter(owner=request.user)
 
     form = TestExecutionReportForm(request.GET, user=request.user)
 
     if form.is_valid():
-        # Apply filters
-        if form.cleaned_data['date_from']:
-            executions = executions.filter(execution_date__gte=form.cleaned_data['date_from'])
-        if form.cleaned_data['date_to']:
-            # Adjust date_to to include the whole day
-            date_to = form.cleaned_data['date_to'] + timedelta(days=1) - timedelta(microseconds=1)
-            executions = executions.filter(execution_date__lte=date_to)
-        if form.cleaned_data['project']:
-            executions = executions.filter(testcase__user_story__epic__project=form.cleaned_data['project'])
-        if form.cleaned_data['epic']:
-            executions = executions.filter(testcase__user_story__epic=form.cleaned_data['epic'])
-        if form.cleaned_data['status']:
-            executions = executions.filter(status=form.cleaned_data['status'])
-        if form.cleaned_data['executor']:
-            executions = executions.filter(executor=form.cleaned_data['executor'])
+        from .utils import filter_report_executions
+        executions = filter_report_executions(executions, form.cleaned_data)
 
     # Pagination
-    paginator = Paginator(executions.order_by('-execution_date'), 20)
-    page_number = request.GET.get('page')
-    executions = paginator.get_page(page_number)
+    # Keyset pagination keeps deep pages cheap; the total is cached per
+    # filter set and computed once for identical concurrent requests
+    from .cache import get_or_compute_for_user
+    paginator = CursorPaginator(executions, 20, ('-execution_date', '-id'), request.GET)
+    paginator.count = get_or_compute_for_user(
+        request.user, 'test_execution_report_count', form.get_filter_key(),
+        executions.count, settings.REPORT_CACHE_TIMEOUT,
+    )
+    executions = paginator.get_page()
 
     context = {
         'form': form,
@@ -1158,36 +1192,128 @@ def test_execution_report(request):
 
 @login_required
 def test_execution_export(request):
-    user_projects = Project.objects.filter(created_by=request.user)
-    user_testcases = TestCase.objects.filter(user_story__epic__project__in=user_projects)
-    executions = TestExecution.objects.filter(testcase__in=user_testcases)
+    """
+    Stream a csv or ndjson export of the filtered executions. Excel and PDF
+    reports take too long to build inside a request; they are queued by a
+    POST to test_execution_export_job, so a GET here only sends the user
+    back to the report with the same filters.
+    """
+    export_format = request.GET.get('format', 'xlsx')
+    if export_format in ('xlsx', 'pdf'):
+        from .jobs import report_filter_params
+        messages.info(
+            request, f"{export_format.upper()} reports are built in the background: use the Export menu to queue one."
+        )
+        return redirect(f"{reverse('test_cases:test_execution_report')}?{urlencode(report_filter_params(request.GET))}")
+
+    if export_format not in ('csv', 'ndjson'):
+        messages.error(request, f"Unsupported export format: {export_format}")
+        return redirect('test_cases:test_execution_report')
+
+    executions = TestExecution.objects.filter(owner=request.user)
 
     # Apply same filters as report
     form = TestExecutionReportForm(request.GET, user=request.user)
     if form.is_valid():
-        if form.cleaned_data['date_from']:
-            executions = executions.filter(execution_date__gte=form.cleaned_data['date_from'])
-        if form.cleaned_data['date_to']:
-            # Adjust date_to to include the whole day
-            date_to = form.cleaned_data['date_to'] + timedelta(days=1) - timedelta(microseconds=1)
-            executions = executions.filter(execution_date__lte=date_to)
-        if form.cleaned_data['project']:
-            executions = executions.filter(testcase__user_story__epic__project=form.cleaned_data['project'])
-        if form.cleaned_data['epic']:
-            executions = executions.filter(testcase__user_story__epic=form.cleaned_data['epic'])
-        if form.cleaned_data['status']:
-            executions = executions.filter(status=form.cleaned_data['status'])
-        if form.cleaned_data['executor']:
-            executions = executions.filter(executor=form.cleaned_data['executor'])
+        from .utils import filter_report_executions
+        executions = filter_report_executions(executions, form.cleaned_data)
+
+    from .utils import (
+        EXECUTION_REPORT_HEADERS, iter_execution_report_rows, iter_execution_ndjson_records,
+        stream_csv, stream_ndjson
+    )
+    if export_format == 'csv':
+        content = stream_csv(EXECUTION_REPORT_HEADERS, iter_execution_report_rows(executions))
+        content_type = 'text/csv'
+    else:
+        content = stream_ndjson(iter_execution_ndjson_records(executions))
+        content_type = 'application/x-ndjson'
 
-    try:
-        from .utils import generate_execution_excel_report
-        response = generate_execution_excel_report(executions.order_by('-execution_date'))
-        return response
-    except ImportError:
-        messages.error(request, "Excel export functionality is not available.")
+    timestamp = timezone.now().strftime('%Y%m%d_%H%M%S')
+    response = StreamingHttpResponse(content, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="execution_report_{timestamp}.{export_format}"'
+    return response
+
+
+@login_required
+@require_POST
+def test_execution_export_job(request):
+    """Queue an execution export or PDF report (filtered by the query string) for the background worker"""
+    from .jobs import enqueue_job, report_filter_params
+
+    export_format = request.POST.get('format', 'xlsx')
+    filters = report_filter_params(request.GET)
+
+    if export_format == 'pdf':
+        job = enqueue_job('execution_pdf', request.user, params={'filters': filters})
+    elif export_format in ('xlsx', 'csv', 'ndjson'):
+        job = enqueue_job('execution_export', request.user, params={'format': export_format, 'filters': filters})
+    else:
+        messages.error(request, f"Unsupported export format: {export_format}")
         return redirect('test_cases:test_execution_report')
 
+    messages.info(request, "Your report has been queued. It will be ready to download here when finished.")
+    return redirect('test_cases:job_detail', pk=job.pk)
+
+
+# Background Job Views
+@login_required
+def job_list(request):
+    jobs = BackgroundJob.objects.filter(created_by=request.user).order_by('-created_date')
+
+    paginator = CursorPaginator(jobs, 20, ('-created_date', '-id'), request.GET)
+    jobs = paginator.get_page()
+
+    return render(request, 'jobs/list.html', {'jobs': jobs})
+
+
+@login_required
+def job_detail(request, pk):
+    job = get_object_or_404(BackgroundJob, pk=pk, created_by=request.user)
+    return render(request, 'jobs/detail.html', {'job': job})
+
+
+@login_required
+def job_status(request, pk):
+    """AJAX endpoint polled by the job page"""
+    job = get_object_or_404(BackgroundJob, pk=pk, created_by=request.user)
+
+    return JsonResponse({
+        'id': job.id,
+        'kind': job.kind,
+        'kind_display': job.get_kind_display(),
+        'status': job.status,
+        'status_display': job.get_status_display(),
+        'progress': job.progress,
+        'progress_message': job.progress_message,
+        'is_finished': job.is_finished,
+        'cancel_requested': job.cancel_requested,
+        'error': job.error,
+        'result': job.result,
+        'download_url': reverse('test_cases:job_download', args=[job.pk]) if job.status == 'succeeded' and job.result_file else None,
+    })
+
+
+@login_required
+@require_POST
+def job_cancel(request, pk):
+    job = get_object_or_404(BackgroundJob, pk=pk, created_by=request.user)
+    job.request_cancel()
+
+    if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
+        return JsonResponse({'success': True})
+    messages.info(request, f"Cancellation requested for {job.get_kind_display()} #{job.pk}.")
+    return redirect('test_cases:job_detail', pk=job.pk)
+
+
+@login_required
+def job_download(request, pk):
+    job = get_object_or_404(BackgroundJob, pk=pk, created_by=request.user, status='succeeded')
+    if not job.result_file:
+        raise Http404("This job has no result file.")
+
+    return FileResponse(job.result_file.open('rb'), as_attachment=True, filename=os.path.basename(job.result_file.name))
+
 
 @login_required
 @require_POST
@@ -1206,25 +1332,9 @@ def bulk_test_execution(request):
             defaults={'status': 'in_progress'}
         )
 
-        updated_count = 0
-        for testcase in test_cases:
-            execution, created = TestExecution.objects.get_or_create(
-                testcase=testcase,
-                test_run=test_run,
-                defaults={
-                    'status': status,
-                    'executor': request.user,
-                    'execution_date': timezone.now(),
-                    'comments': comments
-                }
-            )
-            if not created:
-                execution.status = status
-                execution.executor = request.user
-                execution.execution_date = timezone.now()
-                execution.comments = comments
-                execution.save()
-            updated_count += 1
+        from .utils import record_execution_results
+        counts = record_execution_results(test_run, test_cases, status, request.user, comments)
+        updated_count = counts['created'] + counts['updated']
 
         messages.success(request, f'Successfully updated {updated_count} test case executions!')
         return JsonResponse({'success': True, 'message': f'Updated {updated_count} executions'})
@@ -1235,28 +1345,33 @@ def bulk_test_execution(request):
 # Test Suite Views
 @login_required
 def test_suite_list(request):
-    test_suites = TestSuite.objects.filter(created_by=request.user).order_by('-created_date')
+    test_suites = TestSuite.objects.filter(created_by=request.user).select_related(
+        'created_by'
+    ).prefetch_related('test_cases__user_story').order_by('-created_date')
 
     # Filter by project
     project_id = request.GET.get('project')
     if project_id:
-        user_epics = Epic.objects.filter(project_id=project_id, project__created_by=request.user)
-        user_stories = UserStory.objects.filter(epic__in=user_epics)
-        user_testcases = TestCase.objects.filter(user_story__in=user_stories)
-        test_suites = test_suites.filter(test_cases__in=user_testcases).distinct()
+        test_suites = test_suites.filter(
+            test_cases__project_id=project_id, test_cases__owner=request.user
+        ).distinct()
 
-    # Search functionality
+    # Search functionality, ranked by relevance
     search_query = request.GET.get('search', '')
+    page_number = request.GET.get('page')
     if search_query:
-        test_suites = test_suites.filter(
-            Q(name__icontains=search_query) |
-            Q(description__icontains=search_query)
-        )
+        from .search import load_search_results, search_documents
+        paginator = Paginator(search_documents(test_suites, 'test_suite', search_query).order_by('-relevance', '-id'), 10)
+        test_suites = load_search_results(paginator.get_page(page_number), test_suites, 'test_suite')
+    else:
+        # Pagination
+        paginator = Paginator(test_suites, 10)
+        test_suites = paginator.get_page(page_number)
 
-    # Pagination
-    paginator = Paginator(test_suites, 10)
-    page_number = request.GET.get('page')
-    test_suites = paginator.get_page(page_number)
+    # Compute statistics for the whole page in one aggregation
+    suite_statistics = TestSuite.get_statistics_for_suites(test_suites.object_list)
+    for suite in test_suites:
+        suite.suite_stats = suite_statistics[suite.pk]
 
     # Get projects for filter
     projects = Project.objects.filter(created_by=request.user)
@@ -1332,11 +1447,12 @@ def test_suite_stats(request):
     if not request.headers.get('X-Requested-With') == 'XMLHttpRequest':
         return JsonResponse({'error': 'Invalid request'}, status=400)
 
-    test_suites = TestSuite.objects.filter(created_by=request.user)
+    test_suites = list(TestSuite.objects.filter(created_by=request.user).only('id', 'name'))
+    suite_statistics = TestSuite.get_statistics_for_suites(test_suites)
 
     suites_data = []
     for suite in test_suites:
-        stats = suite.get_test_case_statistics()
+        stats = suite_statistics[suite.pk]
         suites_data.append({
             'id': suite.id,
             'name': suite.name,
@@ -1355,10 +1471,10 @@ def get_test_cases_by_filters(request):
     epic_id = request.GET.get('epic_id')
     story_id = request.GET.get('story_id')
 
-    testcases = TestCase.objects.filter(user_story__epic__project__created_by=request.user)
+    testcases = TestCase.objects.filter(owner=request.user).select_related('user_story')
 
     if project_id:
-        testcases = testcases.filter(user_story__epic__project_id=project_id)
+        testcases = testcases.filter(project_id=project_id)
     if epic_id:
         testcases = testcases.filter(user_story__epic_id=epic_id)
     if story_id:
@@ -1375,6 +1491,56 @@ def get_test_cases_by_filters(request):
     } for tc in testcases]
     return JsonResponse(data, safe=False)
 
+@login_required
+def global_search(request):
+    """
+    Search every kind of object at once. Without `type`, returns the best
+    `limit` matches of each kind in `types` (all kinds by default) with the
+    number of matches per kind; with `type`, a cursor paginated list of
+    that kind's matches.
+    """
+    from .search import SEARCH_SOURCES, match_documents, search_top_results, serialize_search_result
+
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return JsonResponse({'error': 'Search query is required'}, status=400)
+
+    try:
+        limit = min(max(int(request.GET.get('limit', 5)), 1), 50)
+    except ValueError:
+        return JsonResponse({'error': 'limit must be a number'}, status=400)
+
+    kind = request.GET.get('type')
+    if kind:
+        if kind not in SEARCH_SOURCES:
+            return JsonResponse({'error': f'Unknown type: {kind}'}, status=400)
+        documents = match_documents(
+            SearchDocument.objects.filter(owner=request.user, kind=kind).only('id', 'kind', 'title', kind), query
+        )
+        page = CursorPaginator(documents, limit, ('-relevance', '-id'), request.GET).get_page()
+        return JsonResponse({
+            'query': query,
+            'type': kind,
+            'results': [serialize_search_result(document) for document in page],
+            'next': f"{request.path}?{page.next_query()}" if page.has_next() else None,
+        })
+
+    kinds = [kind for kind in request.GET.get('types', '').split(',') if kind in SEARCH_SOURCES] or list(SEARCH_SOURCES)
+    top = search_top_results(request.user, query, kinds, limit)
+    return JsonResponse({
+        'query': query,
+        'results': {
+            kind: {
+                'count': found['count'],
+                'results': [serialize_search_result(document) for document in found['results']],
+                'more': f"{request.path}?{urlencode({'q': query, 'type': kind, 'limit': limit})}"
+                if found['count'] > limit else None,
+            }
+            for kind, found in top.items()
+        },
+    })
+
+
 @login_required
 def get_execution_stats(request):
     test_run_id = request.GET.get('test_run_id')
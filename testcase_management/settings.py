@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -143,6 +144,26 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Background jobs (exports, PDF reports, imports) run by `manage.py run_jobs`
+BACKGROUND_JOB_PROCESSES = int(os.environ.get("BACKGROUND_JOB_PROCESSES", "2"))
+
+# Executions listed row by row in PDF reports; the rest go to a summary appendix
+PDF_REPORT_MAX_ROWS = int(os.environ.get("PDF_REPORT_MAX_ROWS", "5000"))
+
+# Spreadsheet imports: upload limit and rows validated/inserted per transaction
+TESTCASE_IMPORT_MAX_UPLOAD_MB = int(os.environ.get("TESTCASE_IMPORT_MAX_UPLOAD_MB", "100"))
+TESTCASE_IMPORT_BATCH_SIZE = int(os.environ.get("TESTCASE_IMPORT_BATCH_SIZE", "1000"))
+# Processes parsing workbooks of zip and directory imports (default: number of CPUs)
+TESTCASE_IMPORT_PROCESSES = int(os.environ.get("TESTCASE_IMPORT_PROCESSES", "0")) or None
+
+# Excel exports stream rows in openpyxl's write-only mode, which writes the
+# column widths before the first row: widths are sized from this many leading
+# rows, and longer values further down are cut off on screen (not in the cell)
+EXPORT_COLUMN_WIDTH_SAMPLE_ROWS = int(os.environ.get("EXPORT_COLUMN_WIDTH_SAMPLE_ROWS", "1000"))
+
+# Seconds a cached dashboard is served before being recomputed even without changes
+DASHBOARD_CACHE_TIMEOUT = int(os.environ.get("DASHBOARD_CACHE_TIMEOUT", "300"))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -210,8 +231,37 @@ STATICFILES_FINDERS = [
 ]
 
 # Cache settings
+# PRODUCTION MUST SET CACHE_BACKEND to redis (needs the redis package) or
+# memcached (needs pymemcache): one cache shared by every web and worker
+# process, whose atomic add and incr the stampede locks and the per-user
+# data versions of test_cases/cache.py rely on. locmem, the default, is
+# private to each process and only suits development and the tests. file
+# and db (run `manage.py createcachetable` first) are shared by the
+# processes of one host but their add and incr are not atomic, so they are
+# only safe with a single worker process.
+# CACHE_LOCATION overrides the backend's default server(s), directory or table.
+CACHE_BACKENDS = {
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+    'memcached': ('django.core.cache.backends.memcached.PyMemcacheCache', '127.0.0.1:11211'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / 'cache')),
+    'db': ('django.core.cache.backends.db.DatabaseCache', 'django_cache'),
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', ''),
+}
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", "locmem")
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(f"CACHE_BACKEND must be one of {', '.join(CACHE_BACKENDS)}, not {CACHE_BACKEND!r}")
+
+cache_backend, cache_location = CACHE_BACKENDS[CACHE_BACKEND]
+cache_location = os.environ.get("CACHE_LOCATION", cache_location)
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': cache_backend,
+        'LOCATION': cache_location.split(',') if CACHE_BACKEND == 'memcached' else cache_location,
+        'KEY_PREFIX': os.environ.get("CACHE_KEY_PREFIX", "testcase_management"),
+        'TIMEOUT': int(os.environ.get("CACHE_TIMEOUT", "300")),
     }
-}
\ No newline at end of file
+}
+
+# Seconds the report and metrics views serve a cached result (it is also
+# invalidated as soon as the user's data changes)
+REPORT_CACHE_TIMEOUT = int(os.environ.get("REPORT_CACHE_TIMEOUT", "300"))
\ No newline at end of file